@@ -0,0 +1,5 @@
+"""
+Benchmarks and synthetic corpus generation for the static site generator.
+
+Run with `python3 -m bench --help`.
+"""
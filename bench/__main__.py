@@ -0,0 +1,58 @@
+import argparse
+import json
+import subprocess
+
+from .benchmarks import format_results, run_benchmarks
+
+
+def _git_revision() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the static site generator")
+    parser.add_argument("--pages", type=int, default=200, help="synthetic corpus size")
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per benchmark")
+    parser.add_argument("--seed", type=int, default=0, help="corpus generator seed")
+    parser.add_argument("-j", "--jobs", type=int, default=1, help="jobs for the build benchmark")
+    parser.add_argument("--only", nargs="*", help="benchmark names to run")
+    parser.add_argument("--json", help="write results as JSON to this path")
+    parser.add_argument("--compare", help="JSON results from a previous run to compare against")
+    args = parser.parse_args()
+
+    results = run_benchmarks(
+        page_count=args.pages,
+        repeat=args.repeat,
+        seed=args.seed,
+        jobs=args.jobs,
+        only=set(args.only) if args.only else None,
+    )
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as file:
+            baseline = json.load(file)["results"]
+
+    print(format_results(results, baseline))
+
+    if args.json:
+        report = {
+            "revision": _git_revision(),
+            "pages": args.pages,
+            "seed": args.seed,
+            "results": results,
+        }
+        with open(args.json, "w") as file:
+            json.dump(report, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+import contextlib
+import gc
+import io
+import os
+import tempfile
+import time
+import tracemalloc
+from typing import Callable
+
+from src.block_markdown import (
+    block_to_block_type,
+    markdown_to_blocks,
+    markdown_to_html_node,
+)
+from src.htmlnode import ParentNode
+from src.inline_markdown import text_to_textnodes
+from src.main import main
+from src.textnode import TextNode, TextType, text_node_to_html_node
+
+from .corpus import CorpusGenerator
+
+
+def measure(func: Callable[[], object], repeat: int = 3) -> dict[str, float]:
+    """
+    Times func over several runs and measures its peak traced memory in a
+    separate run, so tracemalloc overhead does not skew the timings.
+
+    Returns:
+        Best and mean wall time in seconds and peak memory in bytes
+    """
+    timings = []
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+
+    gc.collect()
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "best_s": min(timings),
+        "mean_s": sum(timings) / len(timings),
+        "peak_bytes": peak,
+    }
+
+
+def _result(name: str, stats: dict[str, float], pages: int, size: int) -> dict:
+    return {
+        "name": name,
+        **stats,
+        "pages_per_s": pages / stats["best_s"] if stats["best_s"] else 0.0,
+        "mb_per_s": size / 1e6 / stats["best_s"] if stats["best_s"] else 0.0,
+    }
+
+
+def run_benchmarks(
+    page_count: int = 200,
+    repeat: int = 3,
+    seed: int = 0,
+    jobs: int = 1,
+    only: set[str] | None = None,
+) -> list[dict]:
+    """
+    Runs the benchmark suite over a synthetic corpus.
+
+    Args:
+        page_count: Number of pages in the synthetic corpus
+        repeat: Timed runs per benchmark
+        seed: Corpus generator seed
+        jobs: Worker processes for the full build benchmark
+        only: Optional subset of benchmark names to run
+
+    Returns:
+        One result dict per benchmark
+    """
+    generator = CorpusGenerator(seed=seed)
+    pages = [markdown for _, markdown in generator.pages(page_count)]
+    size = sum(len(markdown.encode()) for markdown in pages)
+
+    blocks = [block for markdown in pages for block in markdown_to_blocks(markdown)]
+    lines = [
+        line
+        for block in blocks
+        if block_to_block_type(block) == "paragraph"
+        for line in block.split("\n")
+    ]
+    trees = [markdown_to_html_node(markdown) for markdown in pages]
+
+    benchmarks: dict[str, Callable[[], object]] = {
+        "markdown_to_blocks": lambda: [markdown_to_blocks(md) for md in pages],
+        "block_to_block_type": lambda: [block_to_block_type(block) for block in blocks],
+        "text_to_textnodes": lambda: [text_to_textnodes(line) for line in lines],
+        "markdown_to_html_node": lambda: [markdown_to_html_node(md) for md in pages],
+        "to_html": lambda: [tree.to_html() for tree in trees],
+        "construct_nodes": lambda: [
+            ParentNode(
+                "p",
+                [
+                    text_node_to_html_node(TextNode(line, TextType.TEXT)),
+                    text_node_to_html_node(TextNode(line, TextType.BOLD)),
+                    text_node_to_html_node(TextNode(line, TextType.LINK, "/")),
+                ],
+            )
+            for line in lines
+        ],
+    }
+
+    results = []
+    for name, func in benchmarks.items():
+        if only and name not in only:
+            continue
+        results.append(_result(name, measure(func, repeat), page_count, size))
+
+    if not only or "build" in only:
+        with tempfile.TemporaryDirectory() as root:
+            generator.write_site(root, page_count)
+            # Every run renders cold so repeats time the same work, and the
+            # build summary and broken links of the corpus are not printed
+            argv = ["--root", root, "--clean", "--no-block-cache", "--jobs", str(jobs)]
+
+            def build() -> None:
+                with contextlib.redirect_stdout(io.StringIO()):
+                    main(argv)
+
+            results.append(_result("build", measure(build, repeat), page_count, size))
+
+    return results
+
+
+def format_results(results: list[dict], baseline: list[dict] | None = None) -> str:
+    """
+    Formats results as a table, with a speedup column when a baseline is given.
+    """
+    previous = {result["name"]: result for result in baseline or []}
+    header = f"{'benchmark':<24}{'best ms':>10}{'pages/s':>12}{'MB/s':>9}{'peak KiB':>11}"
+    if previous:
+        header += f"{'speedup':>9}"
+
+    rows = [header]
+    for result in results:
+        row = (
+            f"{result['name']:<24}{result['best_s'] * 1000:>10.2f}"
+            f"{result['pages_per_s']:>12.1f}{result['mb_per_s']:>9.2f}"
+            f"{result['peak_bytes'] / 1024:>11.0f}"
+        )
+        if result["name"] in previous:
+            row += f"{previous[result['name']]['best_s'] / result['best_s']:>8.2f}x"
+        rows.append(row)
+
+    return os.linesep.join(rows)
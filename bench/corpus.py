@@ -0,0 +1,137 @@
+import os
+import random
+
+WORDS = (
+    "elf hobbit ring shire mordor wizard river forest mountain king sword "
+    "song star lamp tower gate road journey shadow light stone dwarf horse"
+).split()
+
+DEFAULT_BLOCK_MIX = {
+    "paragraph": 5,
+    "heading": 2,
+    "unordered_list": 1,
+    "ordered_list": 1,
+    "quote": 1,
+    "code": 1,
+}
+
+
+class CorpusGenerator:
+    """
+    Generates deterministic synthetic markdown pages for benchmarking.
+
+    Args:
+        seed: Random seed; the same seed always yields the same corpus
+        blocks_per_page: Number of blocks following each page's h1 title
+        block_mix: Relative weights of each block type
+        link_density: Probability that an inline span is a link
+        image_density: Probability that an inline span is an image
+    """
+
+    def __init__(
+        self,
+        seed: int = 0,
+        blocks_per_page: int = 20,
+        block_mix: dict[str, int] | None = None,
+        link_density: float = 0.1,
+        image_density: float = 0.02,
+    ):
+        self.rng = random.Random(seed)
+        self.blocks_per_page = blocks_per_page
+        self.block_mix = block_mix or DEFAULT_BLOCK_MIX
+        self.link_density = link_density
+        self.image_density = image_density
+
+    def words(self, count: int) -> str:
+        return " ".join(self.rng.choice(WORDS) for _ in range(count))
+
+    def inline(self, spans: int = 8) -> str:
+        parts = []
+        for _ in range(spans):
+            roll = self.rng.random()
+            if roll < self.image_density:
+                parts.append(f"![{self.words(2)}](/images/{self.rng.choice(WORDS)}.png)")
+            elif roll < self.image_density + self.link_density:
+                parts.append(f"[{self.words(2)}](/{self.rng.choice(WORDS)})")
+            else:
+                style = self.rng.random()
+                if style < 0.1:
+                    parts.append(f"**{self.words(2)}**")
+                elif style < 0.2:
+                    parts.append(f"*{self.words(2)}*")
+                elif style < 0.25:
+                    parts.append(f"`{self.words(1)}`")
+                else:
+                    parts.append(self.words(self.rng.randint(2, 6)))
+        return " ".join(parts)
+
+    def block(self, block_type: str) -> str:
+        if block_type == "heading":
+            return "#" * self.rng.randint(2, 6) + " " + self.inline(2)
+
+        if block_type == "unordered_list":
+            return "\n".join(f"- {self.inline(3)}" for _ in range(self.rng.randint(2, 6)))
+
+        if block_type == "ordered_list":
+            return "\n".join(
+                f"{i}. {self.inline(3)}" for i in range(1, self.rng.randint(2, 6) + 1)
+            )
+
+        if block_type == "quote":
+            return "\n".join(f"> {self.inline(3)}" for _ in range(self.rng.randint(1, 4)))
+
+        if block_type == "code":
+            lines = [f"let {self.rng.choice(WORDS)} = {i}" for i in range(self.rng.randint(2, 8))]
+            return "```\n" + "\n".join(lines) + "\n```"
+
+        return "\n".join(self.inline() for _ in range(self.rng.randint(1, 4)))
+
+    def page(self, title: str) -> str:
+        types = list(self.block_mix)
+        weights = [self.block_mix[block_type] for block_type in types]
+        blocks = [f"# {title}"]
+        blocks.extend(
+            self.block(block_type)
+            for block_type in self.rng.choices(types, weights, k=self.blocks_per_page)
+        )
+        return "\n\n".join(blocks) + "\n"
+
+    def pages(self, count: int) -> list[tuple[str, str]]:
+        """
+        Returns (relative path, markdown) pairs spread across nested directories.
+        """
+        return [
+            (os.path.join(f"section{i % 10}", f"page{i}", "index.md"), self.page(f"Page {i}"))
+            for i in range(count)
+        ]
+
+    def write_site(self, root: str, page_count: int) -> int:
+        """
+        Writes a complete project (content/, static/ and template.html) under root.
+
+        Returns:
+            Total bytes of markdown written
+        """
+        total = 0
+
+        for rel_path, markdown in self.pages(page_count):
+            path = os.path.join(root, "content", rel_path)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "w") as file:
+                file.write(markdown)
+            total += len(markdown.encode())
+
+        os.makedirs(os.path.join(root, "static", "images"), exist_ok=True)
+        with open(os.path.join(root, "static", "index.css"), "w") as file:
+            file.write("body { margin: 0 auto; max-width: 40em; }\n")
+        with open(os.path.join(root, "static", "images", "ring.png"), "wb") as file:
+            file.write(bytes(self.rng.getrandbits(8) for _ in range(64 * 1024)))
+
+        with open(os.path.join(root, "template.html"), "w") as file:
+            file.write(
+                "<!DOCTYPE html>\n<html>\n<head>\n<title> {{ Title }} </title>\n"
+                '<link href="/index.css" rel="stylesheet">\n</head>\n'
+                "<body>\n<article>\n{{ Content }}\n</article>\n</body>\n</html>\n"
+            )
+
+        return total
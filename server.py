@@ -1,30 +1,18 @@
-from http.server import HTTPServer, SimpleHTTPRequestHandler
-
-PORT = 8888
-ServerAddress = ("localhost", PORT)
-
-
-class CORSHTTPRequestHandler(SimpleHTTPRequestHandler):
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, directory="public", **kwargs)
-
-    def end_headers(self):
-        self.send_header("Access-Control-Allow-Origin", "*")
-        self.send_header("Access-Control-Allow-Methods", "GET, OPTIONS")
-        self.send_header("Access-Control-Allow-Headers", "*")
-        super().end_headers()
-
-    def do_OPTIONS(self):
-        self.send_response(200, "OK")
-        self.end_headers()
-
-
-with HTTPServer(ServerAddress, CORSHTTPRequestHandler) as httpd:
-    print("serving on port:", PORT)
-    try:
-        httpd.serve_forever()
-    except KeyboardInterrupt:
-        pass
-
-    print("\nserver stopped")
-    httpd.server_close()
+import argparse
+
+from src.server import PORT, serve
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve the built site")
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--directory", default="public")
+    parser.add_argument(
+        "--cache-mb",
+        type=int,
+        default=64,
+        help="in-memory file cache size in MiB (0 disables caching)",
+    )
+    args = parser.parse_args()
+
+    serve(args.directory, args.port, args.host, args.cache_mb * 1024 * 1024)
@@ -0,0 +1,251 @@
+import html
+import json
+import os
+import re
+from typing import Callable
+from urllib.parse import urlsplit
+
+from .file_io import discard_sidecars, write_if_changed
+from .htmlnode import LeafNode, ParentNode
+from .links import page_url, url_aliases
+from .manifest import hash_bytes
+from .metadata import MetadataStore
+from .template import Template
+
+# Content subdirectory whose pages make up the Atom feed
+BLOG_DIR = "blog"
+
+SITEMAP_PATH = "sitemap.xml"
+FEED_PATH = f"{BLOG_DIR}/atom.xml"
+TAGS_DIR = "tags"
+
+_SLUG_INVALID = re.compile(r"[^a-z0-9]+")
+
+
+def tag_slug(tag: str) -> str:
+    """
+    Returns the URL path segment used for a tag's listing page.
+    """
+    return _SLUG_INVALID.sub("-", tag.lower()).strip("-") or "tag"
+
+
+def canonical_url(rel_path: str) -> str:
+    """
+    Returns the URL path a page is linked as: its directory for index pages.
+    """
+    aliases = url_aliases(page_url(rel_path))
+    return aliases[1] if len(aliases) > 1 else aliases[0]
+
+
+def entry_timestamp(entry: dict) -> str:
+    """
+    Returns a page's date as an RFC 3339 timestamp: its front matter date, or
+    the time its content last changed.
+    """
+    date = entry.get("date")
+    if not date:
+        return entry["updated"]
+    return f"{date}T00:00:00Z" if len(date) == 10 else date
+
+
+def render_sitemap(site_url: str, pages: list[tuple[str, str]]) -> str:
+    """
+    Renders a sitemap of (URL path, last modified timestamp) pairs.
+    """
+    lines = [
+        '<?xml version="1.0" encoding="UTF-8"?>',
+        '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">',
+    ]
+    for url, lastmod in pages:
+        lines.append(
+            f"<url><loc>{html.escape(site_url + url)}</loc>"
+            f"<lastmod>{lastmod}</lastmod></url>"
+        )
+    lines.append("</urlset>")
+    return "\n".join(lines) + "\n"
+
+
+def render_feed(
+    site_url: str,
+    feed_url: str,
+    title: str,
+    author: str,
+    entries: list[tuple[str, str, str]],
+) -> str:
+    """
+    Renders an Atom feed of (title, URL path, updated timestamp) entries, which
+    should be given newest first. The author is named once for the whole feed,
+    which covers every entry.
+    """
+    updated = max((entry[2] for entry in entries), default="1970-01-01T00:00:00Z")
+    lines = [
+        '<?xml version="1.0" encoding="utf-8"?>',
+        '<feed xmlns="http://www.w3.org/2005/Atom">',
+        f"<title>{html.escape(title)}</title>",
+        f"<id>{html.escape(site_url + feed_url)}</id>",
+        f'<link rel="self" href="{html.escape(site_url + feed_url)}"/>',
+        f"<updated>{updated}</updated>",
+        f"<author><name>{html.escape(author)}</name></author>",
+    ]
+    for entry_title, url, entry_updated in entries:
+        lines.append(
+            f"<entry><title>{html.escape(entry_title)}</title>"
+            f'<link href="{html.escape(site_url + url)}"/>'
+            f"<id>{html.escape(site_url + url)}</id>"
+            f"<updated>{entry_updated}</updated></entry>"
+        )
+    lines.append("</feed>")
+    return "\n".join(lines) + "\n"
+
+
+def _link_list(links: list[tuple[str, str]]) -> ParentNode:
+    return ParentNode(
+        "ul",
+        [
+            ParentNode("li", [LeafNode("a", html.escape(text), {"href": url})])
+            for text, url in links
+        ],
+    )
+
+
+def render_tag_page(template: Template, tag: str, pages: list[tuple[str, str]]) -> str:
+    """
+    Renders the listing of (title, URL path) pages carrying a tag into the
+    page template.
+    """
+    return template.render(
+        {"Title": html.escape(f"Tagged {tag}"), "Content": _link_list(pages)}
+    )
+
+
+def render_tag_index(template: Template, tags: list[tuple[str, int]]) -> str:
+    """
+    Renders the list of all (tag, page count) pairs into the page template.
+    """
+    links = [
+        (f"{tag} ({count})", f"/{TAGS_DIR}/{tag_slug(tag)}/") for tag, count in tags
+    ]
+    return template.render({"Title": "Tags", "Content": _link_list(links)})
+
+
+def generate_aggregates(
+    store: MetadataStore,
+    content_dir: str,
+    dest_dir: str,
+    template: Template,
+    site_url: str = "",
+    on_output: Callable[[str], None] | None = None,
+    author: str = "",
+) -> dict[str, int]:
+    """
+    Generates sitemap.xml, the Atom feed of the blog and the tag listing pages
+    from the metadata store, without reading any page sources. The sitemap
+    and feed require absolute URLs, so they are only generated with a
+    site_url; tag pages link by URL path and are always generated.
+
+    Each aggregate is fingerprinted by the metadata it is generated from and is
+    only regenerated when that fingerprint changes or its output is missing, so
+    editing the body of one post leaves every listing it appears in untouched.
+    Aggregates that are no longer produced, such as the page of a tag that was
+    removed from every page, are deleted. Draft pages are left out.
+
+    Args:
+        store: Metadata of every page in the site
+        content_dir: Content directory the store's sources are under
+        dest_dir: Destination directory of the site
+        template: Compiled page template used for tag pages
+        site_url: Absolute URL the site is served from, prefixed to URLs in
+            the sitemap and feed
+        on_output: Called with each aggregate's path once it is up to date
+        author: Author named in the feed; the host of site_url when empty
+
+    Returns:
+        Counts of aggregates "written", rendered but "skipped" because the
+        output was unchanged, "fresh" and "removed"
+
+    Raises:
+        Exception: If site_url is not an absolute URL
+    """
+    site_url = site_url.rstrip("/")
+    site = urlsplit(site_url)
+    if site_url and not (site.scheme and site.netloc):
+        raise Exception(f"Site URL must be absolute: {site_url}")
+    author = author or site.netloc
+    pages = sorted(
+        (canonical_url(os.path.relpath(src_path, content_dir)), entry)
+        for src_path, entry in store.entries.items()
+        if not entry["draft"]
+    )
+    planned: dict[str, tuple[object, Callable[[], str]]] = {}
+
+    sitemap = [(url, entry_timestamp(entry)) for url, entry in pages]
+    if site_url:
+        planned[SITEMAP_PATH] = (
+            [site_url, sitemap],
+            lambda: render_sitemap(site_url, sitemap),
+        )
+
+    blog_url = f"/{BLOG_DIR}/"
+    posts = sorted(
+        (
+            (entry["title"], url, entry_timestamp(entry))
+            for url, entry in pages
+            if url.startswith(blog_url) and url != blog_url
+        ),
+        key=lambda post: (post[2], post[1]),
+        reverse=True,
+    )
+    if posts and site_url:
+        blog = dict(pages).get(blog_url)
+        feed_title = blog["title"] if blog is not None else BLOG_DIR.capitalize()
+        planned[FEED_PATH] = (
+            [site_url, feed_title, author, posts],
+            lambda: render_feed(site_url, "/" + FEED_PATH, feed_title, author, posts),
+        )
+
+    tagged: dict[str, list[tuple[str, str]]] = {}
+    for url, entry in pages:
+        for tag in entry["tags"]:
+            tagged.setdefault(tag, []).append((entry["title"], url))
+
+    for tag, tag_pages in sorted(tagged.items()):
+        planned[f"{TAGS_DIR}/{tag_slug(tag)}/index.html"] = (
+            [template.hash, tag, tag_pages],
+            lambda tag=tag, tag_pages=tag_pages: render_tag_page(
+                template, tag, tag_pages
+            ),
+        )
+    if tagged:
+        counts = [(tag, len(tag_pages)) for tag, tag_pages in sorted(tagged.items())]
+        planned[f"{TAGS_DIR}/index.html"] = (
+            [template.hash, counts],
+            lambda: render_tag_index(template, counts),
+        )
+
+    stats = {"written": 0, "skipped": 0, "fresh": 0, "removed": 0}
+
+    for rel_path, (payload, render) in planned.items():
+        path = os.path.join(dest_dir, rel_path)
+        fingerprint = hash_bytes(json.dumps(payload).encode())
+
+        if store.aggregates.get(rel_path) == fingerprint and os.path.exists(path):
+            stats["fresh"] += 1
+        else:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            changed = write_if_changed(path, render().encode())
+            stats["written" if changed else "skipped"] += 1
+            store.aggregates[rel_path] = fingerprint
+
+        if on_output is not None:
+            on_output(path)
+
+    for rel_path in list(store.aggregates):
+        if rel_path not in planned:
+            path = os.path.join(dest_dir, rel_path)
+            if os.path.exists(path):
+                os.remove(path)
+                discard_sidecars(path)
+                stats["removed"] += 1
+            del store.aggregates[rel_path]
+
+    return stats
@@ -0,0 +1,299 @@
+import hashlib
+import json
+import os
+import posixpath
+import re
+from typing import Callable
+
+from .file_io import discard_sidecars, write_if_changed
+from .manifest import hash_bytes
+
+# Static files given content-addressed copies; other files, such as robots.txt
+# and favicon.ico, are looked up by clients under fixed names
+FINGERPRINT_EXTENSIONS = frozenset(
+    {
+        ".css",
+        ".js",
+        ".mjs",
+        ".png",
+        ".jpg",
+        ".jpeg",
+        ".gif",
+        ".svg",
+        ".webp",
+        ".avif",
+        ".woff",
+        ".woff2",
+        ".ttf",
+        ".otf",
+    }
+)
+
+# Hex digits of the content hash kept in a fingerprinted name
+HASH_LENGTH = 10
+
+# Bytes read and written at a time when copying an asset
+CHUNK_SIZE = 1 << 20
+
+_FINGERPRINTED = re.compile(r"\.[0-9a-f]{%d}\.[^./]+$" % HASH_LENGTH)
+_ASSET_ATTRIBUTE = re.compile(
+    r"(<(?:img|link|script)\b[^>]*?\s(?:src|href)=)([\"'])([^\"'>]*)\2",
+    re.IGNORECASE,
+)
+
+
+def fingerprint_name(path: str, digest: str) -> str:
+    """
+    Inserts a content hash before a path's extension: index.css becomes
+    index.3f2a9c01bd.css.
+    """
+    root, ext = os.path.splitext(path)
+    return f"{root}.{digest[:HASH_LENGTH]}{ext}"
+
+
+def is_fingerprinted(path: str) -> bool:
+    """
+    Returns whether a path or URL names a content-addressed copy, whose
+    contents never change and may be cached indefinitely.
+    """
+    return _FINGERPRINTED.search(path) is not None
+
+
+def rewrite_asset_urls(html: str, assets: dict[str, str]) -> str:
+    """
+    Points the src and href attributes of img, link and script tags at the
+    content-addressed copies of the assets they name.
+
+    Only root-relative URLs are rewritten; query strings and fragments are
+    kept. URLs of files without a copy are left untouched.
+
+    Args:
+        html: HTML text
+        assets: URL paths of assets mapped to the URL paths of their copies
+    """
+    if "src=" not in html and "href=" not in html:
+        return html
+
+    def replace(match: re.Match) -> str:
+        url = match[3]
+        ends = [i for i in (url.find("?"), url.find("#")) if i >= 0]
+        end = min(ends, default=len(url))
+        hashed = assets.get(url[:end])
+        if hashed is None:
+            return match[0]
+        return f"{match[1]}{match[2]}{hashed}{url[end:]}{match[2]}"
+
+    return _ASSET_ATTRIBUTE.sub(replace, html)
+
+
+def copy_fingerprinted(
+    src_path: str, dst_path: str, chunk_size: int = CHUNK_SIZE
+) -> str:
+    """
+    Streams a file into a content-addressed copy of dst_path.
+
+    The file is hashed chunk by chunk as it is written to a temporary file, so
+    it is read once and never held in memory whole. The temporary file is then
+    renamed to the name carrying its hash; an existing copy of that name
+    already holds the same contents and is left in place.
+
+    Returns:
+        The path of the copy
+    """
+    digest = hashlib.sha256()
+    tmp_path = f"{dst_path}.tmp-{os.getpid()}"
+
+    try:
+        with open(src_path, "rb") as src_file, open(tmp_path, "wb") as dst_file:
+            for chunk in iter(lambda: src_file.read(chunk_size), b""):
+                digest.update(chunk)
+                dst_file.write(chunk)
+
+        hashed_path = fingerprint_name(dst_path, digest.hexdigest())
+        if not os.path.exists(hashed_path):
+            os.replace(tmp_path, hashed_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+    return hashed_path
+
+
+def _write_minified_fingerprinted(
+    src_path: str, dst_path: str, css_minifier: Callable[[str], str]
+) -> str:
+    with open(src_path, encoding="utf-8") as src_file:
+        data = css_minifier(src_file.read()).encode()
+
+    hashed_path = fingerprint_name(dst_path, hash_bytes(data))
+    write_if_changed(hashed_path, data)
+    return hashed_path
+
+
+class AssetManifest:
+    """
+    Persistent map of static assets to their content-addressed copies.
+
+    Entries are keyed by the URL path an asset is copied to under its own name
+    and hold the URL path of its copy along with the size and mtime of the
+    source it was made from, so unchanged assets are neither read nor hashed
+    again.
+    """
+
+    VERSION = 1
+
+    def __init__(self, path: str | None = None):
+        self.path = path
+        self.entries: dict[str, dict] = {}
+        if path is not None:
+            self.load()
+
+    def __contains__(self, url: str) -> bool:
+        return url in self.entries
+
+    def load(self) -> None:
+        """
+        Loads entries from disk, starting empty if the manifest is missing,
+        unreadable or written by a different version.
+        """
+        try:
+            with open(self.path) as file:
+                data = json.load(file)
+        except (OSError, ValueError):
+            return
+
+        if data.get("version") == self.VERSION:
+            self.entries = data.get("entries", {})
+
+    def save(self) -> None:
+        """
+        Writes the manifest to disk atomically. Does nothing without a path.
+        """
+        if self.path is None:
+            return
+
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = self.path + ".tmp"
+
+        with open(tmp_path, "w") as file:
+            json.dump({"version": self.VERSION, "entries": self.entries}, file)
+
+        os.replace(tmp_path, self.path)
+
+    def urls(self) -> dict[str, str]:
+        """
+        Returns the URL path of each asset mapped to the URL path of its copy.
+        """
+        return {url: entry["url"] for url, entry in self.entries.items()}
+
+    def paths(self, dest_dir: str) -> set[str]:
+        """
+        Returns the paths of the copies under the site's destination directory.
+        """
+        return {_dest_path(dest_dir, entry["url"]) for entry in self.entries.values()}
+
+
+def _dest_path(dest_dir: str, url: str) -> str:
+    return os.path.join(dest_dir, *url.lstrip("/").split("/"))
+
+
+def _remove_copy(dest_dir: str, url: str) -> bool:
+    path = _dest_path(dest_dir, url)
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        return False
+    discard_sidecars(path)
+    return True
+
+
+def fingerprint_assets(
+    static_dir: str,
+    dest_dir: str,
+    manifest: AssetManifest,
+    css_minifier: Callable[[str], str] | None = None,
+    on_output: Callable[[str], None] | None = None,
+) -> dict[str, int]:
+    """
+    Writes a content-addressed copy of every static asset into the site and
+    records it in the manifest.
+
+    Copies sit next to the asset's own copy, e.g. index.3f2a9c01bd.css beside
+    index.css, and can be served with far-future immutable cache headers since
+    any change to an asset gives it a new name. Assets whose size and mtime
+    match the manifest and whose copy exists are skipped without being read.
+    The previous copy of a changed asset and the copies of removed assets are
+    deleted.
+
+    Args:
+        static_dir: Directory of static files
+        dest_dir: Destination directory of the site
+        manifest: Asset manifest, updated in place
+        css_minifier: Applied to stylesheets before they are hashed
+        on_output: Called with each copy's path once it is up to date
+
+    Returns:
+        Counts of copies "written", "fresh" and "removed"
+    """
+    stats = {"written": 0, "fresh": 0, "removed": 0}
+    seen = set()
+
+    for dir_path, _, file_names in os.walk(static_dir):
+        rel_dir = os.path.relpath(dir_path, static_dir)
+
+        for file_name in file_names:
+            ext = os.path.splitext(file_name)[1].lower()
+            if ext not in FINGERPRINT_EXTENSIONS:
+                continue
+
+            src_path = os.path.join(dir_path, file_name)
+            rel_path = os.path.normpath(os.path.join(rel_dir, file_name))
+            url = "/" + rel_path.replace(os.sep, "/")
+            minified = css_minifier is not None and ext == ".css"
+            seen.add(url)
+
+            stat = os.stat(src_path)
+            entry = manifest.entries.get(url)
+            if (
+                entry is not None
+                and entry["size"] == stat.st_size
+                and entry["mtime_ns"] == stat.st_mtime_ns
+                and entry["minified"] == minified
+                and os.path.exists(_dest_path(dest_dir, entry["url"]))
+            ):
+                stats["fresh"] += 1
+                hashed_path = _dest_path(dest_dir, entry["url"])
+            else:
+                dst_path = os.path.join(dest_dir, rel_path)
+                os.makedirs(os.path.dirname(dst_path), exist_ok=True)
+                if minified:
+                    hashed_path = _write_minified_fingerprinted(
+                        src_path, dst_path, css_minifier
+                    )
+                else:
+                    hashed_path = copy_fingerprinted(src_path, dst_path)
+
+                hashed_url = posixpath.join(
+                    posixpath.dirname(url), os.path.basename(hashed_path)
+                )
+                if entry is not None and entry["url"] != hashed_url:
+                    _remove_copy(dest_dir, entry["url"])
+
+                manifest.entries[url] = {
+                    "url": hashed_url,
+                    "size": stat.st_size,
+                    "mtime_ns": stat.st_mtime_ns,
+                    "minified": minified,
+                }
+                stats["written"] += 1
+
+            if on_output is not None:
+                on_output(hashed_path)
+
+    for url in list(manifest.entries):
+        if url not in seen:
+            if _remove_copy(dest_dir, manifest.entries[url]["url"]):
+                stats["removed"] += 1
+            del manifest.entries[url]
+
+    return stats
@@ -0,0 +1,126 @@
+import hashlib
+import json
+import os
+from collections import OrderedDict
+from typing import Any
+
+
+class BlockCache:
+    """
+    Bounded LRU cache of rendered output keyed by a hash of its input, such as
+    a block's HTML and references keyed by its markdown. Values must be JSON
+    serializable.
+
+    With a path, entries are loaded from and saved to a JSON store so they
+    survive between builds. The store records VERSION, which must be bumped
+    whenever block rendering changes so stale HTML is discarded.
+
+    With track_new, entries put since the last take_new() are remembered so
+    a worker process can hand them back to the cache of its parent.
+    """
+
+    VERSION = 2
+
+    def __init__(
+        self,
+        max_entries: int = 50_000,
+        path: str | None = None,
+        track_new: bool = False,
+    ):
+        self.max_entries = max_entries
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[str, Any] = OrderedDict()
+        self._new: dict[str, Any] | None = {} if track_new else None
+
+        if path is not None:
+            self.load()
+
+    @staticmethod
+    def key(block: str, compact: bool = False) -> str:
+        # Compact renderings live in their own key space
+        person = b"compact" if compact else b""
+        return hashlib.blake2b(block.encode(), digest_size=16, person=person).hexdigest()
+
+    def get(self, key: str) -> Any | None:
+        value = self._entries.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key: str, value: Any) -> None:
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        if self._new is not None:
+            self._new[key] = value
+
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def items(self) -> list[tuple[str, Any]]:
+        """
+        Returns the entries, least recently used first.
+        """
+        return list(self._entries.items())
+
+    def update(self, items: list[tuple[str, Any]]) -> None:
+        """
+        Adds entries, such as those rendered by a worker process, without
+        tracking them as new.
+        """
+        for key, value in items:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def take_new(self) -> list[tuple[str, Any]]:
+        """
+        Returns the entries put since the last call and forgets them. Always
+        empty unless the cache tracks new entries.
+        """
+        if not self._new:
+            return []
+        new, self._new = list(self._new.items()), {}
+        return new
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def load(self) -> None:
+        """
+        Loads the on-disk store, starting empty if it is missing, unreadable or
+        written by a different version.
+        """
+        try:
+            with open(self.path) as file:
+                data = json.load(file)
+        except (OSError, ValueError):
+            return
+
+        if data.get("version") != self.VERSION:
+            return
+
+        for key, value in data.get("entries", [])[-self.max_entries :]:
+            self._entries[key] = value
+
+    def save(self) -> None:
+        """
+        Writes the entries to the on-disk store atomically, least recently used first.
+        """
+        if self.path is None:
+            return
+
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = self.path + ".tmp"
+
+        with open(tmp_path, "w") as file:
+            json.dump({"version": self.VERSION, "entries": self.items()}, file)
+
+        os.replace(tmp_path, self.path)
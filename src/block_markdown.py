@@ -1,44 +1,90 @@
-from .htmlnode import ParentNode
-from .inline_markdown import text_to_textnodes
-from .textnode import text_node_to_html_node
+from typing import Iterable, Iterator
 
+from .block_cache import BlockCache
+from .htmlnode import HTMLNode, ParentNode, RawHTMLNode
+from .inline_markdown import text_to_textnodes
+from .textnode import TextType, text_node_to_html_node
 
-def markdown_to_blocks(markdown: str) -> list[str]:
-    """
-    Takes raw markdown string and converts it to blocks using newlines as delimiter.
-    """
-    split_md = markdown.split("\n\n")
-    blocks = [stripped_block for block in split_md if (stripped_block := block.strip())]
+HEADING_PREFIXES = ("# ", "## ", "### ", "#### ", "##### ", "###### ")
 
-    return blocks
+# A reference made by a page: ("link" or "image", target URL)
+Reference = tuple[str, str]
 
 
-def block_to_block_type(markdown_block: str) -> str:
-    """
-    Takes markdown block and returns string representation of type
-    Defaults to paragraph type if none other found
+def scan_blocks(lines: Iterable[str], fences: bool = True) -> Iterator[tuple[str, list[str]]]:
     """
-    lines = markdown_block.split("\n")
+    Reads markdown line by line, yielding (block type, lines) for each block.
 
-    if markdown_block.startswith(("# ", "## ", "### ", "#### ", "##### ", "###### ")):
+    Blocks are separated by blank lines, except inside fenced code, which runs
+    from an opening ``` line to the next line ending in ```. A fence left open
+    at the end of the document is scanned again as ordinary blocks.
+    Trailing newlines on the input lines are ignored.
+    """
+    block: list[str] = []
+    fenced = False
+
+    for line in lines:
+        line = line.rstrip("\n")
+
+        if fenced:
+            block.append(line)
+            if line.rstrip().endswith("```"):
+                block[-1] = line.rstrip()
+                yield "code", block
+                block = []
+                fenced = False
+            continue
+
+        if not line.strip():
+            if block:
+                block[-1] = block[-1].rstrip()
+                yield _classify(block), block
+                block = []
+            continue
+
+        if not block:
+            line = line.lstrip()
+
+            if fences and line.startswith("```"):
+                line = line.rstrip()
+                if len(line) >= 6 and line.endswith("```"):
+                    yield "code", [line]
+                else:
+                    block = [line]
+                    fenced = True
+                continue
+
+        block.append(line)
+
+    if fenced:
+        yield from scan_blocks(block, fences=False)
+    elif block:
+        block[-1] = block[-1].rstrip()
+        yield _classify(block), block
+
+
+def _classify(lines: list[str]) -> str:
+    first = lines[0]
+
+    if first.startswith(HEADING_PREFIXES):
         return "heading"
 
-    if markdown_block.startswith("```") and markdown_block.endswith("```"):
+    if first.startswith("```") and lines[-1].endswith("```"):
         return "code"
 
-    if markdown_block.startswith(">"):
+    if first.startswith(">"):
         for line in lines:
             if not line.startswith(">"):
                 return "paragraph"
         return "quote"
 
-    if markdown_block.startswith(("* ", "- ")):
+    if first.startswith(("* ", "- ")):
         for line in lines:
             if not line.startswith(("* ", "- ")):
                 return "paragraph"
         return "unordered_list"
 
-    if markdown_block.startswith("1. "):
+    if first.startswith("1. "):
         i = 1
         for line in lines:
             if not line.startswith(f"{i}. "):
@@ -49,111 +95,172 @@ def block_to_block_type(markdown_block: str) -> str:
     return "paragraph"
 
 
-def markdown_to_html_node(markdown: str) -> ParentNode:
+def markdown_to_blocks(markdown: str) -> list[str]:
     """
-    Converts full md doc to a single parent HTMLNode with many child objects representing nested elements
+    Takes raw markdown string and converts it to blocks using blank lines as delimiter.
+    Fenced code blocks are kept whole even when they contain blank lines.
     """
-    blocks = markdown_to_blocks(markdown)
-    children = []
-
-    for block in blocks:
-        block_type = block_to_block_type(block)
-
-        if block_type == "paragraph":
-            p_items = []
-            lines = block.split("\n")
-            paragraph = " ".join(lines)
-            text_nodes = text_to_textnodes(paragraph)
-
-            for text_node in text_nodes:
-                html_node = text_node_to_html_node(text_node)
-                p_items.append(html_node)
-
-            children.append(ParentNode("p", p_items))
-
-        if block_type == "unordered_list":
-            li_items = []
-            lines = block.split("\n")
-
-            for line in lines:
-                li_children = []
-                text = line[2:]
-                text_nodes = text_to_textnodes(text)
+    return ["\n".join(lines) for _, lines in scan_blocks(markdown.split("\n"))]
 
-                for text_node in text_nodes:
-                    html_node = text_node_to_html_node(text_node)
-                    li_children.append(html_node)
 
-                li_items.append(ParentNode("li", li_children))
+def block_to_block_type(markdown_block: str) -> str:
+    """
+    Takes markdown block and returns string representation of type
+    Defaults to paragraph type if none other found
+    """
+    return _classify(markdown_block.split("\n"))
 
-            children.append(ParentNode("ul", li_items))
 
-        if block_type == "ordered_list":
-            li_items = []
-            lines = block.split("\n")
+def _inline_children(text: str, refs: list[Reference] | None = None) -> list[HTMLNode]:
+    text_nodes = text_to_textnodes(text)
 
-            for line in lines:
-                text = line[3:]
-                text_nodes = text_to_textnodes(text)
-                li_children = []
+    if refs is not None:
+        for text_node in text_nodes:
+            if text_node.text_type in (TextType.LINK, TextType.IMAGE):
+                refs.append((text_node.text_type.value, text_node.url or ""))
 
-                for text_node in text_nodes:
-                    html_node = text_node_to_html_node(text_node)
-                    li_children.append(html_node)
+    return [text_node_to_html_node(text_node) for text_node in text_nodes]
 
-                li_items.append(ParentNode("li", li_children))
 
-            children.append(ParentNode("ol", li_items))
+def render_block(
+    block_type: str, lines: list[str], refs: list[Reference] | None = None
+) -> list[HTMLNode]:
+    """
+    Converts the lines of a classified block to the HTMLNodes representing it.
+    Heading blocks produce one node per heading line; all others produce one node.
+    Links and images found while parsing are appended to refs when given.
+    """
+    if block_type == "paragraph":
+        return [ParentNode("p", _inline_children(" ".join(lines), refs))]
+
+    if block_type == "unordered_list":
+        return [
+            ParentNode(
+                "ul", [ParentNode("li", _inline_children(line[2:], refs)) for line in lines]
+            )
+        ]
+
+    if block_type == "ordered_list":
+        return [
+            ParentNode(
+                "ol", [ParentNode("li", _inline_children(line[3:], refs)) for line in lines]
+            )
+        ]
+
+    if block_type == "heading":
+        headings = []
+        for line in lines:
+            i = 0
+            while line[i] == "#":
+                i += 1
+            text = line[i + 1 :].strip()
+            headings.append(ParentNode(f"h{i}", _inline_children(text, refs)))
+        return headings
 
-        if block_type == "heading":
-            lines = block.split("\n")
-            for line in lines:
-                i = 0
-                while line[i] == "#":
-                    i += 1
-                text = line[i + 1 :].strip()
-                text_nodes = text_to_textnodes(text)
-                heading_children = []
+    if block_type == "quote":
+        text = " ".join(line[1:].strip() for line in lines)
+        return [ParentNode("blockquote", _inline_children(text, refs))]
 
-                for text_node in text_nodes:
-                    html_node = text_node_to_html_node(text_node)
-                    heading_children.append(html_node)
+    if block_type == "code":
+        block = "\n".join(lines)
+        if not block.startswith("```") or not block.endswith("```"):
+            raise ValueError("Missing starting or closing delimiters")
 
-                children.append(ParentNode(f"h{i}", heading_children))
+        text = block[4:-3]
+        return [ParentNode("pre", [ParentNode("code", _inline_children(text, refs))])]
 
-        if block_type == "quote":
-            lines = block.split("\n")
-            new_lines = []
+    raise ValueError(f"Unknown block type {block_type}")
 
-            for line in lines:
-                new_lines.append(line[1:].strip())
 
-            text = " ".join(new_lines)
-            text_nodes = text_to_textnodes(text)
-            q_children = []
+def block_to_html_nodes(block: str) -> list[HTMLNode]:
+    """
+    Converts a single markdown block to the HTMLNodes representing it.
+    Heading blocks produce one node per heading line; all others produce one node.
+    """
+    lines = block.split("\n")
+    return render_block(_classify(lines), lines)
 
-            for text_node in text_nodes:
-                html_node = text_node_to_html_node(text_node)
-                q_children.append(html_node)
 
-            children.append(ParentNode("blockquote", q_children))
+def iter_block_nodes(
+    lines: Iterable[str],
+    cache: BlockCache | None = None,
+    compact: bool = False,
+    refs: list[Reference] | None = None,
+) -> Iterator[HTMLNode]:
+    """
+    Scans markdown lines and yields the HTMLNodes of each block as soon as the
+    block is complete. When a block cache is given, blocks seen before are
+    yielded as their cached HTML instead of being parsed again; compact selects
+    whether compact or verbatim renderings are cached. Links and images are
+    appended to refs when given, including those of cached blocks, whose
+    references are cached alongside their HTML.
+    """
+    for block_type, block_lines in scan_blocks(lines):
+        if cache is None:
+            yield from render_block(block_type, block_lines, refs)
+            continue
+
+        key = cache.key("\n".join(block_lines), compact)
+        cached = cache.get(key)
+
+        if cached is None:
+            block_refs: list[Reference] = []
+            block_nodes = render_block(block_type, block_lines, block_refs)
+            html = "".join(node.to_html(compact) for node in block_nodes)
+            cache.put(key, [html, block_refs])
+        else:
+            html, block_refs = cached
+            block_refs = [(kind, url) for kind, url in block_refs]
+
+        if refs is not None:
+            refs.extend(block_refs)
+        # Serialized once for the cache, so not again by the caller
+        yield RawHTMLNode(html)
+
+
+def markdown_to_html_node(
+    markdown: str,
+    cache: BlockCache | None = None,
+    compact: bool = False,
+    refs: list[Reference] | None = None,
+) -> ParentNode:
+    """
+    Converts full md doc to a single parent HTMLNode with many child objects representing nested elements
 
-        if block_type == "code":
-            if not block.startswith("```") or not block.endswith("```"):
-                raise ValueError("Missing starting or closing delimiters")
+    The document is scanned once; each block is classified as it is read and its
+    lines are handed straight to the renderer. When a block cache is given,
+    blocks seen before are emitted as their cached HTML instead of being parsed
+    again. Pass compact when the node will be serialized with compact=True so
+    that cached blocks match. Links and images are appended to refs when given.
+    """
+    return ParentNode(
+        "div", list(iter_block_nodes(markdown.split("\n"), cache, compact, refs))
+    )
 
-            code_items = []
-            html_nodes = []
 
-            text = block[4:-3]
-            text_nodes = text_to_textnodes(text)
+def iter_markdown_html(
+    lines: Iterable[str],
+    cache: BlockCache | None = None,
+    compact: bool = False,
+    refs: list[Reference] | None = None,
+) -> Iterator[str]:
+    """
+    Streams the HTML of a markdown document given as a line iterator, producing
+    the same markup as markdown_to_html_node(...).to_html(compact) while holding
+    only one block in memory at a time. Links and images are appended to refs
+    as their blocks are parsed.
 
-            for text_node in text_nodes:
-                html_node = text_node_to_html_node(text_node)
-                html_nodes.append(html_node)
+    Raises:
+        ValueError: If the document has no blocks
+    """
+    empty = True
+    yield "<div>"
 
-            code_items.append(ParentNode("code", html_nodes))
+    for node in iter_block_nodes(lines, cache, compact, refs):
+        empty = False
+        yield from node.iter_html(compact)
 
-            children.append(ParentNode("pre", code_items))
+    if empty:
+        raise ValueError("Invalid ParentNode: must have children")
 
-    return ParentNode("div", children)
+    yield "</div>"
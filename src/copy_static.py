@@ -1,8 +1,17 @@
 import os
 import shutil
+from typing import Callable
 
+from .file_io import discard_sidecars, sidecar_base, write_if_changed
+from .manifest import hash_file
 
-def copy_static_files(src_path: str, dst_path: str):
+
+def copy_static_files(
+    src_path: str,
+    dst_path: str,
+    on_output: Callable[[str], None] | None = None,
+    css_minifier: Callable[[str], str] | None = None,
+):
     """
     Recursively copy all files and directories from source to destination.
 
@@ -12,6 +21,9 @@ def copy_static_files(src_path: str, dst_path: str):
     Args:
         src_path (str): Source directory path to copy from
         dst_path (str): Destination directory path to copy to
+        on_output (Callable | None): Called with each destination file path
+            once it has been copied
+        css_minifier (Callable | None): Applied to stylesheets as they are copied
 
     Raises:
         FileNotFoundError: If source directory does not exist
@@ -19,7 +31,9 @@ def copy_static_files(src_path: str, dst_path: str):
     if not os.path.exists(src_path):
         raise FileNotFoundError(f"Source directory {src_path} does not exist.")
 
-    if os.path.exists(dst_path):
+    if os.path.islink(dst_path):
+        os.remove(dst_path)
+    elif os.path.exists(dst_path):
         shutil.rmtree(dst_path)
 
     os.makedirs(dst_path)
@@ -29,6 +43,265 @@ def copy_static_files(src_path: str, dst_path: str):
         dst_item = os.path.join(dst_path, file_name)
 
         if os.path.isdir(src_item):
-            copy_static_files(src_item, dst_item)
+            copy_static_files(src_item, dst_item, on_output, css_minifier)
+        elif css_minifier is not None and src_item.endswith(".css"):
+            _write_minified(src_item, dst_item, css_minifier)
+            if on_output is not None:
+                on_output(dst_item)
         else:
             shutil.copy(src_item, dst_item)
+            if on_output is not None:
+                on_output(dst_item)
+
+
+def _copy_file(src_path: str, dst_path: str, link: bool = False) -> None:
+    """
+    Copies a single file into place atomically, preserving its mtime.
+
+    Tries a hardlink when requested, then an in-kernel os.copy_file_range
+    (which reflinks on filesystems that support it), then a plain copy.
+    Precompressed sidecars of the replaced file are discarded.
+    """
+    tmp_path = f"{dst_path}.tmp-{os.getpid()}"
+
+    if link:
+        try:
+            os.link(src_path, tmp_path)
+            os.replace(tmp_path, dst_path)
+            discard_sidecars(dst_path)
+            return
+        except OSError:
+            pass
+
+    try:
+        with open(src_path, "rb") as src_file, open(tmp_path, "wb") as dst_file:
+            copied = False
+            if hasattr(os, "copy_file_range"):
+                try:
+                    while os.copy_file_range(src_file.fileno(), dst_file.fileno(), 1 << 30):
+                        pass
+                    copied = True
+                except OSError:
+                    src_file.seek(0)
+                    dst_file.seek(0)
+                    dst_file.truncate()
+            if not copied:
+                shutil.copyfileobj(src_file, dst_file)
+
+        shutil.copystat(src_path, tmp_path)
+        os.replace(tmp_path, dst_path)
+        discard_sidecars(dst_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def _write_minified(
+    src_path: str, dst_path: str, css_minifier: Callable[[str], str]
+) -> bool:
+    """
+    Writes the minified form of a stylesheet unless the destination already
+    holds it. Returns whether the destination was written.
+    """
+    with open(src_path, encoding="utf-8") as src_file:
+        css = src_file.read()
+
+    return write_if_changed(dst_path, css_minifier(css).encode())
+
+
+def _is_unchanged(src_path: str, dst_path: str, checksum: bool) -> bool:
+    try:
+        src_stat = os.stat(src_path)
+        dst_stat = os.stat(dst_path)
+    except OSError:
+        return False
+
+    if src_stat.st_size != dst_stat.st_size:
+        return False
+
+    if checksum:
+        return hash_file(src_path) == hash_file(dst_path)
+
+    return src_stat.st_mtime_ns == dst_stat.st_mtime_ns
+
+
+def sync_static_files(
+    src_path: str,
+    dst_path: str,
+    keep: set[str] | None = None,
+    checksum: bool = False,
+    link: bool = False,
+    on_output: Callable[[str], None] | None = None,
+    css_minifier: Callable[[str], str] | None = None,
+) -> dict[str, int]:
+    """
+    Incrementally mirror a source directory into a destination directory.
+
+    Unlike copy_static_files, the destination is never wiped: only files whose
+    size or mtime differ (or content hash, with checksum) are copied, and only
+    files with no counterpart in the source are deleted. Each copy is written to
+    a temporary file and renamed into place, so readers never see a partial file.
+    Precompressed sidecars of kept files are kept too.
+
+    Args:
+        src_path (str): Source directory path to copy from
+        dst_path (str): Destination directory path to copy to
+        keep (set[str] | None): Destination paths that must not be deleted even
+            though they have no source counterpart, e.g. generated pages
+        checksum (bool): Compare file contents by hash instead of by mtime
+        link (bool): Hardlink files instead of copying where possible
+        on_output (Callable | None): Called with each destination file path
+            once it is up to date, whether it was copied or skipped
+        css_minifier (Callable | None): Applied to stylesheets, which are then
+            compared with the destination by content rather than by stat
+
+    Returns:
+        dict[str, int]: Counts of "copied", "skipped" and "removed" files
+
+    Raises:
+        FileNotFoundError: If source directory does not exist
+    """
+    if not os.path.exists(src_path):
+        raise FileNotFoundError(f"Source directory {src_path} does not exist.")
+
+    keep = keep or set()
+    stats = {"copied": 0, "skipped": 0, "removed": 0}
+    _sync_dir(src_path, dst_path, keep, checksum, link, stats, on_output, css_minifier)
+
+    return stats
+
+
+def _sync_dir(
+    src_path: str,
+    dst_path: str,
+    keep: set[str],
+    checksum: bool,
+    link: bool,
+    stats: dict[str, int],
+    on_output: Callable[[str], None] | None = None,
+    css_minifier: Callable[[str], str] | None = None,
+) -> None:
+    if os.path.isfile(dst_path) or os.path.islink(dst_path):
+        os.remove(dst_path)
+    os.makedirs(dst_path, exist_ok=True)
+
+    src_names = set(os.listdir(src_path))
+
+    for file_name in src_names:
+        src_item = os.path.join(src_path, file_name)
+        dst_item = os.path.join(dst_path, file_name)
+
+        if os.path.isdir(src_item):
+            _sync_dir(
+                src_item, dst_item, keep, checksum, link, stats, on_output, css_minifier
+            )
+            continue
+
+        if os.path.isdir(dst_item) and not os.path.islink(dst_item):
+            shutil.rmtree(dst_item)
+
+        if css_minifier is not None and src_item.endswith(".css"):
+            written = _write_minified(src_item, dst_item, css_minifier)
+            stats["copied" if written else "skipped"] += 1
+        elif _is_unchanged(src_item, dst_item, checksum):
+            stats["skipped"] += 1
+        else:
+            _copy_file(src_item, dst_item, link)
+            stats["copied"] += 1
+
+        if on_output is not None:
+            on_output(dst_item)
+
+    for file_name in os.listdir(dst_path):
+        if file_name not in src_names and sidecar_base(file_name) not in src_names:
+            _remove_orphan(os.path.join(dst_path, file_name), keep, stats)
+
+
+def _remove_orphan(dst_item: str, keep: set[str], stats: dict[str, int]) -> bool:
+    """
+    Deletes a destination entry with no source counterpart unless it, or the
+    file it is a precompressed sidecar of, is in keep. Directories are pruned
+    recursively and removed once empty.
+
+    Returns whether anything was kept.
+    """
+    if os.path.isdir(dst_item) and not os.path.islink(dst_item):
+        kept = False
+        for file_name in os.listdir(dst_item):
+            kept = _remove_orphan(os.path.join(dst_item, file_name), keep, stats) or kept
+
+        if not kept:
+            os.rmdir(dst_item)
+        return kept
+
+    if dst_item in keep or sidecar_base(dst_item) in keep:
+        return True
+
+    os.remove(dst_item)
+    stats["removed"] += 1
+    return False
+
+
+def sync_static_paths(
+    src_path: str,
+    dst_path: str,
+    rel_paths: set[str],
+    link: bool = False,
+    on_output: Callable[[str], None] | None = None,
+    css_minifier: Callable[[str], str] | None = None,
+) -> dict[str, int]:
+    """
+    Syncs individual files, given relative to the source directory, without
+    walking the rest of the tree. Files missing from the source are deleted
+    from the destination.
+
+    Args:
+        src_path (str): Source directory path to copy from
+        dst_path (str): Destination directory path to copy to
+        rel_paths (set[str]): Changed paths relative to src_path; directories
+            are expanded into the files they contain
+        link (bool): Hardlink files instead of copying where possible
+        on_output (Callable | None): Called with each destination file path
+            once it is up to date, whether it was copied or skipped
+        css_minifier (Callable | None): Applied to stylesheets as they are synced
+
+    Returns:
+        dict[str, int]: Counts of "copied", "skipped" and "removed" files
+    """
+    stats = {"copied": 0, "skipped": 0, "removed": 0}
+
+    for rel_path in sorted(rel_paths):
+        src_item = os.path.join(src_path, rel_path)
+        dst_item = os.path.join(dst_path, rel_path)
+
+        if os.path.isfile(src_item):
+            if css_minifier is not None and src_item.endswith(".css"):
+                os.makedirs(os.path.dirname(dst_item), exist_ok=True)
+                written = _write_minified(src_item, dst_item, css_minifier)
+                stats["copied" if written else "skipped"] += 1
+            elif _is_unchanged(src_item, dst_item, checksum=False):
+                stats["skipped"] += 1
+            else:
+                os.makedirs(os.path.dirname(dst_item), exist_ok=True)
+                _copy_file(src_item, dst_item, link)
+                stats["copied"] += 1
+
+            if on_output is not None:
+                on_output(dst_item)
+        elif os.path.isdir(src_item):
+            nested = {
+                os.path.relpath(os.path.join(dir_path, file_name), src_path)
+                for dir_path, _, file_names in os.walk(src_item)
+                for file_name in file_names
+            }
+            nested_stats = sync_static_paths(
+                src_path, dst_path, nested, link, on_output, css_minifier
+            )
+            for key, value in nested_stats.items():
+                stats[key] += value
+        elif os.path.isfile(dst_item):
+            os.remove(dst_item)
+            discard_sidecars(dst_item)
+            stats["removed"] += 1
+
+    return stats
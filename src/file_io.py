@@ -0,0 +1,294 @@
+import filecmp
+import os
+import threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import IO, Callable, Iterable, Iterator, TypeVar
+
+from .manifest import hash_bytes, hash_file
+from .profiling import NULL_PROFILER, Profiler
+
+T = TypeVar("T")
+
+# Suffixes of precompressed copies served in place of a file
+SIDECAR_SUFFIXES = (".br", ".zst", ".gz")
+
+
+def sidecar_base(path: str) -> str | None:
+    """
+    Returns the file a precompressed sidecar belongs to, or None for other files.
+    """
+    for suffix in SIDECAR_SUFFIXES:
+        if path.endswith(suffix):
+            return path[: -len(suffix)]
+    return None
+
+
+def discard_sidecars(path: str) -> None:
+    """
+    Deletes any precompressed sidecars of a file that has just been replaced,
+    so a stale compressed copy is never served in its place.
+    """
+    for suffix in SIDECAR_SUFFIXES:
+        try:
+            os.remove(path + suffix)
+        except FileNotFoundError:
+            pass
+
+
+class DirectoryCreator:
+    """
+    Creates output directories at most once per build.
+
+    Every page write needs its parent directory to exist, but most pages share
+    a handful of directories; remembering the ones already created saves a
+    makedirs syscall round trip per file, which is costly on network filesystems.
+    Safe to share between writer threads.
+    """
+
+    def __init__(self):
+        self._created: set[str] = set()
+        self._lock = threading.Lock()
+
+    def ensure(self, dir_path: str) -> None:
+        if not dir_path or dir_path in self._created:
+            return
+
+        with self._lock:
+            if dir_path in self._created:
+                return
+            os.makedirs(dir_path, exist_ok=True)
+            self._created.add(dir_path)
+
+
+class AtomicFile:
+    """
+    Context manager that writes to a temporary file next to path and renames it
+    over path on success, so readers see either the old or the new file.
+
+    Replacing rather than truncating also means a destination hardlinked from
+    a previous release is never modified in place. With skip_unchanged, a
+    result identical to the existing file is discarded instead, leaving the
+    file and its mtime untouched; changed records which happened. Sidecars of
+    a replaced file are discarded. The temporary file is removed if the block
+    raises.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        mode: str = "wb",
+        encoding: str | None = None,
+        skip_unchanged: bool = False,
+    ):
+        self.path = path
+        self.mode = mode
+        self.encoding = encoding
+        self.skip_unchanged = skip_unchanged
+        self.changed = False
+        self._tmp_path = f"{path}.tmp-{os.getpid()}-{threading.get_ident()}"
+        self._file: IO | None = None
+
+    def __enter__(self) -> IO:
+        self._file = open(self._tmp_path, self.mode, encoding=self.encoding)
+        return self._file
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        try:
+            self._file.close()
+            if exc_type is not None:
+                return
+
+            if (
+                self.skip_unchanged
+                and os.path.isfile(self.path)
+                and filecmp.cmp(self._tmp_path, self.path, shallow=False)
+            ):
+                return
+
+            os.replace(self._tmp_path, self.path)
+            if sidecar_base(self.path) is None:
+                discard_sidecars(self.path)
+            self.changed = True
+        finally:
+            if os.path.exists(self._tmp_path):
+                os.remove(self._tmp_path)
+
+
+def open_atomic(
+    path: str, mode: str = "wb", encoding: str | None = None, skip_unchanged: bool = False
+) -> AtomicFile:
+    return AtomicFile(path, mode, encoding, skip_unchanged)
+
+
+def write_if_changed(path: str, data: bytes, known_hash: str | None = None) -> bool:
+    """
+    Atomically writes data to path unless the file already holds exactly data.
+
+    Args:
+        path: Destination file
+        data: New contents
+        known_hash: Hash of the current contents of path, if already known
+            (e.g. from the build manifest), which saves reading the file
+
+    Returns:
+        Whether the file was written
+    """
+    try:
+        size = os.stat(path).st_size
+    except OSError:
+        size = None
+
+    if size == len(data):
+        current_hash = known_hash if known_hash is not None else hash_file(path)
+        if current_hash == hash_bytes(data):
+            return False
+
+    with open_atomic(path) as file:
+        file.write(data)
+    return True
+
+
+def read_file(path: str) -> bytes:
+    with open(path, "rb") as file:
+        return file.read()
+
+
+def read_source(path: str) -> tuple[bytes, tuple[int, int]]:
+    """
+    Reads a file along with the (size, mtime_ns) it had when it was opened,
+    so a change saved while it is being processed is noticed next time.
+    """
+    with open(path, "rb") as file:
+        stat = os.fstat(file.fileno())
+        return file.read(), (stat.st_size, stat.st_mtime_ns)
+
+
+def prefetch_files(
+    paths: Iterable[str],
+    threads: int = 4,
+    window: int | None = None,
+    reader: Callable[[str], T] = read_file,
+) -> Iterator[tuple[str, T]]:
+    """
+    Reads files on a thread pool, yielding (path, contents) in the order given.
+
+    At most window reads are in flight or buffered ahead of the consumer, so
+    memory stays bounded however many paths there are.
+
+    Args:
+        paths: Files to read
+        threads: Number of reader threads
+        window: Maximum number of reads ahead of the consumer; defaults to
+            four per thread
+        reader: Reads one file, returning the contents yielded for it
+
+    Raises:
+        OSError: If a file cannot be read, when its turn to be yielded comes
+    """
+    window = window or threads * 4
+    paths = iter(paths)
+    pending: deque[tuple[str, Future]] = deque()
+
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        try:
+            for path in paths:
+                pending.append((path, executor.submit(reader, path)))
+                if len(pending) >= window:
+                    break
+
+            while pending:
+                path, future = pending.popleft()
+                next_path = next(paths, None)
+                if next_path is not None:
+                    pending.append((next_path, executor.submit(reader, next_path)))
+                yield path, future.result()
+        finally:
+            for _, future in pending:
+                future.cancel()
+
+
+class BatchWriter:
+    """
+    Writes output files on a thread pool in batches.
+
+    Writes are queued with write() and handed to the pool batch_size files at a
+    time, so the producer does not wait on disk or network latency until
+    max_pending batches are queued; it then blocks on the oldest batch, which
+    bounds the memory held by outputs waiting to be written. Files whose
+    contents are unchanged are left untouched. Parent directories are created
+    once per build through a shared DirectoryCreator. Errors are raised by
+    the write() that waits on the failed batch or by close(), which also waits
+    for all queued writes and totals the written and skipped counts; use the
+    writer as a context manager. Each file write is timed as a "write" stage
+    of profiler.
+    """
+
+    def __init__(
+        self,
+        threads: int = 4,
+        batch_size: int = 16,
+        directories: DirectoryCreator | None = None,
+        max_pending: int | None = None,
+        profiler: Profiler = NULL_PROFILER,
+    ):
+        self.batch_size = batch_size
+        self.directories = directories or DirectoryCreator()
+        self.max_pending = max_pending or threads * 2
+        self.profiler = profiler
+        self.written = 0
+        self.skipped = 0
+        self._batch: list[tuple[str, bytes, str | None]] = []
+        self._futures: deque[Future[tuple[int, int]]] = deque()
+        self._executor = ThreadPoolExecutor(max_workers=threads)
+
+    def write(self, path: str, data: bytes, known_hash: str | None = None) -> None:
+        self._batch.append((path, data, known_hash))
+        if len(self._batch) >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        if self._batch:
+            self._futures.append(self._executor.submit(self._write_batch, self._batch))
+            self._batch = []
+
+        while len(self._futures) > self.max_pending:
+            self._collect(self._futures.popleft())
+
+    def _collect(self, future: Future[tuple[int, int]]) -> None:
+        written, skipped = future.result()
+        self.written += written
+        self.skipped += skipped
+
+    def close(self) -> None:
+        """
+        Flushes queued writes and waits for them to finish.
+
+        Raises:
+            Exception: If any write failed, naming the first failing file
+        """
+        self.flush()
+        self._executor.shutdown(wait=True)
+
+        while self._futures:
+            self._collect(self._futures.popleft())
+
+    def _write_batch(self, batch: list[tuple[str, bytes, str | None]]) -> tuple[int, int]:
+        written = 0
+        for path, data, known_hash in batch:
+            try:
+                with self.profiler.stage("write", path):
+                    self.directories.ensure(os.path.dirname(path))
+                    written += write_if_changed(path, data, known_hash)
+            except OSError as err:
+                raise Exception(f"Failed to write {path}: {err}") from err
+        return written, len(batch) - written
+
+    def __enter__(self) -> "BatchWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self._executor.shutdown(wait=True, cancel_futures=True)
@@ -0,0 +1,164 @@
+import datetime
+import io
+import re
+from typing import Iterator
+
+# Opening and closing delimiter of each front matter style, mapped to the
+# separator between keys and values: YAML-style "---" and TOML-style "+++"
+DELIMITERS = {"---": ":", "+++": "="}
+
+# Fields recorded in page metadata; "title" is recorded too, falling back to
+# the first h1 of the body when the front matter has none
+PAGE_FIELDS = ("date", "template", "draft", "tags")
+
+_KEY = re.compile(r"[A-Za-z_][\w-]*")
+
+
+def _parse_scalar(value: str) -> str | bool:
+    if len(value) >= 2 and value[0] == value[-1] and value[0] in "\"'":
+        return value[1:-1]
+    if value in ("true", "false"):
+        return value == "true"
+    return value
+
+
+def _parse_value(value: str) -> str | bool | list:
+    if value.startswith("[") and value.endswith("]"):
+        items = value[1:-1].split(",")
+        return [_parse_scalar(item.strip()) for item in items if item.strip()]
+    return _parse_scalar(value)
+
+
+def _normalize_date(value) -> str:
+    """
+    Validates a front matter date, returning it as YYYY-MM-DD or, with a time,
+    as an RFC 3339 UTC timestamp.
+    """
+    text = str(value)
+    try:
+        if len(text) == 10:
+            return datetime.date.fromisoformat(text).isoformat()
+
+        moment = datetime.datetime.fromisoformat(text.replace("Z", "+00:00"))
+    except ValueError:
+        raise Exception(f"Invalid front matter date: {text!r}")
+
+    if moment.tzinfo is not None:
+        moment = moment.astimezone(datetime.timezone.utc)
+    return moment.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def _normalize(front_matter: dict) -> dict:
+    if "title" in front_matter:
+        front_matter["title"] = str(front_matter["title"])
+    if "date" in front_matter:
+        front_matter["date"] = _normalize_date(front_matter["date"])
+    if "template" in front_matter:
+        front_matter["template"] = str(front_matter["template"])
+    if "draft" in front_matter and not isinstance(front_matter["draft"], bool):
+        raise Exception(f"Invalid front matter draft flag: {front_matter['draft']!r}")
+    if "tags" in front_matter:
+        tags = front_matter["tags"]
+        if not isinstance(tags, list):
+            tags = [tags] if tags != "" else []
+        front_matter["tags"] = [str(tag) for tag in tags]
+    return front_matter
+
+
+def parse_front_matter(lines: Iterator[str]) -> tuple[dict, list[str]]:
+    """
+    Consumes a front matter header from the start of markdown lines.
+
+    The header is delimited by "---" lines with "key: value" entries or by
+    "+++" lines with "key = value" entries. Values may be quoted strings,
+    true or false, or [a, b] lists; YAML-style headers also accept lists of
+    "- item" lines under an empty key. Only the header is read, so the rest
+    of the iterator is left untouched.
+
+    A leading "---" is also a markdown thematic break, so lines are only
+    taken as front matter when the header is closed and every line in it is
+    blank or an entry. Otherwise the document has no front matter and every
+    line read is handed back to be parsed as markdown.
+
+    Args:
+        lines: Iterator of markdown lines, with or without trailing newlines
+
+    Returns:
+        The front matter, empty when there is none, and the lines consumed
+        that are not part of it, which must be replayed before the rest of
+        the iterator to parse the body
+
+    Raises:
+        Exception: If a date or draft flag in the header is invalid
+    """
+    first = next(lines, None)
+    if first is None:
+        return {}, []
+
+    delimiter = first.strip()
+    separator = DELIMITERS.get(delimiter)
+    if separator is None:
+        return {}, [first]
+
+    front_matter: dict = {}
+    list_key = None
+    consumed = [first]
+
+    for line in lines:
+        consumed.append(line)
+        stripped = line.strip()
+        if stripped == delimiter:
+            return _normalize(front_matter), []
+
+        if not stripped:
+            continue
+
+        if list_key is not None and stripped.startswith("- "):
+            front_matter[list_key].append(_parse_scalar(stripped[2:].strip()))
+            continue
+
+        key, found, value = stripped.partition(separator)
+        key, value = key.strip(), value.strip()
+        if not found or not _KEY.fullmatch(key):
+            return {}, consumed
+
+        list_key = None
+        if value == "" and separator == ":":
+            front_matter[key] = []
+            list_key = key
+        else:
+            front_matter[key] = _parse_value(value)
+
+    return {}, consumed
+
+
+def split_front_matter(markdown: str) -> tuple[dict, str]:
+    """
+    Separates the front matter of a markdown document from its body.
+
+    Returns:
+        The front matter, empty when there is none, and the markdown body
+    """
+    buffer = io.StringIO(markdown)
+    front_matter, replay = parse_front_matter(buffer)
+
+    if replay:
+        return front_matter, markdown
+    return front_matter, buffer.read()
+
+
+def read_front_matter(path: str) -> dict:
+    """
+    Reads the front matter of a markdown file without reading its body.
+
+    The file is read line by line and closed as soon as the header ends, so
+    only its first buffer of a few KB is read from disk for typical headers.
+
+    Raises:
+        Exception: If the front matter is malformed, naming the file
+    """
+    try:
+        with open(path, encoding="utf-8") as file:
+            return parse_front_matter(file)[0]
+    except Exception as err:
+        raise Exception(f"Failed to read front matter from {path}: {err}") from err
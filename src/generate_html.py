@@ -1,11 +1,56 @@
+import hashlib
+import io
+import itertools
 import os
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from functools import partial
+from typing import BinaryIO, Callable, Iterable, Iterator, TextIO
 
-from .block_markdown import markdown_to_blocks, markdown_to_html_node
+from .block_markdown import (
+    Reference,
+    iter_markdown_html,
+    markdown_to_html_node,
+    scan_blocks,
+)
+from .block_cache import BlockCache
+from .file_io import (
+    BatchWriter,
+    discard_sidecars,
+    open_atomic,
+    prefetch_files,
+    read_source,
+    write_if_changed,
+)
+from .front_matter import (
+    PAGE_FIELDS,
+    parse_front_matter,
+    read_front_matter,
+    split_front_matter,
+)
+from .links import LinkIndex
+from .manifest import BuildManifest, hash_bytes, hash_file
+from .metadata import MetadataStore
+from .profiling import NULL_PROFILER, Profiler
+from .template import Template, TemplateLoader, TemplateValue, load_template
+
+_worker_block_cache: BlockCache | None = None
+
+# Most pages handed to a worker process at once by the I/O pipeline, so a
+# bounded number of sources and outputs are held in memory at a time
+RENDER_BATCH_SIZE = 16
+
+# A page rendered to bytes: (source hash, source (size, mtime_ns) when read,
+# output, profiler events, references, metadata, block cache entries added)
+RenderedPage = tuple[
+    str, tuple[int, int], bytes, list[dict], list[Reference], dict, list[tuple]
+]
 
 
 def extract_title(markdown: str) -> str:
     """
-    Extracts the first header (h1) from markdown text.
+    Extracts the first header (h1) from markdown text, scanning blocks only
+    until it is found.
 
     Args:
         markdown: Input markdown string
@@ -16,15 +61,394 @@ def extract_title(markdown: str) -> str:
     Raises:
         Exception: If no header is found in the markdown
     """
-    blocks = markdown_to_blocks(markdown)
+    return read_title(io.StringIO(markdown))[0]
+
+
+def read_title(lines: Iterator[str]) -> tuple[str, list[str]]:
+    """
+    Consumes markdown lines only until the first h1 block is found.
+
+    Args:
+        lines: Iterator of markdown lines
+
+    Returns:
+        The h1 text and the lines consumed so far, which must be replayed
+        before the rest of the iterator to parse the full document
+
+    Raises:
+        Exception: If no header is found in the markdown
+    """
+    consumed: list[str] = []
+
+    def recording() -> Iterator[str]:
+        for line in lines:
+            consumed.append(line)
+            yield line
 
-    for block in blocks:
-        if block.startswith("#") and len(block) > 1 and block[1] == " ":
-            return block.split(" ", 1)[1].strip()
+    for _, block_lines in scan_blocks(recording()):
+        if block_lines[0].startswith("# "):
+            return "\n".join(block_lines).split(" ", 1)[1].strip(), consumed
 
     raise Exception("No header!")
 
 
+def write_page_stream(
+    fp: TextIO,
+    lines: Iterable[str],
+    template: Template,
+    block_cache: BlockCache | None = None,
+    refs: list[Reference] | None = None,
+    meta: dict | None = None,
+) -> None:
+    """
+    Streams a markdown document given as a line iterator (such as an open file)
+    into a template, emitting each block's HTML as soon as it is parsed.
+
+    Memory use is bounded by the largest block and the lines preceding the
+    first h1, independent of document size.
+
+    Args:
+        fp: Writable text buffer or file
+        lines: Markdown lines, with or without trailing newlines
+        template: Compiled template using {{ Title }} and {{ Content }} placeholders
+        block_cache: Optional cache of rendered HTML for previously seen blocks
+        refs: Optional list the page's links and images are appended to
+        meta: Optional dict the page's "title", "words" and front matter fields
+            are stored in; the word count is complete once the page is written
+    """
+    lines = iter(lines)
+    front_matter, consumed = parse_front_matter(lines)
+    lines = itertools.chain(consumed, lines)
+
+    extracted_title = front_matter.get("title")
+    if extracted_title is None:
+        extracted_title, consumed = read_title(lines)
+        lines = itertools.chain(consumed, lines)
+
+    if meta is not None:
+        _store_meta(meta, front_matter, extracted_title)
+        meta["words"] = 0
+        lines = _counting_words(lines, meta)
+
+    content = iter_markdown_html(lines, block_cache, template.minify, refs)
+
+    template.write(fp, _template_context(front_matter, extracted_title, content))
+
+
+def _template_context(
+    front_matter: dict, title: str, content: TemplateValue
+) -> dict[str, TemplateValue]:
+    """
+    Returns a page's template context: each front matter field under its own
+    name, lists joined with commas and flags as true or false, then Title and
+    Content, which take precedence over fields of the same name.
+    """
+    context: dict[str, TemplateValue] = {}
+    for key, value in front_matter.items():
+        if isinstance(value, list):
+            value = ", ".join(str(item) for item in value)
+        elif isinstance(value, bool):
+            value = "true" if value else "false"
+        context[key] = str(value)
+
+    context["Title"] = title
+    context["Content"] = content
+    return context
+
+
+def _store_meta(meta: dict, front_matter: dict, title: str) -> None:
+    meta["title"] = title
+    for field in PAGE_FIELDS:
+        if field in front_matter:
+            meta[field] = front_matter[field]
+
+
+def _counting_words(lines: Iterable[str], meta: dict) -> Iterator[str]:
+    for line in lines:
+        meta["words"] += len(line.split())
+        yield line
+
+
+def write_page(
+    fp: TextIO,
+    markdown: str,
+    template: Template,
+    profiler: Profiler = NULL_PROFILER,
+    page: str | None = None,
+    block_cache: BlockCache | None = None,
+    refs: list[Reference] | None = None,
+    meta: dict | None = None,
+) -> None:
+    """
+    Streams a markdown document rendered into a template to a writable text file.
+
+    The page body is serialized chunk by chunk between the template segments
+    instead of being built up as one string.
+
+    Args:
+        fp: Writable text buffer or file
+        markdown: Input markdown string
+        template: Compiled template using {{ Title }} and {{ Content }} placeholders
+        profiler: Optional profiler; when enabled the body is rendered to a string
+            first so that to_html, template substitution and writing can be
+            timed as separate stages
+        page: Page name attached to profiler events
+        block_cache: Optional cache of rendered HTML for previously seen blocks
+        refs: Optional list the page's links and images are appended to
+        meta: Optional dict the page's "title", "words" and front matter fields
+            are stored in
+    """
+    context = _parse_page(markdown, template, profiler, page, block_cache, refs, meta)
+
+    if not profiler.enabled:
+        template.write(fp, context)
+        return
+
+    html = _render_staged(context, template, profiler, page)
+
+    with profiler.stage("write", page):
+        fp.write(html)
+
+
+def render_page(
+    markdown: str,
+    template: Template,
+    profiler: Profiler = NULL_PROFILER,
+    page: str | None = None,
+    block_cache: BlockCache | None = None,
+    refs: list[Reference] | None = None,
+    meta: dict | None = None,
+) -> str:
+    """
+    Renders a markdown document into a template.
+
+    Args:
+        markdown: Input markdown string
+        template: Compiled template using {{ Title }} and {{ Content }} placeholders
+        profiler: Optional profiler recording per-stage timings
+        page: Page name attached to profiler events
+        block_cache: Optional cache of rendered HTML for previously seen blocks
+        refs: Optional list the page's links and images are appended to
+        meta: Optional dict the page's "title", "words" and front matter fields
+            are stored in
+
+    Returns:
+        The complete HTML page
+    """
+    context = _parse_page(markdown, template, profiler, page, block_cache, refs, meta)
+
+    if not profiler.enabled:
+        return template.render(context)
+    return _render_staged(context, template, profiler, page)
+
+
+def _parse_page(
+    markdown: str,
+    template: Template,
+    profiler: Profiler,
+    page: str | None,
+    block_cache: BlockCache | None,
+    refs: list[Reference] | None,
+    meta: dict | None,
+) -> dict[str, TemplateValue]:
+    """
+    Parses a page's front matter, title and body, returning the template
+    context with its body as an HTMLNode.
+    """
+    with profiler.stage("extract_title", page):
+        front_matter, markdown = split_front_matter(markdown)
+        extracted_title = front_matter.get("title")
+        if extracted_title is None:
+            extracted_title = extract_title(markdown)
+
+    if meta is not None:
+        _store_meta(meta, front_matter, extracted_title)
+        meta["words"] = len(markdown.split())
+
+    with profiler.stage("markdown_to_html_node", page):
+        html_node = markdown_to_html_node(markdown, block_cache, template.minify, refs)
+
+    return _template_context(front_matter, extracted_title, html_node)
+
+
+def _render_staged(
+    context: dict[str, TemplateValue],
+    template: Template,
+    profiler: Profiler,
+    page: str | None,
+) -> str:
+    with profiler.stage("to_html", page):
+        context["Content"] = context["Content"].to_html(template.minify)
+
+    with profiler.stage("template", page):
+        return template.render(context)
+
+
+def _init_worker(block_cache_items: list[tuple] | None) -> None:
+    """
+    Seeds a worker process's block cache with the entries of the parent's
+    cache, which were loaded from its persistent store.
+    """
+    global _worker_block_cache
+
+    if block_cache_items is not None:
+        _worker_block_cache = BlockCache(track_new=True)
+        _worker_block_cache.update(block_cache_items)
+
+
+def _worker_pool(jobs: int, block_cache: BlockCache | None) -> ProcessPoolExecutor:
+    return ProcessPoolExecutor(
+        max_workers=jobs,
+        initializer=_init_worker,
+        initargs=(block_cache.items() if block_cache is not None else None,),
+    )
+
+
+def _render_source(
+    src_path: str,
+    template: Template,
+    profile: bool = False,
+    cache_blocks: bool = False,
+    source: tuple[bytes, tuple[int, int]] | None = None,
+) -> RenderedPage:
+    """
+    Reads and renders a single markdown file, returning its source hash and the
+    (size, mtime_ns) the source had when read, its output, any profiler events
+    recorded along the way, the links and images it refers to, its metadata and
+    the block cache entries it added. When the source was already read by the
+    I/O pipeline it is passed in, with its stat, and not read again.
+
+    Runs inside worker processes in parallel builds, so failures are re-raised
+    with the source path attached. With cache_blocks, each worker keeps its own
+    in-memory block cache for the lifetime of the process, seeded from the
+    parent's cache; blocks it renders are returned so the parent can add them
+    to its cache and persist them.
+    """
+    global _worker_block_cache
+
+    profiler = Profiler(enabled=profile)
+
+    if cache_blocks and _worker_block_cache is None:
+        _worker_block_cache = BlockCache(track_new=True)
+    block_cache = _worker_block_cache if cache_blocks else None
+    refs: list[Reference] = []
+    meta: dict = {}
+
+    try:
+        with profiler.stage("page", src_path):
+            if source is None:
+                with profiler.stage("read", src_path):
+                    source = read_source(src_path)
+            data, source_stat = source
+
+            html = render_page(
+                data.decode(), template, profiler, src_path, block_cache, refs, meta
+            )
+
+        return (
+            hash_bytes(data),
+            source_stat,
+            html.encode(),
+            profiler.events,
+            refs,
+            meta,
+            block_cache.take_new() if block_cache is not None else [],
+        )
+    except Exception as err:
+        raise Exception(f"Failed to generate page from {src_path}: {err}") from err
+
+
+def _render_prefetched(
+    src_path: str,
+    source: tuple[bytes, tuple[int, int]],
+    template: Template,
+    profile: bool = False,
+    cache_blocks: bool = False,
+) -> RenderedPage:
+    return _render_source(src_path, template, profile, cache_blocks, source)
+
+
+def _generate_source(
+    src_path: str,
+    dest_path: str,
+    template: Template,
+    profiler: Profiler = NULL_PROFILER,
+    block_cache: BlockCache | None = None,
+    refs: list[Reference] | None = None,
+    meta: dict | None = None,
+) -> tuple[str, tuple[int, int], bool]:
+    """
+    Reads a single markdown file and streams its rendered page straight to disk,
+    returning the source hash, the (size, mtime_ns) the source had when read
+    and whether the output changed. An output
+    identical to the existing file is discarded, leaving the file untouched.
+    The page's links and images are appended to refs and its metadata stored
+    in meta when given.
+    """
+    try:
+        with profiler.stage("page", src_path):
+            with profiler.stage("read", src_path):
+                source, source_stat = read_source(src_path)
+
+            os.makedirs(os.path.dirname(dest_path), exist_ok=True)
+
+            output = open_atomic(dest_path, "w", encoding="utf-8", skip_unchanged=True)
+            with output as output_file:
+                write_page(
+                    output_file,
+                    source.decode(),
+                    template,
+                    profiler,
+                    src_path,
+                    block_cache,
+                    refs,
+                    meta,
+                )
+
+        return hash_bytes(source), source_stat, output.changed
+    except Exception as err:
+        raise Exception(f"Failed to generate page from {src_path}: {err}") from err
+
+
+def _stream_source(
+    src_path: str,
+    dest_path: str,
+    template: Template,
+    profiler: Profiler = NULL_PROFILER,
+    block_cache: BlockCache | None = None,
+    refs: list[Reference] | None = None,
+    meta: dict | None = None,
+) -> tuple[str, tuple[int, int], bool]:
+    """
+    Streams a single markdown file line by line into its rendered page on disk,
+    hashing the source as it is read. Returns the source hash, the (size,
+    mtime_ns) the source had when opened and whether the output changed;
+    identical output leaves the existing file untouched. The page's links and
+    images are appended to refs and its metadata stored in meta when given.
+    """
+    digest = hashlib.sha256()
+
+    def decoded_lines(file: BinaryIO) -> Iterator[str]:
+        for raw_line in file:
+            digest.update(raw_line)
+            yield raw_line.decode()
+
+    try:
+        with profiler.stage("page", src_path):
+            os.makedirs(os.path.dirname(dest_path), exist_ok=True)
+
+            output = open_atomic(dest_path, "w", encoding="utf-8", skip_unchanged=True)
+            with open(src_path, "rb") as file, output as output_file:
+                stat = os.fstat(file.fileno())
+                write_page_stream(
+                    output_file, decoded_lines(file), template, block_cache, refs, meta
+                )
+
+        return digest.hexdigest(), (stat.st_size, stat.st_mtime_ns), output.changed
+    except Exception as err:
+        raise Exception(f"Failed to generate page from {src_path}: {err}") from err
+
+
 def generate_page(from_path: str, template_path: str, dest_path: str) -> None:
     """
     Generates a single HTML page from markdown using a template.
@@ -35,77 +459,595 @@ def generate_page(from_path: str, template_path: str, dest_path: str) -> None:
         dest_path: Destination path for generated HTML
 
     Notes:
-        Template should contain {{ Title }} and {{ Content }} placeholders
+        Template should contain {{ Title }} and {{ Content }} placeholders;
+        front matter fields such as {{ date }} are available too
     """
     print(f"Generating page from {from_path} to {dest_path} using {template_path}")
 
     with open(from_path) as file:
         markdown = file.read()
 
-    extracted_title = extract_title(markdown)
-    converted_md = markdown_to_html_node(markdown)
-
-    with open(template_path) as template_file:
-        template_content = template_file.read()
-
-    html = template_content.replace("{{ Title }}", extracted_title).replace(
-        "{{ Content }}", converted_md.to_html()
-    )
+    template = load_template(template_path)
 
     if dest_path:
         dir_path = os.path.dirname(dest_path)
         os.makedirs(dir_path, exist_ok=True)
 
         with open(dest_path, "w") as output_file:
-            output_file.write(html)
+            write_page(output_file, markdown, template)
+
+
+def page_destination(src_path: str, dest_dir_path: str) -> str:
+    """
+    Maps a markdown path relative to the content directory to its HTML output path.
+    """
+    return os.path.join(dest_dir_path, os.path.splitext(src_path)[0] + ".html")
+
+
+def find_markdown_files(dir_path_content: str, dest_dir_path: str) -> list[tuple[str, str]]:
+    """
+    Recursively collects markdown sources and their destination HTML paths.
+
+    Args:
+        dir_path_content: Source directory containing markdown files
+        dest_dir_path: Destination directory for generated HTML files
 
+    Returns:
+        List of (source path, destination path) tuples in directory walk order
+    """
+    pages = []
+
+    for file_name in os.listdir(dir_path_content):
+        src_item = os.path.join(dir_path_content, file_name)
+
+        if os.path.isfile(src_item) and os.path.splitext(src_item)[1] == ".md":
+            pages.append((src_item, page_destination(file_name, dest_dir_path)))
 
-def generate_pages_recursive(dir_path_content: str, template_path: str, dest_dir_path: str) -> None:
+        elif os.path.isdir(src_item):
+            dst_dir = os.path.join(dest_dir_path, file_name)
+            pages.extend(find_markdown_files(src_item, dst_dir))
+
+    return pages
+
+
+def generate_pages_recursive(
+    dir_path_content: str,
+    template_path: str,
+    dest_dir_path: str,
+    manifest: BuildManifest | None = None,
+    jobs: int = 1,
+    profiler: Profiler = NULL_PROFILER,
+    block_cache: BlockCache | None = None,
+    stream: bool = False,
+    io_threads: int = 0,
+    on_output: Callable[[str], None] | None = None,
+    minify: bool = False,
+    link_index: LinkIndex | None = None,
+    metadata: MetadataStore | None = None,
+    drafts: bool = False,
+    template_loader: TemplateLoader | None = None,
+) -> dict[str, int]:
     """
     Recursively converts markdown files in a directory to HTML pages.
 
+    Each page is rendered with the template named by its front matter, else
+    the nearest template.html in its content directory or a parent of it,
+    else the default template. Pages are skipped as fresh per template, so
+    editing a layout or partial only re-renders the pages whose template uses
+    it.
+
     Args:
         dir_path_content: Source directory containing markdown files
-        template_path: Path to HTML template file
+        template_path: Path to the default HTML template file
         dest_dir_path: Destination directory for generated HTML files
+        manifest: Optional build manifest; pages whose source, template and
+            output are unchanged since the last recorded build are skipped,
+            and entries for removed sources are dropped
+        jobs: Number of worker processes used to parse and render pages;
+            outputs are always written in directory walk order
+        profiler: Optional profiler recording per-stage and per-page timings,
+            including those recorded in worker processes
+        block_cache: Optional cache of rendered block HTML; worker processes
+            in parallel builds are seeded with its entries and the blocks they
+            render are added back to it
+        stream: Parse each source from a line iterator and write its HTML
+            incrementally, keeping memory bounded for very large documents
+        io_threads: Number of threads reading sources ahead of rendering and
+            writing outputs behind it; 0 does all I/O inline, streaming each
+            page to disk as it is serialized instead of buffering it whole
+        on_output: Called with the destination path of every page once it is
+            up to date on disk, including pages that were fresh
+        minify: Compile minified templates and serialize pages compactly;
+            ignored when a template_loader is given, whose setting is used
+        link_index: Optional index updated with the links and images of every
+            rendered page; pages it has no entry for are never skipped as
+            fresh, and entries for removed sources are dropped
+        metadata: Optional store updated with the metadata of every rendered
+            page, maintained like link_index; pages whose recorded source hash
+            differs from the manifest's, such as those rendered without the
+            store, are never skipped as fresh either
+        drafts: Render pages whose front matter sets draft: true. Otherwise
+            they are found by reading only their front matter, and neither
+            parsed nor rendered; any output they had is deleted. Drafts left
+            fresh by an earlier build with drafts are only found again when
+            they are recorded in metadata
+        template_loader: Loader compiling each template once for the build,
+            resolving named templates, layouts and partials; one without a
+            templates directory is created when not given
+
+    Returns:
+        Counts of pages "written", rendered but "skipped" because the output
+        was unchanged, not rendered at all because they were "fresh", and
+        left out as "drafts"
 
     Raises:
         FileNotFoundError: If source directory doesn't exist
+        Exception: If a page fails to render, naming the failing source file
 
     Notes:
         Maintains directory structure in output
         Only processes .md files
-        Template should contain {{ Title }} and {{ Content }} placeholders
+        Template should contain {{ Title }} and {{ Content }} placeholders;
+        front matter fields such as {{ date }} are available too
     """
     if not os.path.exists(dir_path_content):
         raise FileNotFoundError(f"Source directory {dir_path_content} does not exist.")
 
-    for file_name in os.listdir(dir_path_content):
-        src_item = os.path.join(dir_path_content, file_name)
+    loader = template_loader or TemplateLoader(minify=minify)
+    headers: dict[str, dict] = {}
 
-        if os.path.isfile(src_item) and os.path.splitext(src_item)[1] == ".md":
-            base_name = os.path.splitext(file_name)[0]
-            dst_item = os.path.join(dest_dir_path, base_name + ".html")
+    def front_matter(src_item: str) -> dict:
+        if src_item not in headers:
+            headers[src_item] = read_front_matter(src_item)
+        return headers[src_item]
 
-            with open(src_item) as file:
-                markdown = file.read()
+    with profiler.stage("load_template"):
+        template = loader.load(template_path)
 
-            extracted_title = extract_title(markdown)
-            extracted_html_content = markdown_to_html_node(markdown).to_html()
+    with profiler.stage("find_pages"):
+        all_pages = find_markdown_files(dir_path_content, dest_dir_path)
 
-            with open(template_path) as template_file:
-                template_content = template_file.read()
+        # Pages recorded in metadata are matched to the template they named
+        # when last rendered; a changed source is never fresh anyway
+        templates = {}
+        for src_item, _ in all_pages:
+            if metadata is not None and src_item in metadata:
+                name = metadata.entries[src_item]["template"]
+            else:
+                name = front_matter(src_item).get("template")
+            templates[src_item] = loader.for_page(
+                src_item, dir_path_content, template_path, name
+            )
 
-            html = template_content.replace("{{ Title }}", extracted_title).replace(
-                "{{ Content }}", extracted_html_content
+        pages = [
+            (src_item, dst_item)
+            for src_item, dst_item in all_pages
+            if manifest is None
+            or (link_index is not None and src_item not in link_index)
+            or (metadata is not None and src_item not in metadata)
+            or (
+                not drafts
+                and metadata is not None
+                and metadata.entries[src_item]["draft"]
+            )
+            or (
+                metadata is not None
+                and metadata.entries[src_item]["hash"]
+                != manifest.entries.get(src_item, {}).get("source_hash")
             )
+            or not manifest.is_fresh(src_item, dst_item, templates[src_item].hash)
+        ]
 
-            dir_path = os.path.dirname(dst_item)
-            os.makedirs(dir_path, exist_ok=True)
+    draft_items = set()
+    with profiler.stage("front_matter"):
+        for src_item, dst_item in pages:
+            header = front_matter(src_item)
+            if not drafts and header.get("draft", False):
+                draft_items.add(src_item)
+                remove_output(dst_item)
+                if manifest is not None:
+                    manifest.forget(src_item)
+            else:
+                templates[src_item] = loader.for_page(
+                    src_item, dir_path_content, template_path, header.get("template")
+                )
+        pages = [page for page in pages if page[0] not in draft_items]
 
-            with open(dst_item, "w") as output_file:
-                output_file.write(html)
+    src_items = {src_item for src_item, _ in all_pages} - draft_items
+    if manifest is not None:
+        manifest.prune(src_items)
+    if link_index is not None:
+        link_index.prune(src_items)
+    if metadata is not None:
+        metadata.prune(src_items)
 
-        elif os.path.isdir(src_item):
-            dst_dir = os.path.join(dest_dir_path, file_name)
-            generate_pages_recursive(src_item, template_path, dst_dir)
+    stats = generate_pages(
+        pages,
+        template,
+        manifest,
+        jobs,
+        profiler,
+        block_cache,
+        stream,
+        io_threads,
+        on_output,
+        link_index,
+        metadata,
+        templates,
+    )
+    stats["drafts"] = len(draft_items)
+    stats["fresh"] = len(all_pages) - len(pages) - len(draft_items)
+
+    if on_output is not None and stats["fresh"]:
+        rendered = {dst_item for _, dst_item in pages}
+        for src_item, dst_item in all_pages:
+            if dst_item not in rendered and src_item not in draft_items:
+                on_output(dst_item)
+
+    return stats
+
+
+def remove_output(dest_path: str) -> None:
+    """
+    Deletes a page's output and its compressed sidecars, along with its
+    directory if that is left empty.
+    """
+    if not os.path.exists(dest_path):
+        return
+
+    os.remove(dest_path)
+    discard_sidecars(dest_path)
+    try:
+        os.rmdir(os.path.dirname(dest_path))
+    except OSError:
+        pass
+
+
+def generate_pages(
+    pages: list[tuple[str, str]],
+    template: Template,
+    manifest: BuildManifest | None = None,
+    jobs: int = 1,
+    profiler: Profiler = NULL_PROFILER,
+    block_cache: BlockCache | None = None,
+    stream: bool = False,
+    io_threads: int = 0,
+    on_output: Callable[[str], None] | None = None,
+    link_index: LinkIndex | None = None,
+    metadata: MetadataStore | None = None,
+    page_templates: dict[str, Template] | None = None,
+) -> dict[str, int]:
+    """
+    Renders an explicit list of markdown sources to their destination paths.
+
+    Args:
+        pages: (source path, destination path) tuples to render
+        template: Compiled page template, used for pages without their own
+        manifest: Optional build manifest updated with each rendered page
+        jobs: Number of worker processes used to parse and render pages;
+            outputs are always written in the order given
+        profiler: Optional profiler recording per-stage and per-page timings
+        block_cache: Optional cache of rendered block HTML; worker processes
+            in parallel builds are seeded with its entries and the blocks they
+            render are added back to it
+        stream: Parse each source from a line iterator and write its HTML
+            incrementally; pages are then rendered one at a time in this
+            process so that memory stays bounded
+        io_threads: Number of threads in the reader pool that prefetches
+            sources and in the writer pool that writes outputs in batches;
+            0 does all I/O inline. Overlapping I/O means each page is rendered
+            into memory whole before it is queued, whereas inline I/O streams
+            it to disk as it is serialized, which holds less per page but
+            waits on every read and write. Ignored when streaming
+        on_output: Called with each destination path once its page is
+            written or found unchanged
+        link_index: Optional index updated with each page's links and images,
+            collected while the page is parsed
+        metadata: Optional store updated with each page's metadata, also
+            collected while the page is rendered
+        page_templates: Templates for individual pages, keyed by source path
+
+    Returns:
+        Counts of pages "written" and "skipped"; a page is skipped when its
+        rendered output is identical to the file already on disk, which is
+        then left untouched so its mtime and any hardlinks survive
+
+    Raises:
+        Exception: If a page fails to render, naming the failing source file
+    """
+    page_templates = page_templates or {}
+    templates = [page_templates.get(src_item, template) for src_item, _ in pages]
+    stats = {"written": 0, "skipped": 0}
+
+    if stream:
+        for (src_item, dst_item), page_template in zip(pages, templates):
+            refs: list[Reference] = []
+            meta: dict = {}
+            source_hash, source_stat, changed = _stream_source(
+                src_item, dst_item, page_template, profiler, block_cache, refs, meta
+            )
+            stats["written" if changed else "skipped"] += 1
+
+            if manifest is not None:
+                manifest.record(
+                    src_item,
+                    dst_item,
+                    page_template.hash,
+                    source_hash,
+                    hash_file(dst_item),
+                    source_stat,
+                )
+            if link_index is not None:
+                link_index.record(src_item, refs)
+            if metadata is not None:
+                metadata.record(src_item, source_hash, meta)
+            if on_output is not None:
+                on_output(dst_item)
+        return stats
+
+    if io_threads > 0:
+        return _generate_pipelined(
+            pages,
+            templates,
+            manifest,
+            jobs,
+            profiler,
+            block_cache,
+            io_threads,
+            on_output,
+            link_index,
+            metadata,
+        )
+
+    if jobs > 1 and len(pages) > 1:
+        render = partial(
+            _render_source,
+            profile=profiler.enabled,
+            cache_blocks=block_cache is not None,
+        )
+        src_items = [src_item for src_item, _ in pages]
+        chunksize = max(1, len(pages) // (jobs * 4))
+
+        with _worker_pool(jobs, block_cache) as executor:
+            rendered = executor.map(render, src_items, templates, chunksize=chunksize)
+
+            for (src_item, dst_item), page_template, rendered_page in zip(
+                pages, templates, rendered
+            ):
+                source_hash, source_stat, output, events, refs, meta, blocks = (
+                    rendered_page
+                )
+                profiler.merge(events)
+                if block_cache is not None:
+                    block_cache.update(blocks)
+
+                with profiler.stage("write_output", src_item):
+                    dir_path = os.path.dirname(dst_item)
+                    os.makedirs(dir_path, exist_ok=True)
+
+                    known_hash = None
+                    if manifest is not None:
+                        known_hash = manifest.output_hash(src_item, dst_item)
+
+                    changed = write_if_changed(dst_item, output, known_hash)
+                    stats["written" if changed else "skipped"] += 1
+
+                if manifest is not None:
+                    manifest.record(
+                        src_item,
+                        dst_item,
+                        page_template.hash,
+                        source_hash,
+                        hash_bytes(output),
+                        source_stat,
+                    )
+                if link_index is not None:
+                    link_index.record(src_item, refs)
+                if metadata is not None:
+                    metadata.record(src_item, source_hash, meta)
+                if on_output is not None:
+                    on_output(dst_item)
+        return stats
+
+    for (src_item, dst_item), page_template in zip(pages, templates):
+        refs = []
+        meta = {}
+        source_hash, source_stat, changed = _generate_source(
+            src_item, dst_item, page_template, profiler, block_cache, refs, meta
+        )
+        stats["written" if changed else "skipped"] += 1
+
+        if manifest is not None:
+            manifest.record(
+                src_item,
+                dst_item,
+                page_template.hash,
+                source_hash,
+                hash_file(dst_item),
+                source_stat,
+            )
+        if link_index is not None:
+            link_index.record(src_item, refs)
+        if metadata is not None:
+            metadata.record(src_item, source_hash, meta)
+        if on_output is not None:
+            on_output(dst_item)
+
+    return stats
+
+
+def _generate_pipelined(
+    pages: list[tuple[str, str]],
+    templates: list[Template],
+    manifest: BuildManifest | None,
+    jobs: int,
+    profiler: Profiler,
+    block_cache: BlockCache | None,
+    io_threads: int,
+    on_output: Callable[[str], None] | None = None,
+    link_index: LinkIndex | None = None,
+    metadata: MetadataStore | None = None,
+) -> dict[str, int]:
+    """
+    Renders pages with I/O overlapped with rendering: a reader pool prefetches
+    sources, rendering runs in this process or a worker pool, and a writer pool
+    writes the changed outputs in batches, creating each output directory once.
+    Each page is rendered with the template at the same position in templates.
+
+    Every stage is bounded: sources are read a window ahead of rendering, the
+    worker pool is fed a few batches at a time as sources arrive, and the
+    writer blocks rendering once enough batches are waiting to be written.
+    """
+
+    def read(src_path: str) -> tuple[bytes, tuple[int, int]]:
+        with profiler.stage("read", src_path):
+            return read_source(src_path)
+
+    sources = prefetch_files([src_item for src_item, _ in pages], io_threads, reader=read)
+
+    with BatchWriter(io_threads, profiler=profiler) as writer:
+        if jobs > 1 and len(pages) > 1:
+            render = partial(
+                _render_prefetched,
+                profile=profiler.enabled,
+                cache_blocks=block_cache is not None,
+            )
+            batch_size = max(1, min(len(pages) // (jobs * 4), RENDER_BATCH_SIZE))
+
+            with _worker_pool(jobs, block_cache) as executor:
+                rendered = _map_windowed(
+                    executor,
+                    render,
+                    (
+                        (src_item, source, page_template)
+                        for (src_item, source), page_template in zip(sources, templates)
+                    ),
+                    batch_size,
+                    window=jobs * 2,
+                )
+                written = _write_rendered(
+                    pages, rendered, writer, manifest, profiler, block_cache
+                )
+        else:
+            rendered = (
+                _render_inline(src_item, source, page_template, profiler, block_cache)
+                for (src_item, source), page_template in zip(sources, templates)
+            )
+            written = _write_rendered(pages, rendered, writer, manifest, profiler)
+
+    for written_page, page_template in zip(written, templates):
+        src_item, dst_item, source_hash, source_stat, output_hash, refs, meta = (
+            written_page
+        )
+        if manifest is not None:
+            manifest.record(
+                src_item,
+                dst_item,
+                page_template.hash,
+                source_hash,
+                output_hash,
+                source_stat,
+            )
+        if link_index is not None:
+            link_index.record(src_item, refs)
+        if metadata is not None:
+            metadata.record(src_item, source_hash, meta)
+        if on_output is not None:
+            on_output(dst_item)
+
+    return {"written": writer.written, "skipped": writer.skipped}
+
+
+def _render_batch(render: Callable, batch: list[tuple]) -> list[RenderedPage]:
+    return [render(*args) for args in batch]
+
+
+def _map_windowed(
+    executor: ProcessPoolExecutor,
+    render: Callable,
+    args: Iterable[tuple],
+    batch_size: int,
+    window: int,
+) -> Iterator[RenderedPage]:
+    """
+    Maps render over argument tuples on a process pool, yielding results in
+    order like executor.map. Unlike executor.map, which submits every task up
+    front, args is consumed lazily: at most window batches of batch_size are
+    in flight, and a new batch is only pulled once the oldest one is done.
+    """
+    args = iter(args)
+    pending: deque[Future] = deque()
+
+    def submit() -> bool:
+        batch = list(itertools.islice(args, batch_size))
+        if batch:
+            pending.append(executor.submit(_render_batch, render, batch))
+        return bool(batch)
+
+    while len(pending) < window and submit():
+        pass
+
+    while pending:
+        results = pending.popleft().result()
+        submit()
+        yield from results
+
+
+def _render_inline(
+    src_path: str,
+    source: tuple[bytes, tuple[int, int]],
+    template: Template,
+    profiler: Profiler,
+    block_cache: BlockCache | None,
+) -> RenderedPage:
+    data, source_stat = source
+    refs: list[Reference] = []
+    meta: dict = {}
+    try:
+        with profiler.stage("page", src_path):
+            html = render_page(
+                data.decode(), template, profiler, src_path, block_cache, refs, meta
+            )
+    except Exception as err:
+        raise Exception(f"Failed to generate page from {src_path}: {err}") from err
+
+    return hash_bytes(data), source_stat, html.encode(), [], refs, meta, []
+
+
+def _write_rendered(
+    pages: list[tuple[str, str]],
+    rendered: Iterable[RenderedPage],
+    writer: BatchWriter,
+    manifest: BuildManifest | None,
+    profiler: Profiler,
+    block_cache: BlockCache | None = None,
+) -> list[tuple[str, str, str, tuple[int, int], str, list[Reference], dict]]:
+    """
+    Queues rendered outputs on the writer, returning (source, destination,
+    source hash, source stat, output hash, references, metadata) for each page
+    so the manifest can be updated once the writes have landed. Block cache
+    entries rendered by worker processes are added to block_cache.
+    """
+    written = []
+    for (src_item, dst_item), rendered_page in zip(pages, rendered):
+        source_hash, source_stat, output, events, refs, meta, blocks = rendered_page
+        profiler.merge(events)
+        if block_cache is not None:
+            block_cache.update(blocks)
+        known_hash = None
+        if manifest is not None:
+            known_hash = manifest.output_hash(src_item, dst_item)
+
+        writer.write(dst_item, output, known_hash)
+        written.append(
+            (
+                src_item,
+                dst_item,
+                source_hash,
+                source_stat,
+                hash_bytes(output),
+                refs,
+                meta,
+            )
+        )
+    return written
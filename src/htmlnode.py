@@ -1,4 +1,10 @@
-from functools import reduce
+import re
+from typing import Iterator, TextIO
+
+# Elements whose text is rendered with its whitespace intact
+PRESERVE_WHITESPACE_TAGS = frozenset(("pre", "code", "textarea", "script", "style"))
+
+_WHITESPACE = re.compile(r"\s+")
 
 
 class HTMLNode:
@@ -6,6 +12,8 @@ class HTMLNode:
     Represents an HTML node with a tag, value, children, and properties.
     """
 
+    __slots__ = ("tag", "value", "children", "props")
+
     def __init__(
         self,
         tag: str | None = None,
@@ -18,16 +26,27 @@ class HTMLNode:
         self.children = children
         self.props = props
 
-    def to_html(self):
+    def to_html(self, compact: bool = False) -> str:
+        return "".join(self.iter_html(compact))
+
+    def iter_html(self, compact: bool = False) -> Iterator[str]:
+        """
+        Yields the node's HTML in chunks without building the full string.
+
+        With compact, runs of whitespace in text are collapsed to a single
+        space, except inside elements in PRESERVE_WHITESPACE_TAGS.
+        """
         raise NotImplementedError
 
+    def write_html(self, fp: TextIO, compact: bool = False) -> None:
+        """
+        Streams the node's HTML into a writable text buffer or file.
+        """
+        fp.writelines(self.iter_html(compact))
+
     def props_to_html(self) -> str:
         if self.props is not None:
-            return reduce(
-                lambda acc, item: acc + f' {item[0]}="{item[1]}"',
-                self.props.items(),
-                "",
-            )
+            return "".join(f' {key}="{value}"' for key, value in self.props.items())
         return ""
 
     def __repr__(self) -> str:
@@ -39,6 +58,8 @@ class ParentNode(HTMLNode):
     Represents a parent HTML node with a tag, children, and properties.
     """
 
+    __slots__ = ()
+
     def __init__(
         self,
         tag: str,
@@ -47,18 +68,19 @@ class ParentNode(HTMLNode):
     ):
         super().__init__(tag, None, children, props)
 
-    def to_html(self) -> str:
+    def iter_html(self, compact: bool = False) -> Iterator[str]:
         if self.tag is None:
             raise ValueError("Invalid ParentNode: must have a tag")
 
         if self.children is None or len(self.children) == 0:
             raise ValueError("Invalid ParentNode: must have children")
 
-        result = ""
-        for child in self.children:
-            result += child.to_html()
+        compact = compact and self.tag not in PRESERVE_WHITESPACE_TAGS
 
-        return f"<{self.tag}>{result}</{self.tag}>"
+        yield f"<{self.tag}>"
+        for child in self.children:
+            yield from child.iter_html(compact)
+        yield f"</{self.tag}>"
 
     def __repr__(self) -> str:
         return f"ParentNode({self.tag}, children: {self.children}, {self.props})"
@@ -69,22 +91,49 @@ class LeafNode(HTMLNode):
     Represents a leaf HTML node with a tag, value, and properties.
     """
 
+    __slots__ = ()
+
     def __init__(
         self, tag: str | None, value: str, props: dict[str, str] | None = None
     ):
         super().__init__(tag, value, None, props)
 
-    def to_html(self) -> str:
+    def to_html(self, compact: bool = False) -> str:
         if self.value is None:
             raise ValueError("Invalid HTML: All leaf nodes must have a value")
 
+        value = self.value
+        if compact and self.tag not in PRESERVE_WHITESPACE_TAGS:
+            value = _WHITESPACE.sub(" ", value)
+
         if self.tag is None:
-            return self.value
+            return value
 
         if self.tag == "img":
             return f"<{self.tag}{self.props_to_html()}>"
 
-        return f"<{self.tag}{self.props_to_html()}>{self.value}</{self.tag}>"
+        return f"<{self.tag}{self.props_to_html()}>{value}</{self.tag}>"
+
+    def iter_html(self, compact: bool = False) -> Iterator[str]:
+        yield self.to_html(compact)
 
     def __repr__(self) -> str:
         return f"LeafNode({self.tag}, {self.value}, {self.props})"
+
+
+class RawHTMLNode(LeafNode):
+    """
+    Represents markup that was already rendered, such as a cached block, and is
+    emitted verbatim.
+    """
+
+    __slots__ = ()
+
+    def __init__(self, html: str):
+        super().__init__(None, html)
+
+    def to_html(self, compact: bool = False) -> str:
+        return self.value
+
+    def __repr__(self) -> str:
+        return f"RawHTMLNode({self.value})"
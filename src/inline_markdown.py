@@ -2,6 +2,12 @@ import re
 
 from .textnode import TextNode, TextType
 
+_IMAGE = r"!\[(?P<alt>[^\[\]]*)\]\((?P<src>[^()]*)\)"
+_LINK = r"\[(?P<anchor>[^\[\]]*)\]\((?P<href>[^()]*)\)"
+
+_IMAGE_PATTERN = re.compile(_IMAGE)
+_LINK_PATTERN = re.compile(rf"(?<!!){_LINK}")
+
 
 def split_nodes_delimiter(
     old_nodes: list[TextNode], delimiter: str, text_type: TextType
@@ -29,20 +35,20 @@ def split_nodes_delimiter(
 
 
 def extract_markdown_images(text: str) -> list[tuple[str, str]]:
-    alt_text: list[str] = re.findall(r"!\[(.*?)\]", text)
-    url: list[str] = re.findall(r"\((.*?)\)", text)
-
-    return list(zip(alt_text, url))
+    return [match.groups() for match in _IMAGE_PATTERN.finditer(text)]
 
 
 def extract_markdown_links(text: str) -> list[tuple[str, str]]:
-    anchor_text: list[str] = re.findall(r"\[(.*?)\]", text)
-    url: list[str] = re.findall(r"\((.*?)\)", text)
-
-    return list(zip(anchor_text, url))
+    return [match.groups() for match in _LINK_PATTERN.finditer(text)]
 
 
-def split_nodes_image(old_nodes: list[TextNode]) -> list:
+def _split_nodes_pattern(
+    old_nodes: list[TextNode], pattern: re.Pattern, text_type: TextType
+) -> list[TextNode]:
+    """
+    Splits TEXT nodes around every match of an image or link pattern, slicing
+    the text by match spans so each node is scanned exactly once.
+    """
     result = []
 
     for node in old_nodes:
@@ -51,62 +57,81 @@ def split_nodes_image(old_nodes: list[TextNode]) -> list:
             continue
 
         text = node.text
-        image_tuples = extract_markdown_images(text)
+        pos = 0
+
+        for match in pattern.finditer(text):
+            if match.start() > pos:
+                result.append(TextNode(text[pos : match.start()], TextType.TEXT))
+            result.append(TextNode(match[1], text_type, match[2]))
+            pos = match.end()
 
-        if len(image_tuples) == 0:
+        if pos == 0:
             result.append(node)
-        else:
-            for image_alt, image_url in image_tuples:
-                sections = text.split(f"![{image_alt}]({image_url})")
-                if len(sections) != 2:
-                    raise Exception("Invalid Markdown: image section not closed")
-
-                if sections[0] != "":
-                    result.append(TextNode(sections[0], TextType.TEXT))
-                result.append(TextNode(image_alt, TextType.IMAGE, image_url))
-                text = sections[1]
-
-            if text != "":
-                result.append(TextNode(text, TextType.TEXT))
+        elif pos < len(text):
+            result.append(TextNode(text[pos:], TextType.TEXT))
 
     return result
 
 
-def split_nodes_link(old_nodes: list[TextNode]):
+def split_nodes_image(old_nodes: list[TextNode]) -> list[TextNode]:
+    return _split_nodes_pattern(old_nodes, _IMAGE_PATTERN, TextType.IMAGE)
+
+
+def split_nodes_link(old_nodes: list[TextNode]) -> list[TextNode]:
+    return _split_nodes_pattern(old_nodes, _LINK_PATTERN, TextType.LINK)
+
+
+_INLINE_TOKEN = re.compile(
+    rf"(?P<image>{_IMAGE})|(?P<link>{_LINK})|(?P<delimiter>\*\*|\*|`)"
+)
+
+_DELIMITER_TYPES = {
+    "**": TextType.BOLD,
+    "*": TextType.ITALIC,
+    "`": TextType.CODE,
+}
+
+
+def tokenize_inline(text: str) -> list[TextNode]:
+    """
+    Scans inline markdown once from left to right, emitting TextNodes for
+    images, links, bold, italic and code spans as they are found.
+
+    Delimited spans are taken literally up to their closing delimiter, so
+    markup inside code or bold text is not reinterpreted.
+    """
     result = []
+    pos = 0
 
-    for node in old_nodes:
-        if node.text_type != TextType.TEXT:
-            result.append(node)
+    while (match := _INLINE_TOKEN.search(text, pos)) is not None:
+        if match.start() > pos:
+            result.append(TextNode(text[pos : match.start()], TextType.TEXT))
+
+        delimiter = match.group("delimiter")
+
+        if delimiter is None:
+            if match.group("image") is not None:
+                result.append(TextNode(match["alt"], TextType.IMAGE, match["src"]))
+            else:
+                result.append(TextNode(match["anchor"], TextType.LINK, match["href"]))
+            pos = match.end()
             continue
 
-        text = node.text
-        link_tuples = extract_markdown_links(text)
+        close = text.find(delimiter, match.end())
+        if close == -1:
+            raise Exception("Invalid Markdown: Missing closing delimiter")
 
-        if len(link_tuples) == 0:
-            result.append(node)
-        else:
-            for link_text, link_url in link_tuples:
-                sections = text.split(f"[{link_text}]({link_url})")
-                if len(sections) != 2:
-                    raise Exception("Invalid Markdown: link section not closed")
-
-                if sections[0] != "":
-                    result.append(TextNode(sections[0], TextType.TEXT))
-                result.append(TextNode(link_text, TextType.LINK, link_url))
-                text = sections[1]
-
-            if text != "":
-                result.append(TextNode(text, TextType.TEXT))
+        if close > match.end():
+            result.append(
+                TextNode(text[match.end() : close], _DELIMITER_TYPES[delimiter])
+            )
+        pos = close + len(delimiter)
+
+    if pos < len(text):
+        result.append(TextNode(text[pos:], TextType.TEXT))
 
     return result
 
 
 def text_to_textnodes(text: str) -> list[TextNode]:
-    nodes = [TextNode(text, TextType.TEXT)]
-    nodes = split_nodes_image(nodes)
-    nodes = split_nodes_link(nodes)
-    nodes = split_nodes_delimiter(nodes, "**", TextType.BOLD)
-    nodes = split_nodes_delimiter(nodes, "*", TextType.ITALIC)
-    nodes = split_nodes_delimiter(nodes, "`", TextType.CODE)
-    return nodes
+    return tokenize_inline(text)
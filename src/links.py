@@ -0,0 +1,173 @@
+import itertools
+import json
+import os
+import posixpath
+from typing import Iterable
+from urllib.parse import unquote, urljoin, urlsplit
+
+from .block_markdown import Reference
+
+# A reference that does not resolve: (source path, "link" or "image", target URL)
+BrokenReference = tuple[str, str, str]
+
+
+def page_url(rel_path: str) -> str:
+    """
+    Maps a markdown path relative to the content directory to the URL path of
+    its generated page.
+    """
+    return "/" + os.path.splitext(rel_path)[0].replace(os.sep, "/") + ".html"
+
+
+def url_aliases(url: str) -> list[str]:
+    """
+    Returns the URL paths under which the file at url is served: itself and,
+    for index pages, its directory with and without a trailing slash.
+    """
+    if posixpath.basename(url) != "index.html":
+        return [url]
+
+    directory = posixpath.dirname(url)
+    if directory == "/":
+        return [url, "/"]
+    return [url, directory + "/", directory]
+
+
+def static_urls(static_dir: str) -> set[str]:
+    """
+    Returns the URL paths of every file under static_dir, as copied to the site.
+    """
+    urls = set()
+
+    for dir_path, _, file_names in os.walk(static_dir):
+        rel_dir = os.path.relpath(dir_path, static_dir)
+        for file_name in file_names:
+            rel_path = os.path.normpath(os.path.join(rel_dir, file_name))
+            urls.add("/" + rel_path.replace(os.sep, "/"))
+
+    return urls
+
+
+def resolve_target(base_url: str, target: str) -> str | None:
+    """
+    Resolves a link target found on the page at base_url to a site URL path.
+
+    Returns None for targets outside the site, such as absolute URLs with a
+    scheme or host and mailto: links, and for links to a fragment of the same
+    page. Query strings and fragments are dropped and escapes decoded.
+    """
+    parts = urlsplit(target)
+    if parts.scheme or parts.netloc or not parts.path:
+        return None
+
+    path = urlsplit(urljoin(base_url, parts.path)).path
+    normalized = posixpath.normpath(unquote(path))
+    if path.endswith("/") and normalized != "/":
+        normalized += "/"
+    return normalized
+
+
+class LinkIndex:
+    """
+    Persistent index of the links and images each page refers to.
+
+    Entries are keyed by source path and hold the references collected while
+    the page was parsed, so pages skipped as fresh keep theirs without being
+    read again. Targets are resolved against a set of the site's URL paths,
+    one lookup per reference.
+    """
+
+    VERSION = 1
+
+    def __init__(self, path: str | None = None):
+        self.path = path
+        self.entries: dict[str, list[Reference]] = {}
+        if path is not None:
+            self.load()
+
+    def __contains__(self, src_path: str) -> bool:
+        return src_path in self.entries
+
+    def load(self) -> None:
+        """
+        Loads entries from disk, starting empty if the index is missing,
+        unreadable or written by a different version.
+        """
+        try:
+            with open(self.path) as file:
+                data = json.load(file)
+        except (OSError, ValueError):
+            return
+
+        if data.get("version") == self.VERSION:
+            self.entries = {
+                src_path: [(kind, url) for kind, url in refs]
+                for src_path, refs in data.get("entries", {}).items()
+            }
+
+    def save(self) -> None:
+        """
+        Writes the index to disk atomically. Does nothing without a path.
+        """
+        if self.path is None:
+            return
+
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = self.path + ".tmp"
+
+        with open(tmp_path, "w") as file:
+            json.dump({"version": self.VERSION, "entries": self.entries}, file)
+
+        os.replace(tmp_path, self.path)
+
+    def record(self, src_path: str, refs: list[Reference]) -> None:
+        self.entries[src_path] = list(refs)
+
+    def forget(self, src_path: str) -> None:
+        """
+        Drops the entry for a source that no longer exists.
+        """
+        self.entries.pop(src_path, None)
+
+    def prune(self, src_paths: set[str]) -> None:
+        """
+        Drops entries for sources no longer in src_paths.
+        """
+        for src_path in list(self.entries):
+            if src_path not in src_paths:
+                del self.entries[src_path]
+
+    def broken(
+        self,
+        content_dir: str,
+        static_dir: str | None = None,
+        extra_urls: Iterable[str] = (),
+    ) -> list[BrokenReference]:
+        """
+        Finds references to site URLs that no page or static file is served at.
+
+        Args:
+            content_dir: Content directory the indexed sources are under
+            static_dir: Directory of static files copied into the site
+            extra_urls: URL paths of other generated files, such as feeds
+
+        Returns:
+            Broken references in source path order
+        """
+        page_urls = {
+            src_path: page_url(os.path.relpath(src_path, content_dir))
+            for src_path in self.entries
+        }
+
+        targets = static_urls(static_dir) if static_dir is not None else set()
+        for url in itertools.chain(page_urls.values(), extra_urls):
+            targets.update(url_aliases(url))
+
+        broken = []
+        for src_path in sorted(self.entries):
+            for kind, url in self.entries[src_path]:
+                resolved = resolve_target(page_urls[src_path], url)
+                if resolved is not None and resolved not in targets:
+                    broken.append((src_path, kind, url))
+
+        return broken
@@ -1,20 +1,388 @@
+import argparse
 import os
+import shutil
+import threading
+from contextlib import nullcontext
 
-from .copy_static import copy_static_files
-from .generate_html import generate_pages_recursive
+from .aggregates import generate_aggregates
+from .assets import AssetManifest, fingerprint_assets
+from .block_cache import BlockCache
+from .copy_static import copy_static_files, sync_static_files
+from .generate_html import find_markdown_files, generate_pages_recursive
+from .links import LinkIndex
+from .manifest import BuildManifest
+from .metadata import MetadataStore
+from .minify import CssMinifier
+from .precompress import Precompressor
+from .profiling import Profiler
+from .publish import current_release, publish_release, stage_release
+from .server import PORT, LiveReload, make_server
+from .template import TemplateLoader
+from .watch import watch
 
 
-def main():
-    project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Build the static site into public/")
+    parser.add_argument(
+        "--root",
+        default=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        help=(
+            "project directory containing content/, static/, template.html "
+            "and optionally templates/"
+        ),
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=1,
+        help="number of worker processes for page generation (0 = one per CPU)",
+    )
+    parser.add_argument(
+        "--io-threads",
+        type=int,
+        default=0,
+        help=(
+            "threads prefetching sources and writing pages behind rendering; each "
+            "page is then held in memory whole (default 0: inline I/O that "
+            "streams pages to disk as they are serialized)"
+        ),
+    )
+    parser.add_argument(
+        "--clean",
+        action="store_true",
+        help="wipe public/ and rebuild everything instead of syncing changes",
+    )
+    parser.add_argument(
+        "--atomic",
+        action="store_true",
+        help="build into a staged release and atomically switch public/ to it",
+    )
+    parser.add_argument(
+        "--keep-releases",
+        type=int,
+        default=2,
+        help="number of staged releases kept by --atomic, including the live one",
+    )
+    parser.add_argument(
+        "--precompress",
+        action="store_true",
+        help="write .gz (and .br/.zst when available) sidecars for text outputs",
+    )
+    parser.add_argument(
+        "--minify",
+        action="store_true",
+        help="collapse whitespace in pages and the template and minify stylesheets",
+    )
+    parser.add_argument(
+        "--fingerprint",
+        action="store_true",
+        help=(
+            "also copy stylesheets, scripts, images and fonts under content-hashed "
+            "names and point pages and the template at them"
+        ),
+    )
+    parser.add_argument(
+        "--drafts",
+        action="store_true",
+        help="render pages whose front matter sets draft: true",
+    )
+    parser.add_argument(
+        "--site-url",
+        default="",
+        help=(
+            "absolute URL the site is served from; sitemap.xml and the blog feed "
+            "are only generated when it is given"
+        ),
+    )
+    parser.add_argument(
+        "--author",
+        default="",
+        help="author named in the blog feed (default: the host of --site-url)",
+    )
+    parser.add_argument(
+        "--checksum",
+        action="store_true",
+        help="compare static files by content hash instead of size and mtime",
+    )
+    parser.add_argument(
+        "--link",
+        action="store_true",
+        help="hardlink static files into public/ instead of copying them",
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="parse and write pages incrementally with bounded memory (serial)",
+    )
+    parser.add_argument(
+        "--no-block-cache",
+        dest="block_cache",
+        action="store_false",
+        help="disable the persistent cache of rendered markdown blocks",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        default=bool(os.environ.get("SSG_PROFILE")),
+        help="print per-stage timings and the slowest pages (or set SSG_PROFILE=1)",
+    )
+    parser.add_argument(
+        "--trace",
+        help="write a Chrome trace JSON of the build to this path (implies --profile)",
+    )
+    parser.add_argument(
+        "--slowest",
+        type=int,
+        default=10,
+        help="number of slowest pages listed in the profile summary",
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="after building, serve public/ and rebuild affected files on change",
+    )
+    parser.add_argument(
+        "--port",
+        type=int,
+        default=PORT,
+        help="dev server port used by --watch",
+    )
+    parser.add_argument(
+        "--poll",
+        action="store_true",
+        help="watch for changes by polling instead of inotify",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None):
+    args = parse_args(argv)
+    jobs = args.jobs or os.cpu_count() or 1
+
+    project_root = os.path.abspath(args.root)
 
     static_dir = os.path.join(project_root, "static")
     public_dir = os.path.join(project_root, "public")
     template_path = os.path.join(project_root, "template.html")
+    templates_dir = os.path.join(project_root, "templates")
+    if not os.path.isdir(templates_dir):
+        templates_dir = None
     content_path = os.path.join(project_root, "content")
-    output_path = os.path.join(public_dir)
+    manifest_path = os.path.join(project_root, ".cache", "build-manifest.json")
+    block_cache_path = os.path.join(project_root, ".cache", "block-cache.json")
+    css_cache_path = os.path.join(project_root, ".cache", "css-cache.json")
+    link_index_path = os.path.join(project_root, ".cache", "link-index.json")
+    metadata_path = os.path.join(project_root, ".cache", "page-metadata.json")
+    assets_path = os.path.join(project_root, ".cache", "asset-manifest.json")
+
+    profiler = Profiler(enabled=args.profile or bool(args.trace))
+
+    with profiler.stage("build"):
+        with profiler.stage("load_manifest"):
+            manifest = BuildManifest(manifest_path)
+            link_index = LinkIndex(link_index_path)
+            metadata = MetadataStore(metadata_path)
+            asset_manifest = AssetManifest(assets_path) if args.fingerprint else None
+
+        block_cache = None
+        if args.block_cache:
+            with profiler.stage("load_block_cache"):
+                block_cache = BlockCache(path=block_cache_path)
+
+        css_minifier = None
+        if args.minify:
+            css_minifier = CssMinifier(BlockCache(max_entries=1000, path=css_cache_path))
+
+        build_dir = public_dir
+        if args.atomic:
+            with profiler.stage("stage_release"):
+                previous = current_release(public_dir)
+                build_dir = stage_release(public_dir, reuse=not args.clean)
+                if previous is not None:
+                    manifest.relocate(previous, build_dir)
+
+        try:
+            precompressor = (
+                Precompressor(manifest, threads=os.cpu_count() or 1)
+                if args.precompress
+                else nullcontext()
+            )
+            with precompressor:
+                on_output = precompressor.add if args.precompress else None
+
+                static_stats = None
+                with profiler.stage("copy_static"):
+                    if args.clean and not args.atomic:
+                        copy_static_files(static_dir, build_dir, on_output, css_minifier)
+                    else:
+                        pages = {
+                            dst for _, dst in find_markdown_files(content_path, build_dir)
+                        }
+                        pages.update(
+                            os.path.join(build_dir, rel_path)
+                            for rel_path in metadata.aggregates
+                        )
+                        if asset_manifest is not None:
+                            pages.update(asset_manifest.paths(build_dir))
+                        static_stats = sync_static_files(
+                            static_dir,
+                            build_dir,
+                            keep=pages,
+                            checksum=args.checksum,
+                            link=args.link,
+                            on_output=on_output,
+                            css_minifier=css_minifier,
+                        )
+
+                asset_stats = None
+                if asset_manifest is not None:
+                    with profiler.stage("fingerprint_assets"):
+                        asset_stats = fingerprint_assets(
+                            static_dir,
+                            build_dir,
+                            asset_manifest,
+                            css_minifier,
+                            on_output,
+                        )
+
+                template_loader = TemplateLoader(
+                    templates_dir,
+                    args.minify,
+                    asset_manifest.urls() if asset_manifest is not None else None,
+                )
+
+                page_stats = generate_pages_recursive(
+                    content_path,
+                    template_path,
+                    build_dir,
+                    manifest,
+                    jobs=jobs,
+                    profiler=profiler,
+                    block_cache=block_cache,
+                    stream=args.stream,
+                    io_threads=args.io_threads,
+                    on_output=on_output,
+                    minify=args.minify,
+                    link_index=link_index,
+                    metadata=metadata,
+                    drafts=args.drafts,
+                    template_loader=template_loader,
+                )
+
+                with profiler.stage("aggregates"):
+                    aggregate_stats = generate_aggregates(
+                        metadata,
+                        content_path,
+                        build_dir,
+                        template_loader.load(template_path),
+                        args.site_url,
+                        on_output,
+                        args.author,
+                    )
+
+                if args.precompress:
+                    with profiler.stage("precompress"):
+                        precompressor.close()
+        except BaseException:
+            if build_dir != public_dir:
+                shutil.rmtree(build_dir, ignore_errors=True)
+            raise
+
+        if args.atomic:
+            with profiler.stage("publish_release"):
+                publish_release(build_dir, public_dir, args.keep_releases)
+
+        with profiler.stage("check_links"):
+            broken_refs = link_index.broken(
+                content_path,
+                static_dir,
+                ("/" + rel_path for rel_path in metadata.aggregates),
+            )
+
+        with profiler.stage("save_manifest"):
+            manifest.save()
+            link_index.save()
+            metadata.save()
+            if asset_manifest is not None:
+                asset_manifest.save()
+
+        if block_cache is not None:
+            with profiler.stage("save_block_cache"):
+                block_cache.save()
+
+        if css_minifier is not None:
+            css_minifier.cache.save()
+
+    summary = (
+        f"pages: {page_stats['written']} written, {page_stats['skipped']} unchanged, "
+        f"{page_stats['fresh']} up to date"
+    )
+    if page_stats["drafts"]:
+        summary += f", {page_stats['drafts']} drafts skipped"
+    summary += (
+        f"; aggregates: {aggregate_stats['written']} written, "
+        f"{aggregate_stats['skipped'] + aggregate_stats['fresh']} up to date"
+    )
+    if static_stats is not None:
+        summary += (
+            f"; static: {static_stats['copied']} copied, "
+            f"{static_stats['skipped']} unchanged, {static_stats['removed']} removed"
+        )
+    if asset_stats is not None:
+        summary += (
+            f"; fingerprinted: {asset_stats['written']} written, "
+            f"{asset_stats['fresh']} up to date, {asset_stats['removed']} removed"
+        )
+    if args.precompress:
+        summary += (
+            f"; precompressed: {precompressor.compressed} compressed, "
+            f"{precompressor.skipped} up to date"
+        )
+    print(summary)
+
+    if broken_refs:
+        print(f"broken references: {len(broken_refs)}")
+        for src_path, kind, url in broken_refs:
+            print(f"  {os.path.relpath(src_path, content_path)}: {kind} {url}")
+
+    if profiler.enabled:
+        print(profiler.summary(args.slowest))
+
+    if args.trace:
+        profiler.write_trace(args.trace)
+
+    if args.watch:
+        live_reload = LiveReload()
+        httpd = make_server(public_dir, args.port, live_reload)
+        threading.Thread(target=httpd.serve_forever, daemon=True).start()
+        print("serving on port:", args.port)
 
-    copy_static_files(static_dir, public_dir)
-    generate_pages_recursive(content_path, template_path, output_path)
+        try:
+            watch(
+                content_path,
+                static_dir,
+                template_path,
+                public_dir,
+                manifest,
+                jobs,
+                live_reload,
+                args.poll,
+                minify=args.minify,
+                templates_dir=templates_dir,
+                link_index=link_index,
+                metadata=metadata,
+                site_url=args.site_url,
+                author=args.author,
+                drafts=args.drafts,
+                asset_manifest=asset_manifest,
+                template_files=template_loader.files,
+            )
+        except KeyboardInterrupt:
+            pass
+        finally:
+            httpd.shutdown()
+            httpd.server_close()
 
 
 if __name__ == "__main__":
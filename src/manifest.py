@@ -0,0 +1,226 @@
+import hashlib
+import json
+import os
+
+
+def hash_bytes(data: bytes) -> str:
+    """
+    Returns the hex sha256 digest of the given bytes.
+    """
+    return hashlib.sha256(data).hexdigest()
+
+
+def hash_file(path: str) -> str:
+    """
+    Returns the hex sha256 digest of a file's contents, read in chunks.
+    """
+    digest = hashlib.sha256()
+
+    with open(path, "rb") as file:
+        for chunk in iter(lambda: file.read(1 << 16), b""):
+            digest.update(chunk)
+
+    return digest.hexdigest()
+
+
+class BuildManifest:
+    """
+    Persistent record of the pages produced by previous builds.
+
+    Entries are keyed by source path and store the source, template and output
+    hashes along with the stat results used to avoid rehashing unchanged files.
+    Sidecars are keyed by output path and record the size and mtime each output
+    had when its precompressed sidecars were produced.
+    """
+
+    VERSION = 1
+
+    def __init__(self, path: str):
+        self.path = path
+        self.entries: dict[str, dict] = {}
+        self.sidecars: dict[str, dict] = {}
+        self.load()
+
+    def load(self) -> None:
+        """
+        Loads entries from disk, starting empty if the manifest is missing,
+        unreadable or written by a different version.
+        """
+        try:
+            with open(self.path) as file:
+                data = json.load(file)
+        except (OSError, ValueError):
+            return
+
+        if data.get("version") == self.VERSION:
+            self.entries = data.get("entries", {})
+            self.sidecars = data.get("sidecars", {})
+
+    def save(self) -> None:
+        """
+        Writes the manifest to disk atomically.
+        """
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = self.path + ".tmp"
+
+        with open(tmp_path, "w") as file:
+            json.dump(
+                {"version": self.VERSION, "entries": self.entries, "sidecars": self.sidecars},
+                file,
+            )
+
+        os.replace(tmp_path, self.path)
+
+    def is_fresh(self, src_path: str, dest_path: str, template_hash: str) -> bool:
+        """
+        Checks whether the output for a source is up to date.
+
+        A page is fresh when it was last rendered to the same destination with
+        the same template, its output is still on disk untouched, and its source
+        either has the same size and mtime or the same content hash.
+        """
+        entry = self.entries.get(src_path)
+        if entry is None:
+            return False
+
+        if entry["dest"] != dest_path or entry["template_hash"] != template_hash:
+            return False
+
+        try:
+            dest_stat = os.stat(dest_path)
+            src_stat = os.stat(src_path)
+        except OSError:
+            return False
+
+        if (dest_stat.st_size, dest_stat.st_mtime_ns) != (
+            entry["output_size"],
+            entry["output_mtime_ns"],
+        ):
+            return False
+
+        if (src_stat.st_size, src_stat.st_mtime_ns) == (
+            entry["source_size"],
+            entry["source_mtime_ns"],
+        ):
+            return True
+
+        if hash_file(src_path) != entry["source_hash"]:
+            return False
+
+        entry["source_size"] = src_stat.st_size
+        entry["source_mtime_ns"] = src_stat.st_mtime_ns
+        return True
+
+    def output_hash(self, src_path: str, dest_path: str) -> str | None:
+        """
+        Returns the recorded hash of a page's output if the file on disk is
+        still the one recorded, so it can be compared without being read.
+        """
+        entry = self.entries.get(src_path)
+        if entry is None or entry["dest"] != dest_path:
+            return None
+
+        try:
+            dest_stat = os.stat(dest_path)
+        except OSError:
+            return None
+
+        if (dest_stat.st_size, dest_stat.st_mtime_ns) != (
+            entry["output_size"],
+            entry["output_mtime_ns"],
+        ):
+            return None
+
+        return entry["output_hash"]
+
+    def relocate(self, old_dir: str, new_dir: str) -> None:
+        """
+        Moves recorded destinations under old_dir to the same relative paths
+        under new_dir, for builds staged in a fresh copy of the previous output.
+        """
+        prefix = os.path.join(old_dir, "")
+        for entry in self.entries.values():
+            if entry["dest"].startswith(prefix):
+                entry["dest"] = os.path.join(new_dir, entry["dest"][len(prefix) :])
+
+        for path in list(self.sidecars):
+            if path.startswith(prefix):
+                new_path = os.path.join(new_dir, path[len(prefix) :])
+                self.sidecars[new_path] = self.sidecars.pop(path)
+
+    def sidecars_fresh(self, path: str, encoders: list[str]) -> bool:
+        """
+        Checks whether sidecars for the given encoder suffixes were last
+        produced from the file as it is now on disk and still exist. Files too
+        small to compress are fresh with no sidecars at all.
+        """
+        record = self.sidecars.get(path)
+        if record is None or not set(encoders) <= set(record["encoders"]):
+            return False
+
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return False
+
+        if (stat.st_size, stat.st_mtime_ns) != (record["size"], record["mtime_ns"]):
+            return False
+
+        return all(os.path.exists(path + suffix) for suffix in record["suffixes"])
+
+    def record_sidecars(
+        self, path: str, size: int, mtime_ns: int, encoders: list[str], suffixes: list[str]
+    ) -> None:
+        self.sidecars[path] = {
+            "size": size,
+            "mtime_ns": mtime_ns,
+            "encoders": encoders,
+            "suffixes": suffixes,
+        }
+
+    def forget(self, src_path: str) -> None:
+        """
+        Drops the entry for a source that no longer exists.
+        """
+        self.entries.pop(src_path, None)
+
+    def prune(self, src_paths: set[str]) -> None:
+        """
+        Drops entries for sources no longer in src_paths.
+        """
+        for src_path in list(self.entries):
+            if src_path not in src_paths:
+                del self.entries[src_path]
+
+    def record(
+        self,
+        src_path: str,
+        dest_path: str,
+        template_hash: str,
+        source_hash: str,
+        output_hash: str,
+        source_stat: tuple[int, int] | None = None,
+    ) -> None:
+        """
+        Records a freshly rendered page. Must be called after the output is written.
+
+        source_stat is the (size, mtime_ns) the source had when it was read to
+        compute source_hash. Without it the source is stat'ed now, so an edit
+        saved since it was read would be recorded with the old hash and the
+        page would never be found stale.
+        """
+        if source_stat is None:
+            src_stat = os.stat(src_path)
+            source_stat = (src_stat.st_size, src_stat.st_mtime_ns)
+        dest_stat = os.stat(dest_path)
+
+        self.entries[src_path] = {
+            "dest": dest_path,
+            "template_hash": template_hash,
+            "source_hash": source_hash,
+            "source_size": source_stat[0],
+            "source_mtime_ns": source_stat[1],
+            "output_hash": output_hash,
+            "output_size": dest_stat.st_size,
+            "output_mtime_ns": dest_stat.st_mtime_ns,
+        }
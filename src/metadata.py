@@ -0,0 +1,118 @@
+import json
+import os
+import time
+
+
+def utc_timestamp(seconds: float | None = None) -> str:
+    """
+    Formats a POSIX time (now by default) as an RFC 3339 UTC timestamp.
+    """
+    return time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(seconds))
+
+
+class MetadataStore:
+    """
+    Persistent record of each page's metadata, collected while it is rendered.
+
+    Entries are keyed by source path and hold the page's title, front matter
+    date, tags, template and draft flag, word count, source hash and the time
+    its content last changed, so listings such as the sitemap and feeds can be
+    produced without reading any sources. Aggregates are keyed by output path relative to the
+    site root and record a fingerprint of the metadata they were generated from.
+    """
+
+    VERSION = 2
+
+    def __init__(self, path: str | None = None):
+        self.path = path
+        self.entries: dict[str, dict] = {}
+        self.aggregates: dict[str, str] = {}
+        if path is not None:
+            self.load()
+
+    def __contains__(self, src_path: str) -> bool:
+        return src_path in self.entries
+
+    def load(self) -> None:
+        """
+        Loads entries from disk, starting empty if the store is missing,
+        unreadable or written by a different version.
+        """
+        try:
+            with open(self.path) as file:
+                data = json.load(file)
+        except (OSError, ValueError):
+            return
+
+        if data.get("version") == self.VERSION:
+            self.entries = data.get("entries", {})
+            self.aggregates = data.get("aggregates", {})
+
+    def save(self) -> None:
+        """
+        Writes the store to disk atomically. Does nothing without a path.
+        """
+        if self.path is None:
+            return
+
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = self.path + ".tmp"
+
+        with open(tmp_path, "w") as file:
+            json.dump(
+                {
+                    "version": self.VERSION,
+                    "entries": self.entries,
+                    "aggregates": self.aggregates,
+                },
+                file,
+            )
+
+        os.replace(tmp_path, self.path)
+
+    def record(self, src_path: str, source_hash: str, meta: dict) -> bool:
+        """
+        Records the metadata of a freshly rendered page.
+
+        Args:
+            src_path: Source path of the page
+            source_hash: Hash of the page's source
+            meta: Metadata collected while rendering: "title" and "words", and
+                "date", "tags", "template" and "draft" when the page's front
+                matter declares them
+
+        Returns:
+            Whether the page is new or its metadata changed
+        """
+        previous = self.entries.get(src_path)
+
+        updated = utc_timestamp()
+        if previous is not None and previous["hash"] == source_hash:
+            updated = previous["updated"]
+
+        entry = {
+            "title": meta.get("title", ""),
+            "date": meta.get("date"),
+            "tags": list(meta.get("tags", [])),
+            "template": meta.get("template"),
+            "draft": meta.get("draft", False),
+            "words": meta.get("words", 0),
+            "hash": source_hash,
+            "updated": updated,
+        }
+        self.entries[src_path] = entry
+        return entry != previous
+
+    def forget(self, src_path: str) -> None:
+        """
+        Drops the entry for a source that no longer exists.
+        """
+        self.entries.pop(src_path, None)
+
+    def prune(self, src_paths: set[str]) -> None:
+        """
+        Drops entries for sources no longer in src_paths.
+        """
+        for src_path in list(self.entries):
+            if src_path not in src_paths:
+                del self.entries[src_path]
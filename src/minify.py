@@ -0,0 +1,123 @@
+import re
+
+from .block_cache import BlockCache
+
+# Elements around which whitespace is never rendered, so it can be dropped
+BLOCK_TAGS = frozenset(
+    (
+        "!doctype", "html", "head", "body", "meta", "link", "title", "base",
+        "style", "script", "noscript", "article", "aside", "section", "nav",
+        "header", "footer", "main", "div", "p", "ul", "ol", "li", "dl", "dt",
+        "dd", "h1", "h2", "h3", "h4", "h5", "h6", "pre", "blockquote", "figure",
+        "figcaption", "hr", "table", "thead", "tbody", "tfoot", "tr", "td", "th",
+        "form", "fieldset", "br",
+    )
+)
+
+# Regions of markup whose whitespace is significant
+_PRESERVED = re.compile(r"(<(pre|textarea|script)\b.*?</\2\s*>)", re.DOTALL | re.IGNORECASE)
+_BETWEEN_TAGS = re.compile(r"(<(/?)([!\w-]+)[^>]*>)\s+(?=<(/?)([!\w-]+))")
+_LEADING_SPACE = re.compile(r"^\s+(?=</?([!\w-]+))")
+_TRAILING_SPACE = re.compile(r"(<(/?)([!\w-]+)[^>]*>)\s+$")
+_WHITESPACE = re.compile(r"\s+")
+_CSS_TOKENS = re.compile(
+    r"(\"(?:\\.|[^\"\\])*\"|'(?:\\.|[^'\\])*')|(/\*.*?\*/)", re.DOTALL
+)
+_CSS_SPACE_AROUND = re.compile(r"\s*([{};,])\s*")
+_CSS_SPACE_AFTER_COLON = re.compile(r":\s+")
+
+
+def _drop_block_whitespace(match: re.Match) -> str:
+    if match[3].lower() in BLOCK_TAGS or match[5].lower() in BLOCK_TAGS:
+        return match[1]
+    return match[1] + " "
+
+
+def _drop_leading_whitespace(match: re.Match) -> str:
+    return "" if match[1].lower() in BLOCK_TAGS else match[0]
+
+
+def _drop_trailing_whitespace(match: re.Match) -> str:
+    return match[1] if match[3].lower() in BLOCK_TAGS else match[0]
+
+
+def collapse_whitespace(markup: str) -> str:
+    """
+    Minifies a fragment of HTML markup without parsing it.
+
+    Whitespace between two tags is dropped when either is a block-level tag
+    and collapsed to a single space otherwise, since it may separate inline
+    content; so is whitespace between a block-level tag and either end of the
+    fragment. Other runs of whitespace collapse to a single space. The contents
+    of pre, textarea and script elements are left untouched.
+    """
+    parts = _PRESERVED.split(markup)
+    result = []
+
+    # split() yields the text, then the preserved element and its tag name.
+    # Each text run is processed between stand-ins for its neighbouring
+    # preserved tags so whitespace next to them is treated like any other.
+    for i in range(0, len(parts), 3):
+        before = f"</{parts[i - 1]}>" if i else ""
+        after = f"<{parts[i + 2]}>" if i + 1 < len(parts) else ""
+
+        text = _BETWEEN_TAGS.sub(_drop_block_whitespace, before + parts[i] + after)
+        text = _LEADING_SPACE.sub(_drop_leading_whitespace, text)
+        text = _TRAILING_SPACE.sub(_drop_trailing_whitespace, text)
+        text = _WHITESPACE.sub(" ", text)
+        result.append(text[len(before) : len(text) - len(after)])
+
+        if i + 1 < len(parts):
+            result.append(parts[i + 1])
+
+    return "".join(result)
+
+
+def minify_css(css: str) -> str:
+    """
+    Minifies a stylesheet by removing comments and redundant whitespace.
+
+    Strings are kept verbatim. Whitespace is only removed around braces,
+    semicolons and commas and after colons, so selectors such as "a :hover"
+    keep their meaning; the last semicolon of each block is dropped.
+    """
+    result = []
+    pos = 0
+
+    for match in _CSS_TOKENS.finditer(css):
+        result.append(_minify_css_code(css[pos : match.start()]))
+        if match[1] is not None:
+            result.append(match[1])
+        pos = match.end()
+
+    result.append(_minify_css_code(css[pos:]))
+    return "".join(result).strip()
+
+
+def _minify_css_code(code: str) -> str:
+    code = _WHITESPACE.sub(" ", code)
+    code = _CSS_SPACE_AROUND.sub(r"\1", code)
+    code = _CSS_SPACE_AFTER_COLON.sub(":", code)
+    return code.replace(";}", "}")
+
+
+class CssMinifier:
+    """
+    Minifies stylesheets, reusing results for content seen before.
+
+    Results are kept in a BlockCache keyed by a hash of the stylesheet, which
+    may be persisted between builds by giving the cache a path.
+    """
+
+    def __init__(self, cache: BlockCache | None = None):
+        self.cache = cache if cache is not None else BlockCache(max_entries=1000)
+
+    def __call__(self, css: str) -> str:
+        key = self.cache.key(css)
+        minified = self.cache.get(key)
+
+        if minified is None:
+            minified = minify_css(css)
+            self.cache.put(key, minified)
+
+        return minified
@@ -0,0 +1,144 @@
+import gzip
+import os
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable
+
+from .file_io import discard_sidecars, write_if_changed
+from .manifest import BuildManifest
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Extensions of text outputs worth precompressing
+COMPRESSIBLE_EXTENSIONS = (
+    ".html",
+    ".css",
+    ".js",
+    ".mjs",
+    ".json",
+    ".svg",
+    ".txt",
+    ".xml",
+)
+
+
+def _gzip(data: bytes) -> bytes:
+    # A fixed mtime keeps the output reproducible, so unchanged files stay unchanged
+    return gzip.compress(data, compresslevel=9, mtime=0)
+
+
+def _brotli(data: bytes) -> bytes:
+    return brotli.compress(data, quality=11)
+
+
+def _zstd(data: bytes) -> bytes:
+    return zstandard.ZstdCompressor(level=19).compress(data)
+
+
+def available_encoders() -> dict[str, Callable[[bytes], bytes]]:
+    """
+    Returns the sidecar suffixes that can be produced here, mapped to their
+    compressors. gzip is always available; brotli and zstd are used when the
+    brotli and zstandard packages are installed.
+    """
+    encoders = {}
+    if brotli is not None:
+        encoders[".br"] = _brotli
+    if zstandard is not None:
+        encoders[".zst"] = _zstd
+    encoders[".gz"] = _gzip
+    return encoders
+
+
+class Precompressor:
+    """
+    Writes precompressed sidecars (index.html.gz, index.html.br, ...) for text
+    outputs on a thread pool while the build carries on.
+
+    Outputs are fed in one at a time with add() as the build writes or keeps
+    them, so the output tree is never rescanned. Outputs whose sidecars the
+    manifest shows were produced from the file as it is now are skipped; the
+    rest are compressed in the background. close() waits for the pool and
+    records the new sidecars in the manifest; use the precompressor as a
+    context manager.
+    """
+
+    def __init__(
+        self,
+        manifest: BuildManifest | None = None,
+        threads: int = 4,
+        min_size: int = 256,
+        encoders: dict[str, Callable[[bytes], bytes]] | None = None,
+    ):
+        self.manifest = manifest
+        self.min_size = min_size
+        self.encoders = encoders if encoders is not None else available_encoders()
+        self.compressed = 0
+        self.skipped = 0
+        self._futures: list[Future[tuple[str, int, int, list[str]]]] = []
+        self._executor = ThreadPoolExecutor(max_workers=threads)
+
+    def add(self, path: str) -> None:
+        if not path.endswith(COMPRESSIBLE_EXTENSIONS):
+            return
+
+        if self.manifest is not None and self.manifest.sidecars_fresh(
+            path, list(self.encoders)
+        ):
+            self.skipped += 1
+            return
+
+        self._futures.append(self._executor.submit(self._compress, path))
+
+    def close(self) -> None:
+        """
+        Waits for queued compressions and records them in the manifest.
+
+        Raises:
+            Exception: If a sidecar could not be written, naming the file
+        """
+        self._executor.shutdown(wait=True)
+
+        futures, self._futures = self._futures, []
+        for future in futures:
+            path, size, mtime_ns, suffixes = future.result()
+            if suffixes:
+                self.compressed += 1
+
+            if self.manifest is not None:
+                self.manifest.record_sidecars(
+                    path, size, mtime_ns, list(self.encoders), suffixes
+                )
+
+    def _compress(self, path: str) -> tuple[str, int, int, list[str]]:
+        try:
+            stat = os.stat(path)
+            with open(path, "rb") as file:
+                data = file.read()
+
+            if len(data) < self.min_size:
+                discard_sidecars(path)
+                return path, stat.st_size, stat.st_mtime_ns, []
+
+            for suffix, compress in self.encoders.items():
+                write_if_changed(path + suffix, compress(data))
+
+            return path, stat.st_size, stat.st_mtime_ns, list(self.encoders)
+        except OSError as err:
+            raise Exception(f"Failed to precompress {path}: {err}") from err
+
+    def __enter__(self) -> "Precompressor":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self._executor.shutdown(wait=True, cancel_futures=True)
@@ -0,0 +1,110 @@
+import json
+import os
+import sys
+import time
+from contextlib import contextmanager, nullcontext
+from typing import Iterator
+
+
+class Profiler:
+    """
+    Records per-stage and per-page build timings.
+
+    Each event stores the stage name, the page it belongs to (if any), its start
+    and duration in microseconds, the change in allocated memory blocks and the
+    recording process id. Events are plain dicts so worker processes can return
+    them to the parent for merging.
+
+    A disabled profiler records nothing and its stages are no-op contexts.
+    """
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self.events: list[dict] = []
+
+    def stage(self, name: str, page: str | None = None):
+        if not self.enabled:
+            return nullcontext()
+        return self._record(name, page)
+
+    @contextmanager
+    def _record(self, name: str, page: str | None) -> Iterator[None]:
+        start_blocks = sys.getallocatedblocks()
+        start = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            self.events.append(
+                {
+                    "name": name,
+                    "page": page,
+                    "ts": start // 1000,
+                    "dur": (time.perf_counter_ns() - start) // 1000,
+                    "allocs": sys.getallocatedblocks() - start_blocks,
+                    "pid": os.getpid(),
+                }
+            )
+
+    def merge(self, events: list[dict]) -> None:
+        self.events.extend(events)
+
+    def stage_totals(self) -> dict[str, dict[str, int]]:
+        """
+        Aggregates events by stage name into call counts, total microseconds
+        and allocated block deltas, in first-seen order.
+        """
+        totals: dict[str, dict[str, int]] = {}
+        for event in self.events:
+            total = totals.setdefault(event["name"], {"calls": 0, "dur": 0, "allocs": 0})
+            total["calls"] += 1
+            total["dur"] += event["dur"]
+            total["allocs"] += event["allocs"]
+        return totals
+
+    def slowest_pages(self, count: int = 10) -> list[dict]:
+        pages = [event for event in self.events if event["name"] == "page"]
+        return sorted(pages, key=lambda event: event["dur"], reverse=True)[:count]
+
+    def summary(self, slowest: int = 10) -> str:
+        """
+        Formats a stage table followed by the slowest pages.
+        """
+        rows = [f"{'stage':<24}{'calls':>8}{'total ms':>12}{'mean ms':>10}{'allocs':>12}"]
+        for name, total in self.stage_totals().items():
+            rows.append(
+                f"{name:<24}{total['calls']:>8}{total['dur'] / 1000:>12.2f}"
+                f"{total['dur'] / 1000 / total['calls']:>10.3f}{total['allocs']:>12}"
+            )
+
+        pages = self.slowest_pages(slowest)
+        if pages:
+            rows.append("")
+            rows.append(f"slowest {len(pages)} pages:")
+            for event in pages:
+                rows.append(f"{event['dur'] / 1000:>10.2f} ms  {event['page']}")
+
+        return os.linesep.join(rows)
+
+    def write_trace(self, path: str) -> None:
+        """
+        Writes the events as a Chrome trace (chrome://tracing, Perfetto).
+        """
+        trace_events = [
+            {
+                "name": event["name"],
+                "cat": "build",
+                "ph": "X",
+                "ts": event["ts"],
+                "dur": event["dur"],
+                "pid": event["pid"],
+                "tid": event["pid"],
+                "args": {"page": event["page"], "allocs": event["allocs"]},
+            }
+            for event in self.events
+        ]
+
+        with open(path, "w") as file:
+            json.dump({"traceEvents": trace_events}, file)
+
+
+NULL_PROFILER = Profiler(enabled=False)
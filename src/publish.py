@@ -0,0 +1,148 @@
+import os
+import re
+import shutil
+import time
+
+# Names of release directories: a timestamp, or 0-timestamp for a plain
+# public directory moved aside by the first staged build
+_RELEASE_NAME = re.compile(r"\d+(-\d+)?")
+
+
+def releases_dir(public_dir: str) -> str:
+    """
+    Returns the directory holding staged releases of public_dir, kept beside
+    it so releases can be hardlinked and renamed within one filesystem.
+    """
+    return os.path.abspath(public_dir).rstrip(os.sep) + ".releases"
+
+
+def current_release(public_dir: str) -> str | None:
+    """
+    Returns the directory currently served as public_dir: the target of the
+    symlink for staged builds, public_dir itself for plain builds, or None.
+    """
+    if os.path.islink(public_dir):
+        target = os.path.realpath(public_dir)
+        return target if os.path.isdir(target) else None
+
+    if os.path.isdir(public_dir):
+        return os.path.abspath(public_dir)
+
+    return None
+
+
+def link_tree(src_dir: str, dst_dir: str) -> int:
+    """
+    Recreates src_dir under dst_dir with every file hardlinked rather than
+    copied, falling back to a copy where linking is not possible.
+
+    Returns the number of files linked or copied.
+    """
+    count = 0
+
+    for dir_path, dir_names, file_names in os.walk(src_dir):
+        rel_dir = os.path.relpath(dir_path, src_dir)
+        target_dir = os.path.normpath(os.path.join(dst_dir, rel_dir))
+        os.makedirs(target_dir, exist_ok=True)
+
+        for file_name in file_names:
+            src_item = os.path.join(dir_path, file_name)
+            dst_item = os.path.join(target_dir, file_name)
+
+            if os.path.islink(src_item):
+                os.symlink(os.readlink(src_item), dst_item)
+            else:
+                try:
+                    os.link(src_item, dst_item)
+                except OSError:
+                    shutil.copy2(src_item, dst_item)
+            count += 1
+
+    return count
+
+
+def stage_release(public_dir: str, reuse: bool = True) -> str:
+    """
+    Creates an empty staging directory for the next release of public_dir.
+
+    With reuse, the current release is hardlinked into it first, so unchanged
+    outputs need not be written again. Outputs must then be replaced rather
+    than rewritten in place, or the live release would change with them.
+
+    Args:
+        public_dir: Directory the site is served from
+        reuse: Seed the staging directory from the current release
+
+    Returns:
+        The real path of the staging directory
+    """
+    releases = releases_dir(public_dir)
+    os.makedirs(releases, exist_ok=True)
+
+    staging = os.path.join(releases, str(time.time_ns()))
+    os.mkdir(staging)
+    staging = os.path.realpath(staging)
+
+    previous = current_release(public_dir)
+    if reuse and previous is not None:
+        link_tree(previous, staging)
+
+    return staging
+
+
+def publish_release(staging: str, public_dir: str, keep: int = 2) -> None:
+    """
+    Atomically switches public_dir to the staging directory by renaming a new
+    symlink over the old one, then prunes old releases.
+
+    A plain public_dir left by an unstaged build is first moved into the
+    releases directory; only that first switch leaves a brief window in which
+    public_dir does not exist.
+
+    Args:
+        staging: Staging directory returned by stage_release
+        public_dir: Directory the site is served from
+        keep: Number of releases to keep, including the one just published,
+            so readers still holding the previous release can finish
+    """
+    releases = releases_dir(public_dir)
+
+    if os.path.isdir(public_dir) and not os.path.islink(public_dir):
+        os.rename(public_dir, os.path.join(releases, f"0-{time.time_ns()}"))
+
+    tmp_link = f"{public_dir}.tmp-{os.getpid()}"
+    if os.path.lexists(tmp_link):
+        os.remove(tmp_link)
+
+    os.symlink(os.path.relpath(staging, os.path.dirname(os.path.abspath(public_dir))), tmp_link)
+    os.replace(tmp_link, public_dir)
+
+    prune_releases(public_dir, keep)
+
+
+def prune_releases(public_dir: str, keep: int = 2) -> list[str]:
+    """
+    Deletes all but the keep newest releases, never the one being served.
+    Entries not named like a release, such as .DS_Store, are left alone.
+
+    Returns the deleted release directories.
+    """
+    releases = releases_dir(public_dir)
+    if not os.path.isdir(releases):
+        return []
+
+    current = current_release(public_dir)
+    names = sorted(
+        (name for name in os.listdir(releases) if _RELEASE_NAME.fullmatch(name)),
+        key=lambda name: [int(part) for part in name.split("-")],
+    )
+
+    removed = []
+    for name in names[: max(0, len(names) - keep)]:
+        path = os.path.join(releases, name)
+        if path == current:
+            continue
+        shutil.rmtree(path)
+        removed.append(path)
+
+    return removed
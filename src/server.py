@@ -0,0 +1,388 @@
+import hashlib
+import io
+import os
+import threading
+import time
+from collections import OrderedDict
+from email.utils import formatdate, parsedate_to_datetime
+from functools import partial
+from http import HTTPStatus
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+from .assets import is_fingerprinted
+
+PORT = 8888
+
+LIVE_RELOAD_PATH = "/__livereload"
+LIVE_RELOAD_SCRIPT = (
+    "<script>new EventSource("
+    f'"{LIVE_RELOAD_PATH}"'
+    ").onmessage = () => location.reload();</script>"
+)
+
+# Cache-Control sent with content-addressed asset copies, which never change
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+# Precompressed sidecars in order of preference: (Accept-Encoding token, suffix)
+SIDECAR_ENCODINGS = (("br", ".br"), ("zstd", ".zst"), ("gzip", ".gz"))
+
+
+def accepted_encodings(header: str) -> dict[str, float]:
+    """
+    Parses an Accept-Encoding header into the weight of each coding: its q
+    parameter, or 1 without one. Codings with a malformed weight are left out.
+    """
+    weights: dict[str, float] = {}
+    for token in header.split(","):
+        coding, *params = (part.strip() for part in token.split(";"))
+        if not coding:
+            continue
+
+        weight: float | None = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    weight = float(value)
+                except ValueError:
+                    weight = None
+
+        if weight is not None:
+            weights[coding.lower()] = weight
+
+    return weights
+
+
+class LiveReload:
+    """
+    Broadcasts rebuild notifications to connected browsers.
+
+    Each notification bumps a version counter; event-stream handlers block until
+    the version moves past the one they last sent.
+    """
+
+    def __init__(self):
+        self.version = 0
+        self._condition = threading.Condition()
+
+    def notify(self) -> None:
+        with self._condition:
+            self.version += 1
+            self._condition.notify_all()
+
+    def wait(self, version: int, timeout: float) -> int:
+        with self._condition:
+            self._condition.wait_for(lambda: self.version != version, timeout)
+            return self.version
+
+
+class CachedFile:
+    """
+    A file's bytes and validators as served from the in-memory cache.
+    """
+
+    __slots__ = ("data", "size", "mtime_ns", "etag", "last_modified", "checked_at")
+
+    def __init__(self, data: bytes, size: int, mtime_ns: int):
+        self.data = data
+        self.size = size
+        self.mtime_ns = mtime_ns
+        self.etag = f'"{hashlib.blake2b(data, digest_size=16).hexdigest()}"'
+        self.last_modified = mtime_ns // 1_000_000_000
+        self.checked_at = time.monotonic()
+
+
+class FileCache:
+    """
+    Thread-safe LRU cache of file contents bounded by total bytes.
+
+    Entries are trusted for `ttl` seconds before being re-validated against the
+    file's size and mtime, so hot files are served without touching the disk.
+    Files larger than `max_file_bytes` are never cached.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = 64 * 1024 * 1024,
+        max_file_bytes: int = 8 * 1024 * 1024,
+        ttl: float = 1.0,
+    ):
+        self.max_bytes = max_bytes
+        self.max_file_bytes = max_file_bytes
+        self.ttl = ttl
+        self.total_bytes = 0
+        self._entries: OrderedDict[str, CachedFile] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, path: str) -> CachedFile | None:
+        """
+        Returns the cached file, loading or refreshing it as needed, or None if
+        the path is not a regular file or is too large to cache.
+        """
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is not None:
+                self._entries.move_to_end(path)
+                if time.monotonic() - entry.checked_at < self.ttl:
+                    return entry
+
+        try:
+            stat = os.stat(path)
+        except OSError:
+            self._evict(path)
+            return None
+
+        if entry is not None and (entry.size, entry.mtime_ns) == (
+            stat.st_size,
+            stat.st_mtime_ns,
+        ):
+            entry.checked_at = time.monotonic()
+            return entry
+
+        if not os.path.isfile(path) or stat.st_size > self.max_file_bytes:
+            self._evict(path)
+            return None
+
+        with open(path, "rb") as file:
+            entry = CachedFile(file.read(), stat.st_size, stat.st_mtime_ns)
+
+        with self._lock:
+            previous = self._entries.pop(path, None)
+            if previous is not None:
+                self.total_bytes -= previous.size
+            self._entries[path] = entry
+            self.total_bytes += entry.size
+
+            while self.total_bytes > self.max_bytes and len(self._entries) > 1:
+                _, evicted = self._entries.popitem(last=False)
+                self.total_bytes -= evicted.size
+
+        return entry
+
+    def _evict(self, path: str) -> None:
+        with self._lock:
+            entry = self._entries.pop(path, None)
+            if entry is not None:
+                self.total_bytes -= entry.size
+
+
+class CORSHTTPRequestHandler(SimpleHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    live_reload: LiveReload | None = None
+    file_cache: FileCache | None = None
+    cache_control = "no-cache"
+
+    def __init__(self, *args, directory: str = "public", **kwargs):
+        super().__init__(*args, directory=directory, **kwargs)
+
+    def end_headers(self):
+        self.send_header("Access-Control-Allow-Origin", "*")
+        self.send_header("Access-Control-Allow-Methods", "GET, OPTIONS")
+        self.send_header("Access-Control-Allow-Headers", "*")
+        super().end_headers()
+
+    def do_OPTIONS(self):
+        self.send_response(200, "OK")
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def do_GET(self):
+        if self.live_reload is not None:
+            if self.path == LIVE_RELOAD_PATH:
+                self._stream_reload_events()
+                return
+
+            html_path = self._html_path()
+            if html_path is not None:
+                self._send_html_with_reload_script(html_path)
+                return
+
+        super().do_GET()
+
+    def send_head(self):
+        """
+        Serves regular files from the file cache with validators and
+        precompressed sidecars, deferring redirects, directory listings and
+        uncacheable files to the base handler.
+        """
+        if self.file_cache is None:
+            return super().send_head()
+
+        path = self._resolve_path()
+        if path is None:
+            return super().send_head()
+
+        encoding, entry = self._negotiate(path)
+        if entry is None:
+            return super().send_head()
+
+        if self._is_not_modified(entry):
+            self.send_response(HTTPStatus.NOT_MODIFIED)
+            self._send_validators(entry, path)
+            self.end_headers()
+            return None
+
+        self.send_response(HTTPStatus.OK)
+        self.send_header("Content-Type", self.guess_type(path))
+        self.send_header("Content-Length", str(entry.size))
+        if encoding is not None:
+            self.send_header("Content-Encoding", encoding)
+        self._send_validators(entry, path)
+        self.end_headers()
+
+        return io.BytesIO(entry.data)
+
+    def _resolve_path(self) -> str | None:
+        path = self.translate_path(self.path)
+
+        if os.path.isdir(path):
+            # Without a trailing slash the base handler issues a redirect
+            if not self.path.split("?", 1)[0].split("#", 1)[0].endswith("/"):
+                return None
+            for index in ("index.html", "index.htm"):
+                index_path = os.path.join(path, index)
+                if os.path.isfile(index_path):
+                    return index_path
+            return None
+
+        return path
+
+    def _negotiate(self, path: str) -> tuple[str | None, CachedFile | None]:
+        weights = accepted_encodings(self.headers.get("Accept-Encoding", ""))
+        default = weights.get("*", 0.0)
+
+        # Highest weight first, ties broken by SIDECAR_ENCODINGS order
+        candidates = sorted(
+            (-weights.get(encoding, default), rank, encoding, suffix)
+            for rank, (encoding, suffix) in enumerate(SIDECAR_ENCODINGS)
+        )
+        for negative_weight, _, encoding, suffix in candidates:
+            if negative_weight < 0:
+                entry = self.file_cache.get(path + suffix)
+                if entry is not None:
+                    return encoding, entry
+
+        return None, self.file_cache.get(path)
+
+    def _is_not_modified(self, entry: CachedFile) -> bool:
+        if_none_match = self.headers.get("If-None-Match")
+        if if_none_match is not None:
+            tags = {tag.strip() for tag in if_none_match.split(",")}
+            return "*" in tags or entry.etag in tags
+
+        if_modified_since = self.headers.get("If-Modified-Since")
+        if if_modified_since is not None:
+            try:
+                since = parsedate_to_datetime(if_modified_since).timestamp()
+            except (TypeError, ValueError, IndexError, OverflowError):
+                return False
+            return entry.last_modified <= since
+
+        return False
+
+    def _send_validators(self, entry: CachedFile, path: str) -> None:
+        self.send_header("ETag", entry.etag)
+        self.send_header("Last-Modified", formatdate(entry.last_modified, usegmt=True))
+        self.send_header(
+            "Cache-Control",
+            IMMUTABLE_CACHE_CONTROL if is_fingerprinted(path) else self.cache_control,
+        )
+        self.send_header("Vary", "Accept-Encoding")
+
+    def _html_path(self) -> str | None:
+        path = self._resolve_path()
+        if path is not None and path.endswith(".html") and os.path.isfile(path):
+            return path
+        return None
+
+    def _send_html_with_reload_script(self, html_path: str) -> None:
+        with open(html_path, "rb") as file:
+            body = file.read()
+
+        script = LIVE_RELOAD_SCRIPT.encode()
+        index = body.rfind(b"</body>")
+        body = body + script if index == -1 else body[:index] + script + body[index:]
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _stream_reload_events(self) -> None:
+        self.close_connection = True
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")
+        self.end_headers()
+
+        version = self.live_reload.version
+        try:
+            while True:
+                new_version = self.live_reload.wait(version, timeout=15)
+                if new_version != version:
+                    self.wfile.write(b"data: reload\n\n")
+                    version = new_version
+                else:
+                    self.wfile.write(b": keep-alive\n\n")
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+
+def make_server(
+    directory: str = "public",
+    port: int = PORT,
+    live_reload: LiveReload | None = None,
+    host: str = "localhost",
+    file_cache: FileCache | None = None,
+    cache_control: str = "no-cache",
+) -> ThreadingHTTPServer:
+    """
+    Creates a threaded, keep-alive HTTP server for a directory.
+
+    Args:
+        directory: Directory to serve
+        port: Port to listen on; 0 picks a free port
+        live_reload: Optional live-reload broadcaster; HTML pages get a reload
+            script injected and are served uncached
+        host: Interface to bind
+        file_cache: Optional in-memory file cache enabling ETag/Last-Modified
+            validation, 304 responses and precompressed .br/.zst/.gz sidecars
+        cache_control: Cache-Control header sent with cached files, except
+            content-addressed asset copies, which are sent as immutable
+    """
+    handler = type(
+        "Handler",
+        (CORSHTTPRequestHandler,),
+        {
+            "live_reload": live_reload,
+            "file_cache": file_cache,
+            "cache_control": cache_control,
+        },
+    )
+
+    server = ThreadingHTTPServer((host, port), partial(handler, directory=directory))
+    server.daemon_threads = True
+    return server
+
+
+def serve(
+    directory: str = "public",
+    port: int = PORT,
+    host: str = "localhost",
+    cache_bytes: int = 64 * 1024 * 1024,
+) -> None:
+    file_cache = FileCache(max_bytes=cache_bytes) if cache_bytes > 0 else None
+
+    with make_server(directory, port, host=host, file_cache=file_cache) as httpd:
+        print("serving on port:", port)
+        try:
+            httpd.serve_forever()
+        except KeyboardInterrupt:
+            pass
+
+        print("\nserver stopped")
+        httpd.server_close()
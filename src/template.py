@@ -0,0 +1,390 @@
+import json
+import os
+import re
+from typing import Iterator, TextIO
+
+from .assets import rewrite_asset_urls
+from .htmlnode import HTMLNode
+from .manifest import hash_bytes
+from .minify import collapse_whitespace
+
+_PLACEHOLDER = re.compile(r"\{\{\s*(\w+)\s*\}\}")
+_TAG = re.compile(
+    r"\{%\s*(extends|include|block|endblock)\s*"
+    r"(?:\"([^\"]*)\"|'([^']*)'|(\w+))?\s*%\}"
+)
+
+# Name of the template file that sets the default for a content directory
+DIRECTORY_TEMPLATE = "template.html"
+
+TemplateValue = str | HTMLNode | Iterator[str]
+
+_template_cache: dict[tuple[str, bool], tuple[tuple[int, int], "Template"]] = {}
+
+
+class Template:
+    """
+    A template pre-compiled into alternating literal and slot segments.
+
+    Even-indexed segments are literal text and odd-indexed segments are the
+    names of {{ var }} placeholders, so rendering is a single join.
+
+    A minified template has its literal segments' whitespace collapsed once at
+    compile time and serializes HTMLNode values in compact form; pages should
+    then be rendered with compact=True to match.
+
+    Templates compiled by a TemplateLoader record the file they were loaded
+    from and every file their source was assembled from in dependencies.
+
+    Given assets, a map of static asset URL paths to their content-addressed
+    copies, asset references in the literal segments are rewritten once at
+    compile time and those in HTML values as they are rendered. The map is
+    part of the hash, so pages are re-rendered when an asset changes.
+    """
+
+    def __init__(
+        self,
+        source: str,
+        minify: bool = False,
+        path: str | None = None,
+        dependencies: frozenset[str] = frozenset(),
+        assets: dict[str, str] | None = None,
+    ):
+        self.source = source
+        self.minify = minify
+        self.path = path
+        self.dependencies = dependencies
+        self.assets = assets or None
+
+        key = ("minify\0" if minify else "") + source
+        if self.assets is not None:
+            key += "\0" + json.dumps(self.assets, sort_keys=True)
+        self.hash = hash_bytes(key.encode())
+        self.segments: list[str] = _PLACEHOLDER.split(source)
+
+        if self.assets is not None:
+            self.segments[::2] = [
+                rewrite_asset_urls(segment, self.assets)
+                for segment in self.segments[::2]
+            ]
+
+        if minify:
+            self.segments[::2] = [
+                collapse_whitespace(segment) for segment in self.segments[::2]
+            ]
+            self.segments[0] = self.segments[0].lstrip()
+            self.segments[-1] = self.segments[-1].rstrip()
+
+    @property
+    def variables(self) -> set[str]:
+        return set(self.segments[1::2])
+
+    def render(self, context: dict[str, TemplateValue]) -> str:
+        """
+        Renders the template, substituting placeholders from context.
+        Missing variables render as empty strings.
+        """
+        return "".join(self._iter_render(context))
+
+    def write(self, fp: TextIO, context: dict[str, TemplateValue]) -> None:
+        """
+        Streams the rendered template into a writable text file. HTMLNode values
+        are serialized in chunks rather than rendered to a string first, and
+        iterators of string chunks are consumed as they are written.
+        """
+        fp.writelines(self._iter_render(context))
+
+    def _iter_render(self, context: dict[str, TemplateValue]):
+        for i, segment in enumerate(self.segments):
+            if i % 2 == 0:
+                yield segment
+                continue
+
+            value = context.get(segment, "")
+            if isinstance(value, str):
+                chunks = (value,)
+            elif isinstance(value, HTMLNode):
+                chunks = value.iter_html(self.minify)
+            else:
+                chunks = value
+
+            if self.assets is None:
+                yield from chunks
+            else:
+                for chunk in chunks:
+                    yield rewrite_asset_urls(chunk, self.assets)
+
+    def __repr__(self) -> str:
+        return f"Template(variables: {sorted(self.variables)})"
+
+
+def load_template(template_path: str, minify: bool = False) -> Template:
+    """
+    Loads and compiles a template, reusing the compiled copy while the file's
+    size and mtime are unchanged.
+
+    Args:
+        template_path: Path to HTML template file
+        minify: Compile a minified template
+
+    Returns:
+        The compiled Template
+    """
+    stat = os.stat(template_path)
+    key = (stat.st_size, stat.st_mtime_ns)
+
+    cached = _template_cache.get((template_path, minify))
+    if cached is not None and cached[0] == key:
+        return cached[1]
+
+    with open(template_path) as template_file:
+        template = Template(template_file.read(), minify)
+
+    _template_cache[(template_path, minify)] = (key, template)
+    return template
+
+
+# A parsed template: literal text, ("include", name) or ("block", name, children)
+TemplateNode = str | tuple
+
+
+def _parse_tags(source: str, path: str) -> tuple[str | None, list[TemplateNode]]:
+    """
+    Parses {% extends %}, {% include %} and {% block %} tags into a tree,
+    returning the name of the extended template, if any, and the nodes.
+    """
+    extends = None
+    root: list[TemplateNode] = []
+    stack: list[tuple[str, list[TemplateNode]]] = [("", root)]
+    pos = 0
+
+    for match in _TAG.finditer(source):
+        if match.start() > pos:
+            stack[-1][1].append(source[pos : match.start()])
+        pos = match.end()
+
+        tag = match[1]
+        name = next((group for group in match.groups()[1:] if group is not None), None)
+
+        if tag == "endblock":
+            if len(stack) == 1:
+                raise Exception(f"Unexpected endblock in {path}")
+            if name is not None and name != stack[-1][0]:
+                raise Exception(f"endblock {name} closes block {stack[-1][0]} in {path}")
+            block_name, children = stack.pop()
+            stack[-1][1].append(("block", block_name, children))
+        elif not name:
+            raise Exception(f"{tag} without a name in {path}")
+        elif tag == "block":
+            stack.append((name, []))
+        elif tag == "include":
+            stack[-1][1].append(("include", name))
+        elif extends is not None or len(stack) > 1 or any(
+            not isinstance(node, str) or node.strip() for node in root
+        ):
+            raise Exception(f"extends must come first in {path}")
+        else:
+            extends = name
+            root.clear()
+
+    if len(stack) > 1:
+        raise Exception(f"Block {stack[-1][0]} is not closed in {path}")
+    if pos < len(source):
+        root.append(source[pos:])
+
+    return extends, root
+
+
+def _collect_blocks(nodes: list[TemplateNode], blocks: dict[str, list]) -> dict:
+    for node in nodes:
+        if isinstance(node, tuple) and node[0] == "block":
+            blocks.setdefault(node[1], node[2])
+            _collect_blocks(node[2], blocks)
+    return blocks
+
+
+def _override_blocks(nodes: list[TemplateNode], blocks: dict) -> list[TemplateNode]:
+    result: list[TemplateNode] = []
+    for node in nodes:
+        if isinstance(node, tuple) and node[0] == "block":
+            children = blocks.get(node[1], node[2])
+            result.append(("block", node[1], _override_blocks(children, blocks)))
+        else:
+            result.append(node)
+    return result
+
+
+def _flatten(nodes: list[TemplateNode]) -> str:
+    return "".join(
+        node if isinstance(node, str) else _flatten(node[2]) for node in nodes
+    )
+
+
+class TemplateLoader:
+    """
+    Compiles templates with layout inheritance and partials, each file once.
+
+    A template may start with {% extends "layout.html" %} and then override
+    the layout's {% block name %}...{% endblock %} sections, which may nest;
+    content outside blocks in an extending template is ignored. Layouts may
+    themselves extend others. {% include "partial.html" %} inserts a partial
+    in place. These tags are resolved when a template is compiled, so the
+    result is an ordinary Template of literal and {{ var }} segments whose
+    hash covers every file it was assembled from.
+
+    Names in extends and include tags, and in page front matter, are resolved
+    against templates_dir first and then against the directory of the file
+    naming them. Each file is read and parsed once per loader, so a loader
+    should be created per build; shared layouts and partials are reused.
+    Templates are compiled with the loader's asset map, if any.
+    """
+
+    def __init__(
+        self,
+        templates_dir: str | None = None,
+        minify: bool = False,
+        assets: dict[str, str] | None = None,
+    ):
+        self.templates_dir = templates_dir
+        self.minify = minify
+        self.assets = assets
+        self._templates: dict[str, Template] = {}
+        self._resolved: dict[str, tuple[list[TemplateNode], frozenset[str]]] = {}
+        self._directory_templates: dict[str, str | None] = {}
+
+    def resolve(self, name: str, base_dir: str | None = None) -> str:
+        """
+        Returns the path of a template named in a tag or front matter.
+
+        Raises:
+            Exception: If no such template exists
+        """
+        for directory in (self.templates_dir, base_dir):
+            if directory is not None:
+                path = os.path.normpath(os.path.join(directory, name))
+                if os.path.isfile(path):
+                    return path
+
+        raise Exception(f"Template not found: {name}")
+
+    def load(self, path: str) -> Template:
+        """
+        Returns the compiled template at path, compiling it on first use.
+
+        Raises:
+            Exception: If the template or a file it uses is missing, a tag is
+                malformed or templates include or extend each other in a cycle
+        """
+        template = self._templates.get(path)
+        if template is None:
+            nodes, dependencies = self._resolve(path, ())
+            template = Template(
+                _flatten(nodes), self.minify, path, dependencies, self.assets
+            )
+            self._templates[path] = template
+        return template
+
+    @property
+    def files(self) -> set[str]:
+        """
+        Returns every file the templates compiled so far were assembled from.
+        """
+        files: set[str] = set()
+        for template in self._templates.values():
+            files.update(template.dependencies)
+        return files
+
+    def for_page(
+        self,
+        src_path: str,
+        content_dir: str,
+        default_path: str,
+        name: str | None = None,
+    ) -> Template:
+        """
+        Selects the template for a page: the one named by its front matter,
+        else the nearest template.html in its content directory or a parent
+        of it within content_dir, else the default.
+
+        Raises:
+            Exception: If the template cannot be found or compiled, naming
+                the page it was selected for
+        """
+        try:
+            if name:
+                return self.load(self.resolve(name, os.path.dirname(src_path)))
+
+            directory_template = self._directory_template(
+                os.path.dirname(src_path), os.path.abspath(content_dir)
+            )
+            return self.load(directory_template or default_path)
+        except Exception as err:
+            raise Exception(f"Failed to generate page from {src_path}: {err}") from err
+
+    def _directory_template(self, dir_path: str, content_dir: str) -> str | None:
+        dir_path = os.path.abspath(dir_path)
+        if dir_path in self._directory_templates:
+            return self._directory_templates[dir_path]
+
+        path = os.path.join(dir_path, DIRECTORY_TEMPLATE)
+        if os.path.isfile(path):
+            result = path
+        elif dir_path == content_dir or not dir_path.startswith(content_dir + os.sep):
+            result = None
+        else:
+            result = self._directory_template(os.path.dirname(dir_path), content_dir)
+
+        self._directory_templates[dir_path] = result
+        return result
+
+    def _resolve(
+        self, path: str, stack: tuple[str, ...]
+    ) -> tuple[list[TemplateNode], frozenset[str]]:
+        """
+        Parses a template file and resolves its includes and layout, returning
+        the resulting nodes and the files they were assembled from.
+        """
+        if path in stack:
+            cycle = " -> ".join(os.path.basename(item) for item in (*stack, path))
+            raise Exception(f"Template cycle: {cycle}")
+
+        resolved = self._resolved.get(path)
+        if resolved is not None:
+            return resolved
+
+        try:
+            with open(path) as template_file:
+                source = template_file.read()
+        except OSError as err:
+            raise Exception(f"Failed to read template {path}: {err}") from err
+
+        base_dir = os.path.dirname(path)
+        stack = (*stack, path)
+        dependencies = {path}
+        extends, nodes = _parse_tags(source, path)
+
+        def expand(nodes: list[TemplateNode]) -> list[TemplateNode]:
+            result: list[TemplateNode] = []
+            for node in nodes:
+                if isinstance(node, str):
+                    result.append(node)
+                elif node[0] == "include":
+                    included, included_deps = self._resolve(
+                        self.resolve(node[1], base_dir), stack
+                    )
+                    dependencies.update(included_deps)
+                    result.extend(included)
+                else:
+                    result.append(("block", node[1], expand(node[2])))
+            return result
+
+        nodes = expand(nodes)
+
+        if extends is not None:
+            layout, layout_deps = self._resolve(self.resolve(extends, base_dir), stack)
+            dependencies.update(layout_deps)
+            nodes = _override_blocks(layout, _collect_blocks(nodes, {}))
+
+        resolved = (nodes, frozenset(dependencies))
+        self._resolved[path] = resolved
+        return resolved
@@ -0,0 +1,524 @@
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import time
+from typing import Iterable
+
+from .aggregates import generate_aggregates
+from .assets import AssetManifest, fingerprint_assets
+from .copy_static import sync_static_paths
+from .front_matter import read_front_matter
+from .generate_html import (
+    find_markdown_files,
+    generate_pages,
+    page_destination,
+    remove_output,
+)
+from .links import LinkIndex
+from .manifest import BuildManifest
+from .metadata import MetadataStore
+from .minify import CssMinifier
+from .server import LiveReload
+from .template import DIRECTORY_TEMPLATE, TemplateLoader
+
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+
+_INOTIFY_EVENT = struct.Struct("iIII")
+
+
+class PollingWatcher:
+    """
+    Detects changes by periodically comparing size and mtime snapshots of the
+    watched files and directory trees.
+    """
+
+    def __init__(self, paths: list[str], interval: float = 0.5):
+        self.paths = paths
+        self.interval = interval
+        self._snapshot = self._take_snapshot()
+
+    def _take_snapshot(self) -> dict[str, tuple[int, int]]:
+        snapshot = {}
+
+        for path in self.paths:
+            if os.path.isdir(path):
+                files = [
+                    os.path.join(dir_path, file_name)
+                    for dir_path, _, file_names in os.walk(path)
+                    for file_name in file_names
+                ]
+            else:
+                files = [path]
+
+            for file_path in files:
+                try:
+                    stat = os.stat(file_path)
+                except OSError:
+                    continue
+                snapshot[file_path] = (stat.st_size, stat.st_mtime_ns)
+
+        return snapshot
+
+    def wait(self, timeout: float | None = None) -> set[str]:
+        """
+        Blocks until files change or the timeout expires, returning changed paths.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        while True:
+            snapshot = self._take_snapshot()
+            changed = {
+                path
+                for path in snapshot.keys() | self._snapshot.keys()
+                if snapshot.get(path) != self._snapshot.get(path)
+            }
+            self._snapshot = snapshot
+
+            if changed:
+                return changed
+            if deadline is not None and time.monotonic() >= deadline:
+                return set()
+
+            time.sleep(self.interval)
+
+    def close(self) -> None:
+        pass
+
+
+class InotifyWatcher:
+    """
+    Detects changes through Linux inotify, watching directory trees recursively.
+    Single files are watched through their parent directory so that editors
+    which save by renaming are still picked up.
+
+    Raises:
+        OSError: If inotify is not available on this platform
+    """
+
+    MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+
+    def __init__(self, paths: list[str]):
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        if not hasattr(libc, "inotify_init1"):
+            raise OSError("inotify is not available")
+
+        self._libc = libc
+        self._fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+
+        self._dirs: dict[int, str] = {}
+        self._roots: list[str] = []
+        self._files: set[str] = set()
+
+        for path in paths:
+            if os.path.isdir(path):
+                self._roots.append(path)
+                self._add_tree(path)
+            else:
+                self._files.add(path)
+                self._add_watch(os.path.dirname(path) or ".")
+
+    def _add_watch(self, dir_path: str) -> None:
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(dir_path), self.MASK)
+        if wd < 0:
+            raise OSError(ctypes.get_errno(), f"Cannot watch {dir_path}")
+        self._dirs[wd] = dir_path
+
+    def _add_tree(self, root: str) -> set[str]:
+        files = set()
+        for dir_path, _, file_names in os.walk(root):
+            self._add_watch(dir_path)
+            files.update(os.path.join(dir_path, file_name) for file_name in file_names)
+        return files
+
+    def _is_watched(self, path: str) -> bool:
+        return path in self._files or any(
+            path.startswith(root + os.sep) for root in self._roots
+        )
+
+    def wait(self, timeout: float | None = None) -> set[str]:
+        """
+        Blocks until files change or the timeout expires, returning changed paths.
+        """
+        ready, _, _ = select.select([self._fd], [], [], timeout)
+        if not ready:
+            return set()
+
+        try:
+            data = os.read(self._fd, 1 << 16)
+        except BlockingIOError:
+            return set()
+
+        changed = set()
+        offset = 0
+
+        while offset < len(data):
+            wd, mask, _, length = _INOTIFY_EVENT.unpack_from(data, offset)
+            start = offset + _INOTIFY_EVENT.size
+            name = os.fsdecode(data[start : start + length].rstrip(b"\0"))
+            offset = start + length
+
+            if mask & IN_Q_OVERFLOW:
+                changed.update(self._roots)
+                changed.update(self._files)
+                continue
+
+            if mask & IN_IGNORED:
+                self._dirs.pop(wd, None)
+                continue
+
+            dir_path = self._dirs.get(wd)
+            if dir_path is None:
+                continue
+
+            path = os.path.join(dir_path, name)
+            if not self._is_watched(path):
+                continue
+
+            if mask & IN_ISDIR:
+                if mask & (IN_CREATE | IN_MOVED_TO):
+                    changed.update(self._add_tree(path))
+                continue
+
+            # New files are reported once their writer closes them
+            if not mask & IN_CREATE:
+                changed.add(path)
+
+        return changed
+
+    def close(self) -> None:
+        os.close(self._fd)
+
+
+def create_watcher(paths: list[str], polling: bool = False):
+    """
+    Returns an inotify watcher where available, falling back to polling.
+    """
+    if not polling:
+        try:
+            return InotifyWatcher(paths)
+        except (OSError, AttributeError, TypeError):
+            pass
+    return PollingWatcher(paths)
+
+
+def _is_within(path: str, root: str) -> bool:
+    return path == root or path.startswith(root + os.sep)
+
+
+def watch_paths(
+    content_path: str,
+    static_dir: str,
+    template_path: str,
+    templates_dir: str | None = None,
+    template_files: Iterable[str] = (),
+) -> list[str]:
+    """
+    Returns the directories and files to watch: content, static files, the
+    default template and templates directory, and any template files outside
+    them, such as partials beside the default template.
+    """
+    paths = [content_path, static_dir, template_path]
+    if templates_dir is not None:
+        paths.append(templates_dir)
+
+    paths.extend(
+        [
+            path
+            for path in sorted(template_files)
+            if not any(_is_within(path, root) for root in paths)
+        ]
+    )
+    return paths
+
+
+def rebuild_changes(
+    changed: set[str],
+    content_path: str,
+    static_dir: str,
+    template_path: str,
+    public_dir: str,
+    manifest: BuildManifest,
+    jobs: int = 1,
+    minify: bool = False,
+    templates_dir: str | None = None,
+    link_index: LinkIndex | None = None,
+    metadata: MetadataStore | None = None,
+    site_url: str = "",
+    drafts: bool = False,
+    asset_manifest: AssetManifest | None = None,
+    author: str = "",
+) -> dict[str, int]:
+    """
+    Rebuilds only what a set of changed paths affects.
+
+    A change to a template, layout or partial re-renders the pages whose
+    template uses it, a markdown change re-renders just that page (or removes
+    its output if the source was deleted), and static changes are synced file
+    by file. With minify, pages and stylesheets are minified as in the full
+    build. The references and metadata of re-rendered pages are recorded in
+    link_index and metadata, which are saved along with the manifest, and the
+    sitemap, feed and tag pages are regenerated from metadata as needed.
+    Unless drafts is set, pages whose front matter sets draft: true are not
+    rendered and any output they had is removed, as in the full build.
+    With an asset_manifest, static changes also refresh the content-addressed
+    copies of assets, and pages are rendered with their URLs; when a copy is
+    renamed, the template hashes change and every page is re-rendered.
+
+    Returns:
+        Counts of "pages" rendered, "removed" pages, "assets" synced and
+        "aggregates" written
+    """
+    stats = {"pages": 0, "removed": 0, "assets": 0, "aggregates": 0}
+
+    static_changes = {
+        os.path.relpath(path, static_dir)
+        for path in changed
+        if _is_within(path, static_dir)
+    }
+    assets = asset_manifest.urls() if asset_manifest is not None else None
+    if static_changes:
+        css_minifier = CssMinifier() if minify else None
+        synced = sync_static_paths(
+            static_dir, public_dir, static_changes, css_minifier=css_minifier
+        )
+        stats["assets"] = synced["copied"] + synced["removed"]
+
+        if asset_manifest is not None:
+            fingerprinted = fingerprint_assets(
+                static_dir, public_dir, asset_manifest, css_minifier
+            )
+            asset_manifest.save()
+            stats["assets"] += fingerprinted["written"] + fingerprinted["removed"]
+
+    loader = TemplateLoader(
+        templates_dir,
+        minify,
+        asset_manifest.urls() if asset_manifest is not None else None,
+    )
+    template = loader.load(template_path)
+
+    # Any changed file besides sources and static files may be a template,
+    # layout or partial; a page is affected when its template uses one. Adding
+    # or removing a directory template, or renaming an asset copy, may change
+    # the template of any page, so every page is checked against the manifest
+    template_files = {
+        path
+        for path in changed
+        if not _is_within(path, static_dir) and os.path.splitext(path)[1] != ".md"
+    }
+    check_all = loader.assets != assets or any(
+        _is_within(path, content_path) and os.path.basename(path) == DIRECTORY_TEMPLATE
+        for path in template_files
+    )
+
+    pages = []
+    if content_path in changed:
+        pages = find_markdown_files(content_path, public_dir)
+    else:
+        for path in sorted(changed):
+            if not _is_within(path, content_path):
+                continue
+
+            if os.path.isdir(path):
+                rel_dir = os.path.relpath(path, content_path)
+                pages.extend(find_markdown_files(path, os.path.join(public_dir, rel_dir)))
+                continue
+
+            if os.path.splitext(path)[1] != ".md":
+                continue
+
+            dest_path = page_destination(os.path.relpath(path, content_path), public_dir)
+            if os.path.isfile(path):
+                pages.append((path, dest_path))
+            else:
+                manifest.forget(path)
+                if link_index is not None:
+                    link_index.forget(path)
+                if metadata is not None:
+                    metadata.forget(path)
+                if os.path.isfile(dest_path):
+                    remove_output(dest_path)
+                    stats["removed"] += 1
+
+    headers: dict[str, dict] = {}
+
+    def front_matter(src_item: str) -> dict:
+        if src_item not in headers:
+            headers[src_item] = read_front_matter(src_item)
+        return headers[src_item]
+
+    page_templates = {
+        src_item: loader.for_page(
+            src_item,
+            content_path,
+            template_path,
+            front_matter(src_item).get("template"),
+        )
+        for src_item, _ in pages
+    }
+
+    if template_files or check_all:
+        queued = {src_item for src_item, _ in pages}
+        for src_item, dst_item in find_markdown_files(content_path, public_dir):
+            if src_item in queued:
+                continue
+
+            page_template = loader.for_page(
+                src_item,
+                content_path,
+                template_path,
+                front_matter(src_item).get("template"),
+            )
+            affected = check_all or not page_template.dependencies.isdisjoint(
+                template_files
+            )
+            if affected and not manifest.is_fresh(
+                src_item, dst_item, page_template.hash
+            ):
+                pages.append((src_item, dst_item))
+                page_templates[src_item] = page_template
+
+    if not drafts:
+        draft_items = {
+            src_item
+            for src_item, _ in pages
+            if front_matter(src_item).get("draft", False)
+        }
+        for src_item, dst_item in pages:
+            if src_item not in draft_items:
+                continue
+            if os.path.isfile(dst_item):
+                remove_output(dst_item)
+                stats["removed"] += 1
+            manifest.forget(src_item)
+            if link_index is not None:
+                link_index.forget(src_item)
+            if metadata is not None:
+                metadata.forget(src_item)
+        pages = [page for page in pages if page[0] not in draft_items]
+
+    generate_pages(
+        pages,
+        template,
+        manifest,
+        jobs,
+        link_index=link_index,
+        metadata=metadata,
+        page_templates=page_templates,
+    )
+    stats["pages"] = len(pages)
+
+    if metadata is not None:
+        aggregate_stats = generate_aggregates(
+            metadata, content_path, public_dir, template, site_url, author=author
+        )
+        stats["aggregates"] = aggregate_stats["written"] + aggregate_stats["removed"]
+
+    manifest.save()
+    if link_index is not None:
+        link_index.save()
+    if metadata is not None:
+        metadata.save()
+
+    return stats
+
+
+def watch(
+    content_path: str,
+    static_dir: str,
+    template_path: str,
+    public_dir: str,
+    manifest: BuildManifest,
+    jobs: int = 1,
+    live_reload: LiveReload | None = None,
+    polling: bool = False,
+    debounce: float = 0.05,
+    minify: bool = False,
+    templates_dir: str | None = None,
+    link_index: LinkIndex | None = None,
+    metadata: MetadataStore | None = None,
+    site_url: str = "",
+    drafts: bool = False,
+    asset_manifest: AssetManifest | None = None,
+    template_files: Iterable[str] = (),
+    author: str = "",
+) -> None:
+    """
+    Watches content, static files and the template, rebuilding affected outputs
+    and notifying live-reload clients after each successful rebuild. Broken
+    references in link_index are reported after each rebuild. Runs until
+    interrupted. template_files names the files the build's templates were
+    assembled from, so layouts and partials outside the watched directories
+    are picked up too.
+    """
+    paths = watch_paths(
+        content_path, static_dir, template_path, templates_dir, template_files
+    )
+    watcher = create_watcher(paths, polling)
+    print(f"watching for changes ({type(watcher).__name__})")
+
+    try:
+        while True:
+            changed = watcher.wait()
+            time.sleep(debounce)
+            changed |= watcher.wait(timeout=0)
+
+            start = time.perf_counter()
+            try:
+                stats = rebuild_changes(
+                    changed,
+                    content_path,
+                    static_dir,
+                    template_path,
+                    public_dir,
+                    manifest,
+                    jobs,
+                    minify,
+                    templates_dir,
+                    link_index,
+                    metadata,
+                    site_url,
+                    drafts,
+                    asset_manifest,
+                    author,
+                )
+            except Exception as err:
+                print(f"Rebuild failed: {err}")
+                continue
+
+            elapsed = (time.perf_counter() - start) * 1000
+            print(
+                f"Rebuilt {stats['pages']} pages, removed {stats['removed']}, "
+                f"synced {stats['assets']} assets, "
+                f"wrote {stats['aggregates']} aggregates in {elapsed:.1f} ms"
+            )
+
+            if link_index is not None:
+                broken_refs = link_index.broken(
+                    content_path,
+                    static_dir,
+                    ("/" + rel_path for rel_path in metadata.aggregates)
+                    if metadata is not None
+                    else (),
+                )
+                if broken_refs:
+                    print(f"broken references: {len(broken_refs)}")
+                    for src_path, kind, url in broken_refs:
+                        rel_path = os.path.relpath(src_path, content_path)
+                        print(f"  {rel_path}: {kind} {url}")
+
+            if live_reload is not None:
+                live_reload.notify()
+    finally:
+        watcher.close()
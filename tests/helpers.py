@@ -0,0 +1,12 @@
+import os
+
+
+def write_file(path: str, data: str | bytes) -> str:
+    """
+    Writes text or bytes to a file, creating its parent directories, and
+    returns its path.
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb" if isinstance(data, bytes) else "w") as file:
+        file.write(data)
+    return path
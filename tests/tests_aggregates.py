@@ -0,0 +1,119 @@
+import os
+import tempfile
+import unittest
+
+from src.aggregates import generate_aggregates, tag_slug
+from src.metadata import MetadataStore
+from src.template import Template
+
+
+class TestGenerateAggregates(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.content = os.path.join(self.tmp.name, "content")
+        self.public = os.path.join(self.tmp.name, "public")
+        self.template = Template("<h1>{{ Title }}</h1>{{ Content }}")
+
+        self.store = MetadataStore()
+        self.add("index.md", "Home", [])
+        self.add(os.path.join("blog", "index.md"), "Notes", [])
+        self.add(os.path.join("blog", "old.md"), "Old", ["Tolkien"], "2024-01-01")
+        self.add(
+            os.path.join("blog", "new", "index.md"), "New", ["Tolkien", "Elves"], "2025-06-01"
+        )
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def add(self, rel_path, title, tags, date=None):
+        meta = {"title": title, "words": 1, "tags": tags, "date": date}
+        self.store.record(os.path.join(self.content, rel_path), title, meta)
+
+    def generate(self, **kwargs):
+        kwargs.setdefault("site_url", "https://example.com/")
+        return generate_aggregates(
+            self.store, self.content, self.public, self.template, **kwargs
+        )
+
+    def read(self, rel_path):
+        with open(os.path.join(self.public, rel_path)) as file:
+            return file.read()
+
+    def test_generates_sitemap_feed_and_tags(self):
+        stats = self.generate()
+
+        self.assertEqual(stats["written"], 5)
+        sitemap = self.read("sitemap.xml")
+        self.assertIn("<loc>https://example.com/blog/new/</loc>", sitemap)
+        self.assertIn("<lastmod>2024-01-01T00:00:00Z</lastmod>", sitemap)
+
+        feed = self.read(os.path.join("blog", "atom.xml"))
+        self.assertIn("<title>Notes</title>", feed)
+        self.assertLess(feed.index("<title>New</title>"), feed.index("<title>Old</title>"))
+        self.assertNotIn("<title>Home</title>", feed)
+
+        self.assertEqual(
+            self.read(os.path.join("tags", "tolkien", "index.html")),
+            '<h1>Tagged Tolkien</h1><ul><li><a href="/blog/new/">New</a></li>'
+            '<li><a href="/blog/old.html">Old</a></li></ul>',
+        )
+        tags = self.read(os.path.join("tags", "index.html"))
+        self.assertIn('<a href="/tags/elves/">Elves (1)</a>', tags)
+
+    def test_regenerates_only_changed_aggregates(self):
+        self.generate()
+        self.add(os.path.join("blog", "old.md"), "Old", ["Tolkien", "Maps"], "2024-01-01")
+        stats = self.generate()
+
+        self.assertEqual(stats, {"written": 2, "skipped": 0, "fresh": 4, "removed": 0})
+        self.assertTrue(os.path.exists(os.path.join(self.public, "tags", "maps", "index.html")))
+
+    def test_removes_aggregates_no_longer_produced(self):
+        self.generate()
+        self.add(os.path.join("blog", "new", "index.md"), "New", ["Tolkien"], "2025-06-01")
+        stats = self.generate()
+
+        self.assertEqual(stats["removed"], 1)
+        self.assertFalse(os.path.exists(os.path.join(self.public, "tags", "elves", "index.html")))
+
+    def test_feed_has_required_elements(self):
+        self.generate(author="Bilbo")
+        feed = self.read(os.path.join("blog", "atom.xml"))
+
+        self.assertIn("<id>https://example.com/blog/atom.xml</id>", feed)
+        self.assertIn("<updated>2025-06-01T00:00:00Z</updated>", feed)
+        self.assertIn("<author><name>Bilbo</name></author>", feed)
+        self.assertIn(
+            "<entry><title>New</title>"
+            '<link href="https://example.com/blog/new/"/>'
+            "<id>https://example.com/blog/new/</id>"
+            "<updated>2025-06-01T00:00:00Z</updated></entry>",
+            feed,
+        )
+
+        self.generate()
+        self.assertIn(
+            "<author><name>example.com</name></author>",
+            self.read(os.path.join("blog", "atom.xml")),
+        )
+
+    def test_sitemap_and_feed_need_site_url(self):
+        self.generate()
+        stats = self.generate(site_url="")
+
+        self.assertEqual(stats["removed"], 2)
+        self.assertFalse(os.path.exists(os.path.join(self.public, "sitemap.xml")))
+        self.assertFalse(os.path.exists(os.path.join(self.public, "blog", "atom.xml")))
+        self.assertTrue(os.path.exists(os.path.join(self.public, "tags", "index.html")))
+
+        with self.assertRaises(Exception) as context:
+            self.generate(site_url="/blog")
+        self.assertIn("must be absolute", str(context.exception))
+
+    def test_tag_slug(self):
+        self.assertEqual(tag_slug("Middle Earth!"), "middle-earth")
+        self.assertEqual(tag_slug("???"), "tag")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,123 @@
+import os
+import tempfile
+import unittest
+
+from src.assets import (
+    AssetManifest,
+    copy_fingerprinted,
+    fingerprint_assets,
+    fingerprint_name,
+    is_fingerprinted,
+    rewrite_asset_urls,
+)
+from src.copy_static import sync_static_files
+from src.manifest import hash_bytes
+from src.minify import CssMinifier
+from tests.helpers import write_file
+
+
+class TestFingerprintNames(unittest.TestCase):
+    def test_fingerprint_name(self):
+        name = fingerprint_name(os.path.join("images", "a.png"), "3f2a9c01bd" + "0" * 54)
+        self.assertEqual(name, os.path.join("images", "a.3f2a9c01bd.png"))
+        self.assertTrue(is_fingerprinted(name))
+        self.assertFalse(is_fingerprinted("/images/a.png"))
+        self.assertFalse(is_fingerprinted("/jquery.3.7.1.js"))
+
+    def test_rewrite_asset_urls(self):
+        assets = {"/index.css": "/index.abc.css", "/a.png": "/a.def.png"}
+        self.assertEqual(
+            rewrite_asset_urls(
+                "<link rel='stylesheet' href='/index.css#x'>"
+                '<img alt="" src="/a.png"><img src="a.png"><a href="/a.png">/a.png</a>',
+                assets,
+            ),
+            "<link rel='stylesheet' href='/index.abc.css#x'>"
+            '<img alt="" src="/a.def.png"><img src="a.png"><a href="/a.png">/a.png</a>',
+        )
+
+
+class TestFingerprintAssets(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.static = os.path.join(self.tmp.name, "static")
+        self.public = os.path.join(self.tmp.name, "public")
+        self.manifest_path = os.path.join(self.tmp.name, ".cache", "assets.json")
+
+        write_file(os.path.join(self.static, "index.css"), "body {\n  color: red;\n}\n")
+        write_file(os.path.join(self.static, "images", "a.png"), "png-bytes")
+        write_file(os.path.join(self.static, "robots.txt"), "User-agent: *")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _read(self, url: str) -> str:
+        with open(os.path.join(self.public, *url.lstrip("/").split("/"))) as file:
+            return file.read()
+
+    def build(self, **kwargs):
+        manifest = AssetManifest(self.manifest_path)
+        stats = fingerprint_assets(self.static, self.public, manifest, **kwargs)
+        manifest.save()
+        return manifest, stats
+
+    def test_streamed_copy_is_content_addressed(self):
+        src = os.path.join(self.static, "images", "a.png")
+        os.makedirs(self.public)
+        dst = os.path.join(self.public, "a.png")
+
+        hashed = copy_fingerprinted(src, dst, chunk_size=2)
+
+        self.assertEqual(hashed, fingerprint_name(dst, hash_bytes(b"png-bytes")))
+        self.assertEqual(os.listdir(self.public), [os.path.basename(hashed)])
+        self.assertEqual(copy_fingerprinted(src, dst), hashed)
+
+    def test_copies_assets_and_skips_unchanged(self):
+        manifest, stats = self.build()
+
+        self.assertEqual(stats, {"written": 2, "fresh": 0, "removed": 0})
+        urls = manifest.urls()
+        self.assertEqual(sorted(urls), ["/images/a.png", "/index.css"])
+        self.assertTrue(is_fingerprinted(urls["/index.css"]))
+        self.assertEqual(self._read(urls["/images/a.png"]), "png-bytes")
+
+        _, stats = self.build()
+        self.assertEqual(stats, {"written": 0, "fresh": 2, "removed": 0})
+
+    def test_changed_and_removed_assets_replace_their_copies(self):
+        before = self.build()[0].urls()
+        write_file(os.path.join(self.static, "index.css"), "p {}")
+        os.remove(os.path.join(self.static, "images", "a.png"))
+
+        manifest, stats = self.build()
+
+        self.assertEqual(stats, {"written": 1, "fresh": 0, "removed": 1})
+        self.assertNotEqual(manifest.urls()["/index.css"], before["/index.css"])
+        self.assertEqual(self._read(manifest.urls()["/index.css"]), "p {}")
+        stale = os.path.join(self.public, before["/index.css"].lstrip("/"))
+        self.assertFalse(os.path.exists(stale))
+        self.assertEqual(os.listdir(os.path.join(self.public, "images")), [])
+
+    def test_minified_stylesheets(self):
+        manifest, _ = self.build(css_minifier=CssMinifier())
+        self.assertEqual(self._read(manifest.urls()["/index.css"]), "body{color:red}")
+
+        manifest, stats = self.build()
+        self.assertEqual(stats["written"], 1)
+        self.assertEqual(
+            self._read(manifest.urls()["/index.css"]), "body {\n  color: red;\n}\n"
+        )
+
+    def test_sync_keeps_copies(self):
+        manifest, _ = self.build()
+        stats = sync_static_files(
+            self.static, self.public, keep=manifest.paths(self.public)
+        )
+
+        self.assertEqual(stats["removed"], 0)
+        for url in manifest.urls().values():
+            self.assertTrue(os.path.exists(os.path.join(self.public, url.lstrip("/"))))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,40 @@
+import os
+import tempfile
+import unittest
+
+from bench.benchmarks import run_benchmarks
+from bench.corpus import CorpusGenerator
+from src.block_markdown import markdown_to_html_node
+from src.generate_html import extract_title
+
+
+class TestCorpusGenerator(unittest.TestCase):
+    def test_deterministic(self):
+        first = CorpusGenerator(seed=7).pages(5)
+        second = CorpusGenerator(seed=7).pages(5)
+        self.assertEqual(first, second)
+
+    def test_pages_are_valid_markdown(self):
+        for _, markdown in CorpusGenerator(seed=1, link_density=0.5).pages(20):
+            self.assertTrue(extract_title(markdown).startswith("Page "))
+            markdown_to_html_node(markdown).to_html()
+
+    def test_write_site(self):
+        with tempfile.TemporaryDirectory() as root:
+            size = CorpusGenerator().write_site(root, 3)
+            self.assertGreater(size, 0)
+            self.assertTrue(os.path.exists(os.path.join(root, "template.html")))
+            self.assertTrue(os.path.exists(os.path.join(root, "static", "index.css")))
+
+
+class TestRunBenchmarks(unittest.TestCase):
+    def test_run_subset(self):
+        results = run_benchmarks(page_count=3, repeat=1, only={"to_html", "build"})
+        self.assertEqual([result["name"] for result in results], ["to_html", "build"])
+        for result in results:
+            self.assertGreater(result["pages_per_s"], 0)
+            self.assertGreater(result["peak_bytes"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
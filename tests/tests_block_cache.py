@@ -0,0 +1,121 @@
+import os
+import tempfile
+import unittest
+
+from src import generate_html
+from src.block_cache import BlockCache
+from src.block_markdown import markdown_to_html_node
+from src.generate_html import generate_pages_recursive
+
+MARKDOWN = """
+# Shared heading
+
+A paragraph with a [link](/somewhere) and **bold** text.
+
+- one
+- two
+
+```
+code block
+```
+"""
+
+
+class TestBlockCache(unittest.TestCase):
+    def test_cached_render_matches_uncached(self):
+        cache = BlockCache()
+        expected = markdown_to_html_node(MARKDOWN).to_html()
+
+        first = markdown_to_html_node(MARKDOWN, cache).to_html()
+        second = markdown_to_html_node(MARKDOWN, cache).to_html()
+
+        self.assertEqual(first, expected)
+        self.assertEqual(second, expected)
+        self.assertEqual(cache.misses, 4)
+        self.assertEqual(cache.hits, 4)
+
+    def test_cached_blocks_keep_references(self):
+        cache = BlockCache()
+        markdown_to_html_node(MARKDOWN, cache)
+
+        refs = []
+        markdown_to_html_node(MARKDOWN, cache, refs=refs)
+
+        self.assertEqual(cache.hits, 4)
+        self.assertEqual(refs, [("link", "/somewhere")])
+
+    def test_lru_eviction(self):
+        cache = BlockCache(max_entries=2)
+        cache.put("a", "<p>a</p>")
+        cache.put("b", "<p>b</p>")
+        cache.get("a")
+        cache.put("c", "<p>c</p>")
+
+        self.assertEqual(len(cache), 2)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("a"), "<p>a</p>")
+
+    def test_persisted_between_runs(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "cache", "blocks.json")
+            cache = BlockCache(path=path)
+            markdown_to_html_node(MARKDOWN, cache)
+            cache.save()
+
+            reloaded = BlockCache(path=path)
+            self.assertEqual(len(reloaded), 4)
+            markdown_to_html_node(MARKDOWN, reloaded)
+            self.assertEqual(reloaded.misses, 0)
+
+    def test_version_mismatch_discards_store(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "blocks.json")
+            with open(path, "w") as file:
+                file.write('{"version": -1, "entries": [["k", "v"]]}')
+            self.assertEqual(len(BlockCache(path=path)), 0)
+
+    def test_parallel_builds_share_the_store(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            content = os.path.join(tmp, "content")
+            template = os.path.join(tmp, "template.html")
+            os.makedirs(content)
+            for name in ("a", "b", "c"):
+                with open(os.path.join(content, f"{name}.md"), "w") as file:
+                    file.write(f"# {name}{MARKDOWN}")
+            with open(template, "w") as file:
+                file.write("{{ Content }}")
+
+            for io_threads in (0, 2):
+                with self.subTest(io_threads=io_threads):
+                    cache = BlockCache()
+                    generate_pages_recursive(
+                        content,
+                        template,
+                        os.path.join(tmp, "public"),
+                        jobs=2,
+                        block_cache=cache,
+                        io_threads=io_threads,
+                    )
+                    self.assertEqual(len(cache), 6)
+
+    def test_workers_are_seeded_from_the_parent(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "page.md")
+            with open(path, "w") as file:
+                file.write(MARKDOWN)
+
+            cache = BlockCache()
+            markdown_to_html_node(MARKDOWN, cache)
+            try:
+                generate_html._init_worker(cache.items())
+                rendered = generate_html._render_source(
+                    path, generate_html.Template("{{ Content }}"), cache_blocks=True
+                )
+            finally:
+                generate_html._worker_block_cache = None
+
+            self.assertEqual(rendered[-1], [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -4,6 +4,7 @@ from src.block_markdown import (
     block_to_block_type,
     markdown_to_blocks,
     markdown_to_html_node,
+    scan_blocks,
 )
 
 
@@ -353,5 +354,42 @@ return a + b
         )
 
 
+class TestScanBlocks(unittest.TestCase):
+    def test_classifies_while_scanning(self):
+        md = "# Title\n\n> quote\n> more\n\n- a\n- b\n\n1. one\n2. two\n\ntext\nwrapped\n"
+        actual = list(scan_blocks(md.split("\n")))
+        expected = [
+            ("heading", ["# Title"]),
+            ("quote", ["> quote", "> more"]),
+            ("unordered_list", ["- a", "- b"]),
+            ("ordered_list", ["1. one", "2. two"]),
+            ("paragraph", ["text", "wrapped"]),
+        ]
+        self.assertListEqual(actual, expected)
+
+    def test_fenced_code_with_blank_lines(self):
+        md = "intro\n\n```\nfirst\n\n\nsecond\n```\n\noutro"
+        self.assertListEqual(
+            markdown_to_blocks(md), ["intro", "```\nfirst\n\n\nsecond\n```", "outro"]
+        )
+        self.assertEqual(
+            markdown_to_html_node(md).to_html(),
+            "<div><p>intro</p><pre><code>first\n\n\nsecond\n</code></pre><p>outro</p></div>",
+        )
+
+    def test_unclosed_fence_falls_back_to_blocks(self):
+        md = "```\nnot closed\n\nnext paragraph"
+        self.assertListEqual(
+            list(scan_blocks(md.split("\n"))),
+            [("paragraph", ["```", "not closed"]), ("paragraph", ["next paragraph"])],
+        )
+
+    def test_line_iterator_with_newlines(self):
+        lines = iter(["# Title\n", "\n", "body  \n"])
+        self.assertListEqual(
+            list(scan_blocks(lines)), [("heading", ["# Title"]), ("paragraph", ["body"])]
+        )
+
+
 if __name__ == "__main__":
     unittest.main()
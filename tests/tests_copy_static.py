@@ -0,0 +1,114 @@
+import os
+import tempfile
+import unittest
+
+from src.copy_static import copy_static_files, sync_static_files
+from src.minify import CssMinifier
+from tests.helpers import write_file
+
+
+class TestSyncStaticFiles(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.static = os.path.join(self.tmp.name, "static")
+        self.public = os.path.join(self.tmp.name, "public")
+
+        os.makedirs(os.path.join(self.static, "images"))
+        write_file(os.path.join(self.static, "index.css"), "body {}")
+        write_file(os.path.join(self.static, "images", "a.png"), "png-bytes")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_initial_sync_copies_everything(self):
+        stats = sync_static_files(self.static, self.public)
+        self.assertEqual(stats, {"copied": 2, "skipped": 0, "removed": 0})
+
+        with open(os.path.join(self.public, "images", "a.png")) as file:
+            self.assertEqual(file.read(), "png-bytes")
+
+    def test_css_minified_during_sync(self):
+        write_file(os.path.join(self.static, "index.css"), "body {\n  color: red;\n}\n")
+        minifier = CssMinifier()
+
+        stats = sync_static_files(self.static, self.public, css_minifier=minifier)
+        self.assertEqual(stats["copied"], 2)
+        with open(os.path.join(self.public, "index.css")) as file:
+            self.assertEqual(file.read(), "body{color:red}")
+
+        stats = sync_static_files(self.static, self.public, css_minifier=minifier)
+        self.assertEqual(stats, {"copied": 0, "skipped": 2, "removed": 0})
+        self.assertEqual(minifier.cache.hits, 1)
+
+    def test_resync_skips_unchanged(self):
+        sync_static_files(self.static, self.public)
+        stats = sync_static_files(self.static, self.public)
+        self.assertEqual(stats, {"copied": 0, "skipped": 2, "removed": 0})
+
+    def test_changed_file_is_recopied(self):
+        sync_static_files(self.static, self.public)
+        css = os.path.join(self.static, "index.css")
+        write_file(css, "body { color: red }")
+
+        stats = sync_static_files(self.static, self.public, checksum=True)
+        self.assertEqual(stats["copied"], 1)
+
+        with open(os.path.join(self.public, "index.css")) as file:
+            self.assertEqual(file.read(), "body { color: red }")
+
+    def test_orphans_removed_but_kept_files_preserved(self):
+        sync_static_files(self.static, self.public)
+        page = os.path.join(self.public, "blog", "index.html")
+        write_file(page, "<html></html>")
+        write_file(os.path.join(self.public, "stale", "old.css"), "old")
+        os.remove(os.path.join(self.static, "images", "a.png"))
+
+        stats = sync_static_files(self.static, self.public, keep={page})
+
+        self.assertEqual(stats["removed"], 2)
+        self.assertTrue(os.path.exists(page))
+        self.assertFalse(os.path.exists(os.path.join(self.public, "stale")))
+        self.assertFalse(os.path.exists(os.path.join(self.public, "images", "a.png")))
+
+    def test_link_mode(self):
+        sync_static_files(self.static, self.public, link=True)
+        src_stat = os.stat(os.path.join(self.static, "index.css"))
+        dst_stat = os.stat(os.path.join(self.public, "index.css"))
+        self.assertEqual(src_stat.st_ino, dst_stat.st_ino)
+
+    def test_missing_source(self):
+        with self.assertRaises(FileNotFoundError):
+            sync_static_files(os.path.join(self.tmp.name, "nope"), self.public)
+
+
+class TestCopyStaticFiles(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.static = os.path.join(self.tmp.name, "static")
+        self.public = os.path.join(self.tmp.name, "public")
+
+        os.makedirs(os.path.join(self.static, "images"))
+        for path in (("index.css",), ("images", "a.png")):
+            with open(os.path.join(self.static, *path), "w") as file:
+                file.write("body {}")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_reports_every_output(self):
+        for css_minifier in (None, CssMinifier()):
+            outputs = []
+            copy_static_files(
+                self.static, self.public, outputs.append, css_minifier=css_minifier
+            )
+            self.assertEqual(
+                sorted(outputs),
+                [
+                    os.path.join(self.public, "images", "a.png"),
+                    os.path.join(self.public, "index.css"),
+                ],
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,165 @@
+import os
+import tempfile
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from src.file_io import (
+    BatchWriter,
+    DirectoryCreator,
+    open_atomic,
+    prefetch_files,
+    write_if_changed,
+)
+from src.generate_html import _map_windowed
+from src.manifest import hash_bytes
+
+
+class TestPrefetchFiles(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_yields_in_order(self):
+        paths = []
+        for i in range(50):
+            path = os.path.join(self.tmp.name, f"{i}.md")
+            with open(path, "wb") as file:
+                file.write(str(i).encode())
+            paths.append(path)
+
+        result = list(prefetch_files(paths, threads=3, window=4))
+        self.assertEqual([path for path, _ in result], paths)
+        self.assertEqual([data for _, data in result], [str(i).encode() for i in range(50)])
+
+    def test_missing_file_raises(self):
+        with self.assertRaises(OSError):
+            list(prefetch_files([os.path.join(self.tmp.name, "missing.md")]))
+
+
+class TestMapWindowed(unittest.TestCase):
+    def test_consumes_arguments_lazily(self):
+        consumed = []
+
+        def args():
+            for i in range(100):
+                consumed.append(i)
+                yield (i,)
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            results = _map_windowed(executor, lambda i: i * 2, args(), 4, window=2)
+            self.assertEqual(next(results), 0)
+            self.assertLessEqual(len(consumed), 12)
+            self.assertEqual(list(results), [i * 2 for i in range(1, 100)])
+
+
+class TestBatchWriter(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_writes_all_files(self):
+        with BatchWriter(threads=2, batch_size=3) as writer:
+            for i in range(10):
+                writer.write(os.path.join(self.tmp.name, "a", f"{i % 2}", f"{i}.html"), b"x" * i)
+
+        self.assertEqual(writer.written, 10)
+        with open(os.path.join(self.tmp.name, "a", "1", "7.html"), "rb") as file:
+            self.assertEqual(file.read(), b"x" * 7)
+
+    def test_write_error_names_file(self):
+        blocker = os.path.join(self.tmp.name, "file")
+        with open(blocker, "w") as file:
+            file.write("")
+
+        target = os.path.join(blocker, "page.html")
+        with self.assertRaises(Exception) as context:
+            with BatchWriter() as writer:
+                writer.write(target, b"")
+        self.assertIn(target, str(context.exception))
+
+    def test_blocks_when_too_many_batches_are_pending(self):
+        release = threading.Event()
+        writer = BatchWriter(threads=1, batch_size=1, max_pending=2)
+        write_batch = writer._write_batch
+
+        def slow_write_batch(batch):
+            release.wait()
+            return write_batch(batch)
+
+        writer._write_batch = slow_write_batch
+        producer = threading.Thread(
+            target=lambda: [
+                writer.write(os.path.join(self.tmp.name, f"{i}.html"), b"x")
+                for i in range(5)
+            ],
+            daemon=True,
+        )
+        producer.start()
+        try:
+            producer.join(timeout=0.2)
+            self.assertTrue(producer.is_alive())
+            self.assertEqual(len(writer._futures), 2)
+        finally:
+            release.set()
+        producer.join()
+        writer.close()
+        self.assertEqual(writer.written, 5)
+
+    def test_directories_created_once(self):
+        directories = DirectoryCreator()
+        path = os.path.join(self.tmp.name, "x", "y")
+        directories.ensure(path)
+        os.rmdir(path)
+        directories.ensure(path)
+        self.assertFalse(os.path.exists(path))
+
+
+class TestWriteIfChanged(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "page.html")
+        with open(self.path, "wb") as file:
+            file.write(b"same")
+        os.utime(self.path, ns=(1, 1))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_identical_content_is_not_written(self):
+        self.assertFalse(write_if_changed(self.path, b"same"))
+        self.assertFalse(write_if_changed(self.path, b"same", hash_bytes(b"same")))
+        self.assertEqual(os.stat(self.path).st_mtime_ns, 1)
+
+    def test_changed_content_is_written(self):
+        self.assertTrue(write_if_changed(self.path, b"diff"))
+        with open(self.path, "rb") as file:
+            self.assertEqual(file.read(), b"diff")
+
+    def test_open_atomic_skip_unchanged(self):
+        output = open_atomic(self.path, "w", skip_unchanged=True)
+        with output as file:
+            file.write("same")
+        self.assertFalse(output.changed)
+        self.assertEqual(os.stat(self.path).st_mtime_ns, 1)
+        self.assertEqual(os.listdir(self.tmp.name), ["page.html"])
+
+        output = open_atomic(self.path, "w", skip_unchanged=True)
+        with output as file:
+            file.write("other")
+        self.assertTrue(output.changed)
+
+    def test_batch_writer_counts_skipped(self):
+        with BatchWriter(threads=2, batch_size=2) as writer:
+            writer.write(self.path, b"same")
+            writer.write(os.path.join(self.tmp.name, "new.html"), b"new")
+
+        self.assertEqual((writer.written, writer.skipped), (1, 1))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,111 @@
+import io
+import os
+import tempfile
+import unittest
+
+from src.front_matter import parse_front_matter, read_front_matter, split_front_matter
+
+
+class TestFrontMatter(unittest.TestCase):
+    def test_yaml_style(self):
+        front_matter, body = split_front_matter(
+            "---\n"
+            'title: "Tom: revisited"\n'
+            "date: 2024-03-02\n"
+            "\n"
+            "tags:\n"
+            "  - tolkien\n"
+            "  - 'characters'\n"
+            "draft: false\n"
+            "template: post.html\n"
+            "---\n"
+            "# Body\n"
+        )
+        self.assertEqual(
+            front_matter,
+            {
+                "title": "Tom: revisited",
+                "date": "2024-03-02",
+                "tags": ["tolkien", "characters"],
+                "draft": False,
+                "template": "post.html",
+            },
+        )
+        self.assertEqual(body, "# Body\n")
+
+    def test_toml_style(self):
+        front_matter, body = split_front_matter(
+            '+++\ntitle = "X"\ntags = ["a", b]\ndate = 2024-05-01T10:00:00+02:00\n'
+            "draft = true\n+++\nbody"
+        )
+        self.assertEqual(
+            front_matter,
+            {"title": "X", "tags": ["a", "b"], "date": "2024-05-01T08:00:00Z", "draft": True},
+        )
+        self.assertEqual(body, "body")
+
+    def test_without_front_matter(self):
+        self.assertEqual(split_front_matter("# Title\n\ntext"), ({}, "# Title\n\ntext"))
+        self.assertEqual(split_front_matter(""), ({}, ""))
+
+    def test_single_tag_becomes_list(self):
+        front_matter, _ = split_front_matter("---\ntags: tolkien\n---\n")
+        self.assertEqual(front_matter["tags"], ["tolkien"])
+
+    def test_invalid_front_matter(self):
+        for markdown in (
+            "---\ndate: yesterday\n---\n",
+            "---\ndraft: maybe\n---\n",
+        ):
+            with self.subTest(markdown=markdown):
+                with self.assertRaises(Exception):
+                    split_front_matter(markdown)
+
+    def test_thematic_break_is_not_front_matter(self):
+        for markdown in (
+            "---\n\n# A\n\nok",
+            "---\ntitle: x\n# Body",
+            "---\nno separator\n---\n",
+            "---\n# not: a key\n---\n",
+            "---\nNote that: this is text\n---\n",
+        ):
+            with self.subTest(markdown=markdown):
+                self.assertEqual(split_front_matter(markdown), ({}, markdown))
+
+        lines = io.StringIO("---\n\n# A\nok\nmore\n")
+        front_matter, replay = parse_front_matter(lines)
+        self.assertEqual((front_matter, replay), ({}, ["---\n", "\n", "# A\n"]))
+        self.assertEqual(lines.read(), "ok\nmore\n")
+
+    def test_leaves_body_unread(self):
+        def lines():
+            yield "---\n"
+            yield "title: T\n"
+            yield "---\n"
+            raise AssertionError("body was read")
+
+        front_matter, replay = parse_front_matter(lines())
+        self.assertEqual((front_matter, replay), ({"title": "T"}, []))
+
+    def test_replays_first_line(self):
+        lines = io.StringIO("# Title\nmore\n")
+        front_matter, replay = parse_front_matter(lines)
+        self.assertEqual((front_matter, replay), ({}, ["# Title\n"]))
+        self.assertEqual(lines.read(), "more\n")
+
+    def test_read_front_matter_names_file(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "page.md")
+            with open(path, "w") as file:
+                file.write("---\ndraft: true\n---\n" + "body\n" * 10000)
+            self.assertEqual(read_front_matter(path), {"draft": True})
+
+            with open(path, "w") as file:
+                file.write("---\ndraft: maybe\n---\n")
+            with self.assertRaises(Exception) as context:
+                read_front_matter(path)
+            self.assertIn(path, str(context.exception))
+
+
+if __name__ == "__main__":
+    unittest.main()
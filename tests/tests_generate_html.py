@@ -0,0 +1,275 @@
+import io
+import os
+import tempfile
+import tracemalloc
+import unittest
+
+from src.generate_html import (
+    find_markdown_files,
+    generate_pages_recursive,
+    read_title,
+    render_page,
+    write_page_stream,
+)
+from src.manifest import BuildManifest
+from src.metadata import MetadataStore
+from src.template import TemplateLoader
+from src.template import Template
+from tests.helpers import write_file
+
+
+class TestGeneratePages(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        root = self.tmp.name
+        self.content = os.path.join(root, "content")
+        self.template = os.path.join(root, "template.html")
+
+        os.makedirs(os.path.join(self.content, "blog", "post"))
+        for i in range(6):
+            write_file(
+                os.path.join(self.content, f"page{i}.md"), f"# Page {i}\n\n*body*"
+            )
+        write_file(os.path.join(self.content, "blog", "post", "index.md"), "# Post")
+        write_file(self.template, "<title>{{ Title }}</title>{{ Content }}")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _read_tree(self, root: str) -> dict[str, str]:
+        result = {}
+        for dir_path, _, file_names in os.walk(root):
+            for file_name in file_names:
+                path = os.path.join(dir_path, file_name)
+                with open(path) as file:
+                    result[os.path.relpath(path, root)] = file.read()
+        return result
+
+    def test_find_markdown_files(self):
+        pages = find_markdown_files(self.content, "public")
+        self.assertEqual(len(pages), 7)
+        self.assertIn(
+            (
+                os.path.join(self.content, "blog", "post", "index.md"),
+                os.path.join("public", "blog", "post", "index.html"),
+            ),
+            pages,
+        )
+
+    def test_parallel_matches_serial(self):
+        serial = os.path.join(self.tmp.name, "serial")
+        parallel = os.path.join(self.tmp.name, "parallel")
+        generate_pages_recursive(self.content, self.template, serial)
+        generate_pages_recursive(self.content, self.template, parallel, jobs=3)
+
+        self.assertEqual(self._read_tree(serial), self._read_tree(parallel))
+        self.assertEqual(
+            self._read_tree(serial)[os.path.join("blog", "post", "index.html")],
+            "<title>Post</title><div><h1>Post</h1></div>",
+        )
+
+    def test_parallel_error_names_file(self):
+        broken = os.path.join(self.content, "broken.md")
+        write_file(broken, "no title here")
+
+        with self.assertRaises(Exception) as context:
+            generate_pages_recursive(
+                self.content, self.template, os.path.join(self.tmp.name, "out"), jobs=2
+            )
+        self.assertIn(broken, str(context.exception))
+
+    def test_stream_matches_serial(self):
+        serial = os.path.join(self.tmp.name, "serial")
+        streamed = os.path.join(self.tmp.name, "streamed")
+        generate_pages_recursive(self.content, self.template, serial)
+        generate_pages_recursive(self.content, self.template, streamed, stream=True)
+
+        self.assertEqual(self._read_tree(serial), self._read_tree(streamed))
+
+    def test_io_pipeline_matches_serial(self):
+        serial = os.path.join(self.tmp.name, "serial")
+        generate_pages_recursive(self.content, self.template, serial)
+
+        for jobs in (1, 3):
+            piped = os.path.join(self.tmp.name, f"piped{jobs}")
+            manifest = BuildManifest(os.path.join(self.tmp.name, f"manifest{jobs}.json"))
+            generate_pages_recursive(
+                self.content, self.template, piped, manifest, jobs=jobs, io_threads=2
+            )
+
+            self.assertEqual(self._read_tree(serial), self._read_tree(piped))
+            self.assertEqual(len(manifest.entries), 7)
+
+    def test_io_pipeline_error_names_file(self):
+        broken = os.path.join(self.content, "broken.md")
+        write_file(broken, "no title here")
+
+        with self.assertRaises(Exception) as context:
+            generate_pages_recursive(
+                self.content,
+                self.template,
+                os.path.join(self.tmp.name, "out"),
+                io_threads=2,
+            )
+        self.assertIn(broken, str(context.exception))
+
+    def test_drafts_are_skipped_unparsed(self):
+        draft = os.path.join(self.content, "draft.md")
+        write_file(draft, "---\ndraft: true\n---\nno title, so rendering would fail")
+        out = os.path.join(self.tmp.name, "out")
+        manifest = BuildManifest(os.path.join(self.tmp.name, "manifest.json"))
+        metadata = MetadataStore()
+
+        stats = generate_pages_recursive(
+            self.content, self.template, out, manifest, metadata=metadata
+        )
+        self.assertEqual(stats["drafts"], 1)
+        self.assertNotIn(draft, manifest.entries)
+        self.assertFalse(os.path.exists(os.path.join(out, "draft.html")))
+
+        write_file(draft, "---\ndraft: true\n---\n# Draft")
+        stats = generate_pages_recursive(
+            self.content, self.template, out, manifest, metadata=metadata, drafts=True
+        )
+        self.assertEqual(stats["written"], 1)
+        self.assertTrue(metadata.entries[draft]["draft"])
+
+        generate_pages_recursive(
+            self.content, self.template, out, manifest, metadata=metadata
+        )
+        self.assertFalse(os.path.exists(os.path.join(out, "draft.html")))
+
+    def test_partial_edit_rebuilds_only_its_pages(self):
+        templates = os.path.join(self.tmp.name, "templates")
+        os.makedirs(templates)
+        write_file(
+            os.path.join(templates, "post.html"), "<article>{{ Content }}</article>"
+        )
+        write_file(
+            os.path.join(self.content, "blog", "template.html"),
+            "{% include 'post.html' %}",
+        )
+        write_file(
+            os.path.join(self.content, "page1.md"), "---\ntemplate: post.html\n---\n# P"
+        )
+        out = os.path.join(self.tmp.name, "out")
+        manifest = BuildManifest(os.path.join(self.tmp.name, "manifest.json"))
+
+        def build():
+            return generate_pages_recursive(
+                self.content,
+                self.template,
+                out,
+                manifest,
+                metadata=metadata,
+                template_loader=TemplateLoader(templates),
+            )
+
+        metadata = MetadataStore()
+        self.assertEqual(build()["written"], 7)
+        self.assertEqual(
+            self._read_tree(out)[os.path.join("blog", "post", "index.html")],
+            "<article><div><h1>Post</h1></div></article>",
+        )
+
+        write_file(os.path.join(templates, "post.html"), "<main>{{ Content }}</main>")
+        self.assertEqual(build(), {"written": 2, "skipped": 0, "fresh": 5, "drafts": 0})
+        self.assertIn("<main>", self._read_tree(out)["page1.html"])
+
+    def test_front_matter_title(self):
+        write_file(
+            os.path.join(self.content, "page0.md"), "---\ntitle: From front matter\n---\nbody"
+        )
+        out = os.path.join(self.tmp.name, "out")
+
+        for stream in (False, True):
+            with self.subTest(stream=stream):
+                generate_pages_recursive(self.content, self.template, out, stream=stream)
+                self.assertEqual(
+                    self._read_tree(out)["page0.html"],
+                    "<title>From front matter</title><div><p>body</p></div>",
+                )
+
+    def test_leading_thematic_break(self):
+        write_file(os.path.join(self.content, "page0.md"), "---\n\n# A\n\nok")
+        out = os.path.join(self.tmp.name, "out")
+
+        for stream in (False, True):
+            with self.subTest(stream=stream):
+                generate_pages_recursive(self.content, self.template, out, stream=stream)
+                self.assertEqual(
+                    self._read_tree(out)["page0.html"],
+                    "<title>A</title><div><p>---</p><h1>A</h1><p>ok</p></div>",
+                )
+
+    def test_missing_template_names_page(self):
+        page = os.path.join(self.content, "page0.md")
+        write_file(page, "---\ntemplate: nope.html\n---\n# Page")
+        out = os.path.join(self.tmp.name, "out")
+
+        with self.assertRaises(Exception) as context:
+            generate_pages_recursive(self.content, self.template, out)
+        self.assertIn(page, str(context.exception))
+        self.assertIn("Template not found: nope.html", str(context.exception))
+
+    def test_front_matter_fields_in_template(self):
+        write_file(
+            os.path.join(self.content, "page0.md"),
+            "---\ndate: 2024-05-01\nauthor: Ada\ntags: [a, b]\ndraft: false\n"
+            "Content: ignored\n---\n# Hello",
+        )
+        write_file(
+            self.template, "{{ date }} {{ author }} {{ tags }} {{ draft }} {{ Content }}"
+        )
+        out = os.path.join(self.tmp.name, "out")
+
+        for kwargs in ({}, {"stream": True}, {"jobs": 2}, {"io_threads": 2}):
+            with self.subTest(**kwargs):
+                generate_pages_recursive(self.content, self.template, out, **kwargs)
+                self.assertEqual(
+                    self._read_tree(out)["page0.html"],
+                    "2024-05-01 Ada a, b false <div><h1>Hello</h1></div>",
+                )
+
+
+class TestStreamingPages(unittest.TestCase):
+    def test_read_title_consumes_only_prefix(self):
+        lines = iter(["intro\n", "\n", "# Title\n", "\n", "rest\n", "more\n"])
+        title, consumed = read_title(lines)
+        self.assertEqual(title, "Title")
+        self.assertEqual(list(lines), ["rest\n", "more\n"])
+        self.assertEqual(consumed, ["intro\n", "\n", "# Title\n", "\n"])
+
+    def test_stream_matches_render_page(self):
+        markdown = "# Title\n\nSome *text*\n\n```\ncode\n\nmore\n```\n\n- a\n- b\n"
+        template = Template("<title>{{ Title }}</title>{{ Content }}")
+        buffer = io.StringIO()
+        write_page_stream(buffer, markdown.splitlines(keepends=True), template)
+        self.assertEqual(buffer.getvalue(), render_page(markdown, template))
+
+    def test_stream_memory_is_bounded(self):
+        def lines(count: int):
+            yield "# Huge\n"
+            for i in range(count):
+                yield "\n"
+                yield f"paragraph {i} with a [link](/page{i}) and **bold** text\n"
+
+        template = Template("{{ Content }}")
+
+        class NullWriter:
+            def writelines(self, chunks):
+                for _ in chunks:
+                    pass
+
+        peaks = []
+        for count in (1_000, 10_000):
+            tracemalloc.start()
+            write_page_stream(NullWriter(), lines(count), template)  # type: ignore
+            peaks.append(tracemalloc.get_traced_memory()[1])
+            tracemalloc.stop()
+
+        self.assertLess(peaks[1], peaks[0] * 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
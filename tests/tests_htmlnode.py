@@ -1,6 +1,7 @@
+import io
 import unittest
 
-from src.htmlnode import HTMLNode, LeafNode, ParentNode
+from src.htmlnode import HTMLNode, LeafNode, ParentNode, RawHTMLNode
 
 
 class TestHTMLNode(unittest.TestCase):
@@ -217,6 +218,54 @@ class TestParentNode(unittest.TestCase):
             actual, expected, f"Expected: {expected}, to be equal to actual: {actual}"
         )
 
+    def test_nodes_are_slotted(self):
+        for node in (
+            HTMLNode("p"),
+            LeafNode("b", "bold"),
+            ParentNode("div", [LeafNode(None, "text")]),
+        ):
+            with self.subTest(node=node):
+                self.assertFalse(hasattr(node, "__dict__"))
+
+    def test_ParentNode_streaming(self):
+        node = ParentNode(
+            "div",
+            [
+                ParentNode("p", [LeafNode("b", "bold"), LeafNode(None, " text")]),
+                LeafNode("img", "", {"src": "a.png", "alt": "a"}),
+            ],
+        )
+        chunks = list(node.iter_html())
+        self.assertGreater(len(chunks), 1)
+        self.assertEqual("".join(chunks), node.to_html())
+
+        buffer = io.StringIO()
+        node.write_html(buffer)
+        self.assertEqual(
+            buffer.getvalue(),
+            '<div><p><b>bold</b> text</p><img src="a.png" alt="a"></div>',
+        )
+
+        # Validation errors surface while streaming
+        with self.assertRaises(ValueError):
+            ParentNode("div", [ParentNode("p", [])]).write_html(io.StringIO())
+
+    def test_ParentNode_compact(self):
+        node = ParentNode(
+            "div",
+            [
+                ParentNode("p", [LeafNode(None, "a   lot of\n  space "), LeafNode("b", " x ")]),
+                ParentNode("pre", [ParentNode("code", [LeafNode(None, "keep\n    this")])]),
+                RawHTMLNode("<pre>raw\n  block</pre>"),
+            ],
+        )
+        self.assertEqual(
+            node.to_html(compact=True),
+            "<div><p>a lot of space <b> x </b></p>"
+            "<pre><code>keep\n    this</code></pre><pre>raw\n  block</pre></div>",
+        )
+        self.assertIn("a   lot of\n  space ", node.to_html())
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -8,6 +8,7 @@ from src.inline_markdown import (
     split_nodes_image,
     split_nodes_link,
     text_to_textnodes,
+    tokenize_inline,
 )
 from src.textnode import TextNode, TextType, text_node_to_html_node
 
@@ -164,6 +165,11 @@ class TestExtractMarkdownFromText(unittest.TestCase):
             actual, expected, f"Expected: {expected}, to equal actual: {actual}"
         )
 
+    def test_extraction_ignores_unrelated_parentheses(self):
+        text = "A note (aside) then ![logo](/logo.png) and [home](/) (done)"
+        self.assertListEqual(extract_markdown_images(text), [("logo", "/logo.png")])
+        self.assertListEqual(extract_markdown_links(text), [("home", "/")])
+
 
 class TestSplitNodes(unittest.TestCase):
     def test_split_nodes_link(self):
@@ -204,6 +210,33 @@ class TestSplitNodes(unittest.TestCase):
             actual, expected, f"Expected: {expected}, to equal actual: {actual}"
         )
 
+    def test_split_nodes_repeated_link(self):
+        node = TextNode("[a](/a) and [a](/a)", TextType.TEXT)
+        self.assertListEqual(
+            split_nodes_link([node]),
+            [
+                TextNode("a", TextType.LINK, "/a"),
+                TextNode(" and ", TextType.TEXT),
+                TextNode("a", TextType.LINK, "/a"),
+            ],
+        )
+
+    def test_split_nodes_link_skips_images(self):
+        node = TextNode("![pic](/p.png) [home](/)", TextType.TEXT)
+        self.assertListEqual(
+            split_nodes_link([node]),
+            [
+                TextNode("![pic](/p.png) ", TextType.TEXT),
+                TextNode("home", TextType.LINK, "/"),
+            ],
+        )
+
+    def test_split_nodes_many_links(self):
+        text = " ".join(f"[l{i}](/{i})" for i in range(2000))
+        nodes = split_nodes_link([TextNode(text, TextType.TEXT)])
+        self.assertEqual(len(nodes), 3999)
+        self.assertEqual(nodes[-1], TextNode("l1999", TextType.LINK, "/1999"))
+
 
 class TestTextToTextNodes(unittest.TestCase):
     def test_basic_init(self):
@@ -228,5 +261,32 @@ class TestTextToTextNodes(unittest.TestCase):
         )
 
 
+class TestTokenizeInline(unittest.TestCase):
+    def test_code_span_is_literal(self):
+        actual = tokenize_inline("run `a * b ** c` now")
+        expected = [
+            TextNode("run ", TextType.TEXT),
+            TextNode("a * b ** c", TextType.CODE),
+            TextNode(" now", TextType.TEXT),
+        ]
+        self.assertListEqual(actual, expected)
+
+    def test_many_links(self):
+        text = " ".join(f"[l{i}](/p{i})" for i in range(50))
+        actual = tokenize_inline(text)
+        self.assertEqual(len(actual), 99)
+        self.assertEqual(actual[-1], TextNode("l49", TextType.LINK, "/p49"))
+
+    def test_missing_closing_delimiter(self):
+        with self.assertRaises(Exception) as context:
+            tokenize_inline("this is **not closed")
+        self.assertEqual(
+            str(context.exception), "Invalid Markdown: Missing closing delimiter"
+        )
+
+    def test_empty_text(self):
+        self.assertListEqual(tokenize_inline(""), [])
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,132 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from src.block_markdown import markdown_to_html_node
+from src.generate_html import generate_pages_recursive
+from src.links import LinkIndex, page_url, resolve_target, url_aliases
+from src.manifest import BuildManifest
+from tests.helpers import write_file
+
+
+class TestResolveTarget(unittest.TestCase):
+    def test_page_urls(self):
+        self.assertEqual(
+            page_url(os.path.join("blog", "tom", "index.md")), "/blog/tom/index.html"
+        )
+        self.assertEqual(
+            url_aliases("/blog/tom/index.html"),
+            ["/blog/tom/index.html", "/blog/tom/", "/blog/tom"],
+        )
+        self.assertEqual(url_aliases("/index.html"), ["/index.html", "/"])
+        self.assertEqual(url_aliases("/about.html"), ["/about.html"])
+
+    def test_relative_and_absolute_targets(self):
+        base = "/blog/tom/index.html"
+        self.assertEqual(resolve_target(base, "/majesty"), "/majesty")
+        self.assertEqual(resolve_target(base, "../majesty/"), "/blog/majesty/")
+        self.assertEqual(
+            resolve_target(base, "pic%20one.png?v=2#top"), "/blog/tom/pic one.png"
+        )
+        self.assertEqual(resolve_target(base, "/"), "/")
+
+    def test_external_targets_are_ignored(self):
+        base = "/index.html"
+        self.assertIsNone(resolve_target(base, "https://example.com/x"))
+        self.assertIsNone(resolve_target(base, "//cdn.example.com/x.js"))
+        self.assertIsNone(resolve_target(base, "mailto:someone@example.com"))
+        self.assertIsNone(resolve_target(base, "#section"))
+
+
+class TestLinkIndex(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        root = self.tmp.name
+        self.content = os.path.join(root, "content")
+        self.static = os.path.join(root, "static")
+        self.public = os.path.join(root, "public")
+        self.template = os.path.join(root, "template.html")
+        self.index_path = os.path.join(root, ".cache", "link-index.json")
+
+        write_file(self.template, "<title>{{ Title }}</title>{{ Content }}")
+        write_file(os.path.join(self.static, "images", "tom.png"), "png")
+        self.home = os.path.join(self.content, "index.md")
+        self.tom = os.path.join(self.content, "blog", "tom", "index.md")
+
+        write_file(
+            self.home,
+            "# Home\n\n[Tom](/blog/tom) ![tom](/images/tom.png) [gone](/missing)",
+        )
+        write_file(
+            self.tom,
+            "# Tom\n\n[Home](/) [up](../../index.html) ![x](missing.png)\n"
+            "[ext](https://x.org)",
+        )
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def build(self, **kwargs):
+        link_index = LinkIndex(self.index_path)
+        manifest = BuildManifest(os.path.join(self.tmp.name, ".cache", "manifest.json"))
+        stats = generate_pages_recursive(
+            self.content,
+            self.template,
+            self.public,
+            manifest,
+            link_index=link_index,
+            **kwargs,
+        )
+        manifest.save()
+        link_index.save()
+        return link_index, stats
+
+    def test_collects_references_while_parsing(self):
+        refs = []
+        markdown_to_html_node("# T\n\n- [a](/a)\n- ![b](/b.png)\n\n> [c](c)", refs=refs)
+        self.assertEqual(refs, [("link", "/a"), ("image", "/b.png"), ("link", "c")])
+
+    def test_reports_broken_references(self):
+        for kwargs in ({}, {"jobs": 2}, {"io_threads": 2}, {"stream": True}):
+            with self.subTest(**kwargs):
+                shutil.rmtree(os.path.dirname(self.index_path), ignore_errors=True)
+                link_index, stats = self.build(**kwargs)
+                self.assertEqual(stats["fresh"], 0)
+                self.assertEqual(
+                    link_index.broken(self.content, self.static),
+                    [
+                        (self.tom, "image", "missing.png"),
+                        (self.home, "link", "/missing"),
+                    ],
+                )
+
+    def test_fresh_pages_keep_their_references(self):
+        self.build()
+        link_index, stats = self.build()
+
+        self.assertEqual(stats["fresh"], 2)
+        self.assertEqual(len(link_index.broken(self.content, self.static)), 2)
+
+    def test_pages_missing_from_index_are_rendered(self):
+        self.build()
+        os.remove(self.index_path)
+        link_index, stats = self.build()
+
+        self.assertEqual(stats["fresh"], 0)
+        self.assertEqual(len(link_index.entries), 2)
+
+    def test_removed_pages_are_pruned(self):
+        self.build()
+        os.remove(self.tom)
+        link_index, _ = self.build()
+
+        self.assertEqual(list(link_index.entries), [self.home])
+        self.assertEqual(
+            link_index.broken(self.content, self.static),
+            [(self.home, "link", "/blog/tom"), (self.home, "link", "/missing")],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,127 @@
+import os
+import tempfile
+import unittest
+
+from src.file_io import read_source
+from src.generate_html import generate_pages_recursive
+from src.manifest import BuildManifest, hash_bytes
+from tests.helpers import write_file
+
+
+class TestBuildManifest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        root = self.tmp.name
+        self.content = os.path.join(root, "content")
+        self.public = os.path.join(root, "public")
+        self.template = os.path.join(root, "template.html")
+        self.manifest_path = os.path.join(root, ".cache", "manifest.json")
+
+        os.makedirs(os.path.join(self.content, "blog"))
+        write_file(os.path.join(self.content, "index.md"), "# Home\n\nhello")
+        write_file(os.path.join(self.content, "blog", "post.md"), "# Post\n\nworld")
+        write_file(self.template, "<title>{{ Title }}</title>{{ Content }}")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _build(self) -> dict[str, int]:
+        manifest = BuildManifest(self.manifest_path)
+        generate_pages_recursive(self.content, self.template, self.public, manifest)
+        manifest.save()
+        return {
+            path: os.stat(path).st_mtime_ns
+            for path in (
+                os.path.join(self.public, "index.html"),
+                os.path.join(self.public, "blog", "post.html"),
+            )
+        }
+
+    def test_unchanged_pages_are_skipped(self):
+        first = self._build()
+        second = self._build()
+        self.assertEqual(first, second)
+
+    def test_only_dirty_page_is_rebuilt(self):
+        first = self._build()
+        post = os.path.join(self.content, "blog", "post.md")
+        write_file(post, "# Post\n\nchanged")
+        os.utime(post, ns=(1, 1))
+
+        second = self._build()
+        index_html = os.path.join(self.public, "index.html")
+        post_html = os.path.join(self.public, "blog", "post.html")
+        self.assertEqual(first[index_html], second[index_html])
+
+        with open(post_html) as file:
+            self.assertIn("<p>changed</p>", file.read())
+
+    def test_template_change_rebuilds_all(self):
+        self._build()
+        write_file(self.template, "<h1>{{ Title }}</h1>{{ Content }}")
+        self._build()
+
+        with open(os.path.join(self.public, "index.html")) as file:
+            self.assertTrue(file.read().startswith("<h1>Home</h1>"))
+
+    def test_missing_output_is_rebuilt(self):
+        self._build()
+        index_html = os.path.join(self.public, "index.html")
+        os.remove(index_html)
+        self._build()
+        self.assertTrue(os.path.exists(index_html))
+
+    def test_identical_output_is_not_rewritten(self):
+        first = self._build()
+        index = os.path.join(self.content, "index.md")
+        write_file(index, "# Home\n\nhello\n\n")
+        os.utime(index, ns=(1, 1))
+
+        manifest = BuildManifest(self.manifest_path)
+        stats = generate_pages_recursive(self.content, self.template, self.public, manifest)
+
+        self.assertEqual(stats, {"written": 0, "skipped": 1, "fresh": 1, "drafts": 0})
+        index_html = os.path.join(self.public, "index.html")
+        self.assertEqual(os.stat(index_html).st_mtime_ns, first[index_html])
+
+    def test_edit_saved_after_read_is_not_fresh(self):
+        self._build()
+        index = os.path.join(self.content, "index.md")
+        index_html = os.path.join(self.public, "index.html")
+        manifest = BuildManifest(self.manifest_path)
+
+        source, source_stat = read_source(index)
+        write_file(index, "# Home\n\nedited while rendering")
+        os.utime(index, ns=(2, 2))
+        manifest.record(
+            index,
+            index_html,
+            manifest.entries[index]["template_hash"],
+            hash_bytes(source),
+            manifest.entries[index]["output_hash"],
+            source_stat,
+        )
+
+        template_hash = manifest.entries[index]["template_hash"]
+        self.assertFalse(manifest.is_fresh(index, index_html, template_hash))
+
+    def test_removed_sources_are_pruned(self):
+        self._build()
+        post = os.path.join(self.content, "blog", "post.md")
+        os.remove(post)
+
+        manifest = BuildManifest(self.manifest_path)
+        generate_pages_recursive(self.content, self.template, self.public, manifest)
+
+        index = os.path.join(self.content, "index.md")
+        self.assertEqual(list(manifest.entries), [index])
+
+    def test_corrupt_manifest_starts_empty(self):
+        os.makedirs(os.path.dirname(self.manifest_path))
+        write_file(self.manifest_path, "not json")
+        manifest = BuildManifest(self.manifest_path)
+        self.assertEqual(manifest.entries, {})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+import os
+import tempfile
+import unittest
+
+from src.generate_html import generate_pages, generate_pages_recursive
+from src.manifest import BuildManifest
+from src.metadata import MetadataStore
+from src.template import Template
+from tests.helpers import write_file
+
+
+class TestMetadataStore(unittest.TestCase):
+    def test_record_reports_changes(self):
+        store = MetadataStore()
+
+        self.assertTrue(store.record("a.md", "h1", {"title": "A", "words": 3}))
+        updated = store.entries["a.md"]["updated"]
+        self.assertFalse(store.record("a.md", "h1", {"title": "A", "words": 3}))
+        self.assertTrue(store.record("a.md", "h1", {"title": "B", "words": 3}))
+        self.assertEqual(store.entries["a.md"]["updated"], updated)
+
+    def test_persisted_between_runs(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "metadata.json")
+            store = MetadataStore(path)
+            store.record("a.md", "h1", {"title": "A", "words": 3, "tags": ["x"]})
+            store.aggregates["sitemap.xml"] = "fingerprint"
+            store.save()
+
+            loaded = MetadataStore(path)
+            self.assertEqual(loaded.entries, store.entries)
+            self.assertEqual(loaded.aggregates, {"sitemap.xml": "fingerprint"})
+
+    def test_collected_during_build(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            content = os.path.join(tmp, "content")
+            template = os.path.join(tmp, "template.html")
+            write_file(template, "{{ Title }}{{ Content }}")
+            write_file(
+                os.path.join(content, "index.md"), "# Home\n\nfour words of text"
+            )
+            write_file(os.path.join(content, "blog", "post.md"), "# Post\n\nsome text")
+
+            for kwargs in ({}, {"jobs": 2}, {"io_threads": 2}, {"stream": True}):
+                with self.subTest(**kwargs):
+                    store = MetadataStore()
+                    generate_pages_recursive(
+                        content,
+                        template,
+                        os.path.join(tmp, "public"),
+                        metadata=store,
+                        **kwargs,
+                    )
+
+                    home = store.entries[os.path.join(content, "index.md")]
+                    self.assertEqual((home["title"], home["words"]), ("Home", 6))
+                    post = store.entries[os.path.join(content, "blog", "post.md")]
+                    self.assertEqual((post["title"], post["words"]), ("Post", 4))
+
+    def test_page_rendered_without_store_is_stale(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            content = os.path.join(tmp, "content")
+            public = os.path.join(tmp, "public")
+            template = os.path.join(tmp, "template.html")
+            post = os.path.join(content, "post.md")
+            write_file(template, "{{ Title }}{{ Content }}")
+            write_file(post, "# Post")
+
+            manifest = BuildManifest(os.path.join(tmp, "manifest.json"))
+            store = MetadataStore()
+            generate_pages_recursive(content, template, public, manifest, metadata=store)
+
+            write_file(post, "# Edited")
+            with open(template) as file:
+                generate_pages(
+                    [(post, os.path.join(public, "post.html"))],
+                    Template(file.read()),
+                    manifest,
+                )
+
+            stats = generate_pages_recursive(
+                content, template, public, manifest, metadata=store
+            )
+            self.assertEqual(stats["fresh"], 0)
+            self.assertEqual(store.entries[post]["title"], "Edited")
+
+
+if __name__ == "__main__":
+    unittest.main()
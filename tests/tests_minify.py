@@ -0,0 +1,55 @@
+import unittest
+
+from src.minify import CssMinifier, collapse_whitespace, minify_css
+
+
+class TestCollapseWhitespace(unittest.TestCase):
+    def test_block_whitespace_is_dropped(self):
+        self.assertEqual(
+            collapse_whitespace("<!DOCTYPE html>\n<html>\n  <body>\n    <p>hi</p>\n  </body>"),
+            "<!DOCTYPE html><html><body><p>hi</p></body>",
+        )
+
+    def test_inline_whitespace_is_collapsed(self):
+        self.assertEqual(
+            collapse_whitespace("<a href='/'>x</a>\n   <b>y</b>  and   z"),
+            "<a href='/'>x</a> <b>y</b> and z",
+        )
+
+    def test_preserved_elements(self):
+        markup = "<div>\n  <script>\n  let a = 1\n  let b = 2\n</script>\n  <textarea> x  </textarea>\n</div>"
+        self.assertEqual(
+            collapse_whitespace(markup),
+            "<div><script>\n  let a = 1\n  let b = 2\n</script><textarea> x  </textarea></div>",
+        )
+
+
+class TestMinifyCss(unittest.TestCase):
+    def test_minify(self):
+        css = """
+/* comment */
+body {
+    font-family: "Segoe  UI", Arial;
+    margin: 0 auto;
+}
+
+a :hover,
+pre code {
+    content: '/* not a comment */';
+}
+"""
+        self.assertEqual(
+            minify_css(css),
+            'body{font-family:"Segoe  UI",Arial;margin:0 auto}'
+            "a :hover,pre code{content:'/* not a comment */'}",
+        )
+
+    def test_minifier_caches_by_content(self):
+        minifier = CssMinifier()
+        self.assertEqual(minifier("a { b: c; }"), "a{b:c}")
+        self.assertEqual(minifier("a { b: c; }"), "a{b:c}")
+        self.assertEqual((minifier.cache.hits, minifier.cache.misses), (1, 1))
+
+
+if __name__ == "__main__":
+    unittest.main()
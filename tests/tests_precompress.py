@@ -0,0 +1,88 @@
+import gzip
+import os
+import tempfile
+import unittest
+
+from src.copy_static import sync_static_files
+from src.file_io import open_atomic
+from src.manifest import BuildManifest
+from src.precompress import Precompressor
+from tests.helpers import write_file
+
+
+class TestPrecompressor(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.public = os.path.join(self.tmp.name, "public")
+        self.manifest = BuildManifest(os.path.join(self.tmp.name, "manifest.json"))
+        self.page = os.path.join(self.public, "index.html")
+        write_file(self.page, "<p>hello</p>" * 100)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _precompress(self, *paths: str) -> Precompressor:
+        with Precompressor(self.manifest, threads=2) as precompressor:
+            for path in paths:
+                precompressor.add(path)
+        return precompressor
+
+    def test_writes_gzip_sidecar(self):
+        precompressor = self._precompress(self.page)
+
+        self.assertEqual(precompressor.compressed, 1)
+        with open(self.page + ".gz", "rb") as file:
+            self.assertEqual(gzip.decompress(file.read()), b"<p>hello</p>" * 100)
+
+    def test_up_to_date_sidecars_are_skipped(self):
+        self._precompress(self.page)
+        precompressor = self._precompress(self.page)
+        self.assertEqual((precompressor.compressed, precompressor.skipped), (0, 1))
+
+        os.remove(self.page + ".gz")
+        precompressor = self._precompress(self.page)
+        self.assertEqual(precompressor.compressed, 1)
+
+    def test_small_and_binary_files_are_not_compressed(self):
+        small = os.path.join(self.public, "small.css")
+        image = os.path.join(self.public, "image.png")
+        write_file(small, "a{}")
+        write_file(image, "x" * 1000)
+
+        self._precompress(small, image)
+        self.assertFalse(os.path.exists(small + ".gz"))
+        self.assertFalse(os.path.exists(image + ".gz"))
+
+        precompressor = self._precompress(small)
+        self.assertEqual(precompressor.skipped, 1)
+
+    def test_replacing_a_file_discards_its_sidecars(self):
+        self._precompress(self.page)
+        with open_atomic(self.page, "w") as file:
+            file.write("<p>changed</p>")
+
+        self.assertFalse(os.path.exists(self.page + ".gz"))
+
+    def test_sync_keeps_sidecars_of_kept_files(self):
+        static = os.path.join(self.tmp.name, "static")
+        css = os.path.join(self.public, "index.css")
+        write_file(os.path.join(static, "index.css"), "body { color: red; }" * 20)
+
+        outputs = []
+        sync_static_files(static, self.public, keep={self.page}, on_output=outputs.append)
+        self.assertEqual(outputs, [css])
+
+        self._precompress(self.page, css)
+        stats = sync_static_files(static, self.public, keep={self.page})
+
+        self.assertEqual(stats["removed"], 0)
+        self.assertTrue(os.path.exists(self.page + ".gz"))
+        self.assertTrue(os.path.exists(css + ".gz"))
+
+        os.remove(os.path.join(static, "index.css"))
+        sync_static_files(static, self.public, keep={self.page})
+        self.assertFalse(os.path.exists(css + ".gz"))
+
+
+if __name__ == "__main__":
+    unittest.main()
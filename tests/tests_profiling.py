@@ -0,0 +1,67 @@
+import json
+import os
+import tempfile
+import unittest
+
+from src.generate_html import generate_pages_recursive
+from src.profiling import NULL_PROFILER, Profiler
+
+
+class TestProfiler(unittest.TestCase):
+    def test_disabled_records_nothing(self):
+        with NULL_PROFILER.stage("anything", "page.md"):
+            pass
+        self.assertEqual(NULL_PROFILER.events, [])
+
+    def test_stage_totals_and_slowest(self):
+        profiler = Profiler()
+        for page in ("a.md", "b.md"):
+            with profiler.stage("page", page):
+                with profiler.stage("read", page):
+                    pass
+
+        totals = profiler.stage_totals()
+        self.assertEqual(list(totals), ["read", "page"])
+        self.assertEqual(totals["page"]["calls"], 2)
+        self.assertEqual(len(profiler.slowest_pages(1)), 1)
+        self.assertIn("slowest 2 pages:", profiler.summary())
+
+    def test_build_trace(self):
+        with tempfile.TemporaryDirectory() as root:
+            content = os.path.join(root, "content")
+            template = os.path.join(root, "template.html")
+            os.makedirs(content)
+            for name in ("a", "b", "c"):
+                with open(os.path.join(content, f"{name}.md"), "w") as file:
+                    file.write(f"# {name}\n\ntext")
+            with open(template, "w") as file:
+                file.write("{{ Title }}{{ Content }}")
+
+            for jobs, io_threads in ((1, 0), (2, 0), (1, 2), (2, 2)):
+                with self.subTest(jobs=jobs, io_threads=io_threads):
+                    profiler = Profiler()
+                    generate_pages_recursive(
+                        content,
+                        template,
+                        os.path.join(root, f"public{jobs}-{io_threads}"),
+                        jobs=jobs,
+                        profiler=profiler,
+                        io_threads=io_threads,
+                    )
+                    totals = profiler.stage_totals()
+                    for stage in ("read", "markdown_to_html_node", "to_html", "template"):
+                        self.assertEqual(totals[stage]["calls"], 3)
+
+                    # Pipelined writes are timed by the writer, not per render
+                    if io_threads:
+                        self.assertEqual(totals["write"]["calls"], 3)
+
+                    trace_path = os.path.join(root, "trace.json")
+                    profiler.write_trace(trace_path)
+                    with open(trace_path) as file:
+                        trace = json.load(file)
+                    self.assertTrue(all(e["ph"] == "X" for e in trace["traceEvents"]))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,123 @@
+import os
+import tempfile
+import unittest
+
+from src.file_io import open_atomic
+from src.main import main
+from src.publish import (
+    current_release,
+    link_tree,
+    prune_releases,
+    publish_release,
+    releases_dir,
+    stage_release,
+)
+from tests.helpers import write_file
+
+
+class TestPublish(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.public = os.path.join(self.tmp.name, "public")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_link_tree_hardlinks_files(self):
+        write_file(os.path.join(self.public, "a", "b.txt"), "b")
+        copy = os.path.join(self.tmp.name, "copy")
+
+        self.assertEqual(link_tree(self.public, copy), 1)
+        self.assertTrue(
+            os.path.samefile(
+                os.path.join(self.public, "a", "b.txt"), os.path.join(copy, "a", "b.txt")
+            )
+        )
+
+    def test_plain_directory_is_migrated(self):
+        write_file(os.path.join(self.public, "index.html"), "old")
+        staging = stage_release(self.public)
+        write_file(os.path.join(staging, "new.html"), "new")
+        publish_release(staging, self.public)
+
+        self.assertTrue(os.path.islink(self.public))
+        self.assertEqual(current_release(self.public), staging)
+        self.assertEqual(sorted(os.listdir(self.public)), ["index.html", "new.html"])
+        self.assertEqual(len(os.listdir(releases_dir(self.public))), 2)
+
+    def test_unpublished_staging_is_invisible(self):
+        first = stage_release(self.public)
+        write_file(os.path.join(first, "index.html"), "first")
+        publish_release(first, self.public)
+
+        second = stage_release(self.public)
+        with open_atomic(os.path.join(second, "index.html"), "w") as file:
+            file.write("second")
+
+        with open(os.path.join(self.public, "index.html")) as file:
+            self.assertEqual(file.read(), "first")
+
+    def test_prune_keeps_current(self):
+        for _ in range(4):
+            publish_release(stage_release(self.public), self.public, keep=10)
+
+        removed = prune_releases(self.public, keep=2)
+        self.assertEqual(len(removed), 2)
+        self.assertEqual(len(os.listdir(releases_dir(self.public))), 2)
+        self.assertIsNotNone(current_release(self.public))
+
+    def test_prune_ignores_other_entries(self):
+        for _ in range(3):
+            publish_release(stage_release(self.public), self.public, keep=10)
+        stray = os.path.join(releases_dir(self.public), ".DS_Store")
+        write_file(stray, "")
+
+        removed = prune_releases(self.public, keep=2)
+        self.assertEqual(len(removed), 1)
+        self.assertTrue(os.path.exists(stray))
+
+
+class TestAtomicBuild(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = self.tmp.name
+        self.public = os.path.join(self.root, "public")
+
+        write_file(os.path.join(self.root, "content", "index.md"), "# Home\n\nhello")
+        write_file(os.path.join(self.root, "content", "blog", "post.md"), "# Post")
+        write_file(os.path.join(self.root, "static", "index.css"), "body {}")
+        write_file(
+            os.path.join(self.root, "template.html"), "<title>{{ Title }}</title>{{ Content }}"
+        )
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_rebuild_reuses_unchanged_and_keeps_old_release_intact(self):
+        main(["--root", self.root, "--atomic", "--io-threads", "0"])
+        first = current_release(self.public)
+
+        post = os.path.join(self.root, "content", "blog", "post.md")
+        write_file(post, "# Post\n\nchanged")
+        os.utime(post, ns=(1, 1))
+        main(["--root", self.root, "--atomic", "--io-threads", "0"])
+        second = current_release(self.public)
+
+        self.assertNotEqual(first, second)
+        self.assertTrue(
+            os.path.samefile(
+                os.path.join(first, "index.html"), os.path.join(second, "index.html")
+            )
+        )
+        self.assertTrue(os.path.samefile(
+            os.path.join(first, "index.css"), os.path.join(second, "index.css")
+        ))
+
+        with open(os.path.join(first, "blog", "post.html")) as file:
+            self.assertNotIn("changed", file.read())
+        with open(os.path.join(self.public, "blog", "post.html")) as file:
+            self.assertIn("<p>changed</p>", file.read())
+
+
+if __name__ == "__main__":
+    unittest.main()
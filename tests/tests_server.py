@@ -0,0 +1,143 @@
+import gzip
+import http.client
+import os
+import tempfile
+import threading
+import unittest
+
+from src.server import FileCache, accepted_encodings, make_server
+from tests.helpers import write_file
+
+
+class TestFileCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _write(self, name: str, data: bytes) -> str:
+        return write_file(os.path.join(self.tmp.name, name), data)
+
+    def test_hit_and_refresh(self):
+        cache = FileCache(ttl=0)
+        path = self._write("a.txt", b"one")
+        first = cache.get(path)
+        self.assertIs(first, cache.get(path))
+
+        self._write("a.txt", b"three")
+        second = cache.get(path)
+        self.assertEqual(second.data, b"three")
+        self.assertNotEqual(first.etag, second.etag)
+
+    def test_lru_eviction(self):
+        cache = FileCache(max_bytes=10)
+        paths = [self._write(f"{i}.txt", b"12345") for i in range(3)]
+        for path in paths:
+            cache.get(path)
+        self.assertLessEqual(cache.total_bytes, 10)
+
+    def test_missing_and_oversized(self):
+        cache = FileCache(max_file_bytes=2)
+        self.assertIsNone(cache.get(os.path.join(self.tmp.name, "nope")))
+        self.assertIsNone(cache.get(self._write("big.txt", b"12345")))
+
+
+class TestCachingServer(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        root = self.tmp.name
+        os.makedirs(os.path.join(root, "blog"))
+        with open(os.path.join(root, "index.html"), "wb") as file:
+            file.write(b"<html>home</html>")
+        with open(os.path.join(root, "blog", "index.html"), "wb") as file:
+            file.write(b"<html>blog</html>")
+        with open(os.path.join(root, "blog", "index.html.gz"), "wb") as file:
+            file.write(gzip.compress(b"<html>blog</html>"))
+        with open(os.path.join(root, "index.3f2a9c01bd.css"), "wb") as file:
+            file.write(b"p{}")
+
+        self.httpd = make_server(root, 0, file_cache=FileCache())
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+        self.conn = http.client.HTTPConnection("localhost", self.httpd.server_address[1])
+
+    def tearDown(self):
+        self.conn.close()
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        self.tmp.cleanup()
+
+    def _get(self, path: str, headers: dict[str, str] | None = None):
+        self.conn.request("GET", path, headers=headers or {})
+        response = self.conn.getresponse()
+        return response, response.read()
+
+    def test_etag_and_not_modified_on_keep_alive(self):
+        response, body = self._get("/")
+        self.assertEqual(response.status, 200)
+        self.assertEqual(body, b"<html>home</html>")
+        etag = response.getheader("ETag")
+        self.assertTrue(etag.startswith('"'))
+        self.assertIsNotNone(response.getheader("Last-Modified"))
+
+        # Same connection is reused for the conditional request
+        response, body = self._get("/", {"If-None-Match": etag})
+        self.assertEqual(response.status, 304)
+        self.assertEqual(body, b"")
+
+        response, _ = self._get(
+            "/index.html", {"If-Modified-Since": response.getheader("Last-Modified")}
+        )
+        self.assertEqual(response.status, 304)
+
+    def test_precompressed_sidecar(self):
+        response, body = self._get("/blog/", {"Accept-Encoding": "br, gzip"})
+        self.assertEqual(response.getheader("Content-Encoding"), "gzip")
+        self.assertEqual(response.getheader("Content-Type"), "text/html")
+        self.assertEqual(gzip.decompress(body), b"<html>blog</html>")
+
+        response, body = self._get("/blog/")
+        self.assertIsNone(response.getheader("Content-Encoding"))
+        self.assertEqual(body, b"<html>blog</html>")
+
+    def test_refused_and_weighted_encodings(self):
+        br = os.path.join(self.tmp.name, "blog", "index.html.br")
+        with open(br, "wb") as file:
+            file.write(b"brotli")
+
+        for accept, encoding in (
+            ("br, gzip", "br"),
+            ("br;q=0, gzip", "gzip"),
+            ("br;q=0.5, gzip;q=0.8", "gzip"),
+            ("gzip;q=0, br;q=0", None),
+            ("*", "br"),
+            ("*;q=0, gzip", "gzip"),
+        ):
+            with self.subTest(accept=accept):
+                response, _ = self._get("/blog/", {"Accept-Encoding": accept})
+                self.assertEqual(response.getheader("Content-Encoding"), encoding)
+
+    def test_accepted_encodings(self):
+        self.assertEqual(
+            accepted_encodings("GZIP;q=0.5, br ; q=0, zstd;q=x, , identity"),
+            {"gzip": 0.5, "br": 0.0, "identity": 1.0},
+        )
+
+    def test_fingerprinted_assets_are_immutable(self):
+        response, _ = self._get("/index.3f2a9c01bd.css")
+        self.assertEqual(
+            response.getheader("Cache-Control"), "public, max-age=31536000, immutable"
+        )
+
+        response, _ = self._get("/")
+        self.assertEqual(response.getheader("Cache-Control"), "no-cache")
+
+    def test_redirect_and_missing(self):
+        response, _ = self._get("/blog")
+        self.assertEqual(response.status, 301)
+        response, _ = self._get("/missing.html")
+        self.assertEqual(response.status, 404)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,210 @@
+import io
+import os
+import tempfile
+import unittest
+
+from src.htmlnode import LeafNode, ParentNode
+from src.template import Template, TemplateLoader, load_template
+from tests.helpers import write_file
+
+
+class TestTemplate(unittest.TestCase):
+    def test_compile_segments(self):
+        template = Template("<title>{{ Title }}</title>{{Content}}<p>{{ author }}</p>")
+        self.assertEqual(
+            template.segments,
+            ["<title>", "Title", "</title>", "Content", "<p>", "author", "</p>"],
+        )
+        self.assertEqual(template.variables, {"Title", "Content", "author"})
+
+    def test_render(self):
+        template = Template("<h1>{{ Title }}</h1>{{ Content }}{{ missing }}")
+        node = ParentNode("p", [LeafNode("b", "hi")])
+        actual = template.render({"Title": "Home", "Content": node})
+        self.assertEqual(actual, "<h1>Home</h1><p><b>hi</b></p>")
+
+    def test_write_matches_render(self):
+        template = Template("{{ Title }} and {{ Title }}")
+        buffer = io.StringIO()
+        template.write(buffer, {"Title": "x"})
+        self.assertEqual(buffer.getvalue(), template.render({"Title": "x"}))
+
+    def test_load_template_cache(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "template.html")
+            with open(path, "w") as file:
+                file.write("<p>{{ Content }}</p>")
+
+            first = load_template(path)
+            self.assertIs(first, load_template(path))
+
+            with open(path, "w") as file:
+                file.write("<div>{{ Content }}</div>")
+            os.utime(path, ns=(1, 1))
+
+            second = load_template(path)
+            self.assertIsNot(first, second)
+            self.assertEqual(second.render({"Content": "x"}), "<div>x</div>")
+
+            minified = load_template(path, minify=True)
+            self.assertIsNot(second, minified)
+            self.assertNotEqual(second.hash, minified.hash)
+
+    def test_minified_template(self):
+        template = Template(
+            "<html>\n  <head>\n    <title> {{ Title }} </title>\n  </head>\n"
+            "  <body>\n    <b>a</b> <i>b</i>\n    <pre>  keep\n  </pre>\n"
+            "    {{ Content }}\n  </body>\n</html>\n",
+            minify=True,
+        )
+        content = ParentNode("p", [LeafNode(None, "one   two")])
+
+        self.assertEqual(
+            template.render({"Title": "T", "Content": content}),
+            "<html><head><title>T</title></head><body><b>a</b> <i>b</i>"
+            "<pre>  keep\n  </pre><p>one two</p></body></html>",
+        )
+
+    def test_asset_references_are_rewritten(self):
+        assets = {"/index.css": "/index.3f2a9c01bd.css"}
+        template = Template(
+            '<link rel="stylesheet" href="/index.css"><a href="/index.css">x</a>'
+            "{{ Content }}",
+            assets=assets,
+        )
+        content = ParentNode(
+            "p",
+            [
+                LeafNode("img", "", {"src": "/index.css?v=1", "alt": "a"}),
+                LeafNode("img", "", {"src": "/other.png"}),
+            ],
+        )
+
+        self.assertEqual(
+            template.render({"Content": content}),
+            '<link rel="stylesheet" href="/index.3f2a9c01bd.css">'
+            '<a href="/index.css">x</a>'
+            '<p><img src="/index.3f2a9c01bd.css?v=1" alt="a">'
+            '<img src="/other.png"></p>',
+        )
+        self.assertNotEqual(template.hash, Template(template.source).hash)
+
+
+class TestTemplateLoader(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.templates = os.path.join(self.tmp.name, "templates")
+        self.content = os.path.join(self.tmp.name, "content")
+        os.makedirs(os.path.join(self.templates, "partials"))
+        os.makedirs(os.path.join(self.content, "blog", "2024"))
+
+        self._write(
+            "base.html",
+            "<html>{% include 'partials/head.html' %}<body>"
+            "{% block body %}<main>{% block main %}{{ Content }}{% endblock %}</main>"
+            "{% endblock body %}</body></html>",
+        )
+        self._write("partials/head.html", "<title>{{ Title }}</title>")
+        self._write(
+            "post.html",
+            '{% extends "base.html" %}\nignored\n'
+            "{% block main %}<article>{% include \"partials/byline.html\" %}"
+            "{{ Content }}</article>{% endblock %}",
+        )
+        self._write("partials/byline.html", "<p>by me</p>")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _write(self, name: str, text: str) -> str:
+        return write_file(os.path.join(self.templates, name), text)
+
+    def test_includes_and_inheritance(self):
+        loader = TemplateLoader(self.templates)
+        template = loader.load(os.path.join(self.templates, "post.html"))
+
+        self.assertEqual(
+            template.render({"Title": "T", "Content": "x"}),
+            "<html><title>T</title><body><main><article><p>by me</p>x</article>"
+            "</main></body></html>",
+        )
+        self.assertEqual(
+            {os.path.relpath(path, self.templates) for path in template.dependencies},
+            {
+                "post.html",
+                "base.html",
+                os.path.join("partials", "head.html"),
+                os.path.join("partials", "byline.html"),
+            },
+        )
+
+    def test_multi_level_inheritance(self):
+        self._write(
+            "wide.html",
+            '{% extends "post.html" %}{% block body %}<div>{% block main %}'
+            "{% endblock %}</div>{% endblock %}",
+        )
+        loader = TemplateLoader(self.templates)
+        template = loader.load(os.path.join(self.templates, "wide.html"))
+        self.assertEqual(
+            template.render({"Title": "T", "Content": "x"}),
+            "<html><title>T</title><body><div></div></body></html>",
+        )
+
+    def test_each_file_compiled_once(self):
+        loader = TemplateLoader(self.templates)
+        post = loader.load(os.path.join(self.templates, "post.html"))
+        self.assertIs(post, loader.load(os.path.join(self.templates, "post.html")))
+        base = loader.load(os.path.join(self.templates, "base.html"))
+
+        byline = os.path.join(self.templates, "partials", "byline.html")
+        self.assertIn(byline, post.dependencies)
+        self.assertNotIn(byline, base.dependencies)
+        self.assertNotEqual(post.hash, base.hash)
+
+    def test_partial_edit_changes_hash(self):
+        post = os.path.join(self.templates, "post.html")
+        before = TemplateLoader(self.templates).load(post).hash
+        self._write("partials/byline.html", "<p>by someone else</p>")
+        self.assertNotEqual(TemplateLoader(self.templates).load(post).hash, before)
+
+    def test_plain_template_hash_is_unchanged(self):
+        path = self._write("plain.html", "<p>{{ Content }}</p>")
+        self.assertEqual(TemplateLoader().load(path).hash, load_template(path).hash)
+
+    def test_errors(self):
+        loader = TemplateLoader(self.templates)
+        for name, text, message in (
+            ("missing.html", "{% include 'nope.html' %}", "Template not found: nope.html"),
+            ("cycle.html", "{% include 'cycle.html' %}", "Template cycle"),
+            ("late.html", "x{% extends 'base.html' %}", "extends must come first"),
+            ("open.html", "{% block a %}", "Block a is not closed"),
+        ):
+            with self.subTest(name=name):
+                with self.assertRaises(Exception) as context:
+                    loader.load(self._write(name, text))
+                self.assertIn(message, str(context.exception))
+
+    def test_for_page(self):
+        default = self._write("default.html", "{{ Content }}")
+        loader = TemplateLoader(self.templates)
+        post = os.path.join(self.content, "blog", "2024", "post.md")
+        page = os.path.join(self.content, "index.md")
+
+        self.assertEqual(loader.for_page(post, self.content, default).path, default)
+
+        blog_template = os.path.join(self.content, "blog", "template.html")
+        with open(blog_template, "w") as file:
+            file.write('{% extends "base.html" %}')
+        loader = TemplateLoader(self.templates)
+
+        self.assertEqual(loader.for_page(post, self.content, default).path, blog_template)
+        self.assertEqual(loader.for_page(page, self.content, default).path, default)
+        self.assertEqual(
+            loader.for_page(post, self.content, default, "post.html").path,
+            os.path.join(self.templates, "post.html"),
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -46,6 +46,12 @@ class TestTextNode(unittest.TestCase):
         expected_with_url = f"TextNode(Link, {TextType.LINK}, https://example.com)"
         self.assertEqual(repr(node_with_url), expected_with_url)
 
+    def test_TextNode_slots(self):
+        node = TextNode("Slotted", TextType.TEXT)
+        self.assertFalse(hasattr(node, "__dict__"))
+        with self.assertRaises(AttributeError):
+            node.extra = "not allowed"  # type: ignore
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,343 @@
+import os
+import tempfile
+import threading
+import unittest
+import urllib.request
+
+from src.assets import AssetManifest, fingerprint_assets
+from src.generate_html import generate_pages_recursive
+from src.links import LinkIndex
+from src.manifest import BuildManifest
+from src.metadata import MetadataStore
+from src.server import LIVE_RELOAD_SCRIPT, LiveReload, make_server
+from src.template import TemplateLoader
+from src.watch import InotifyWatcher, PollingWatcher, rebuild_changes, watch_paths
+from tests.helpers import write_file
+
+
+class WatchTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        root = self.tmp.name
+        self.content = os.path.join(root, "content")
+        self.static = os.path.join(root, "static")
+        self.public = os.path.join(root, "public")
+        self.template = os.path.join(root, "template.html")
+
+        os.makedirs(os.path.join(self.content, "blog"))
+        os.makedirs(self.static)
+        write_file(os.path.join(self.content, "index.md"), "# Home")
+        write_file(os.path.join(self.content, "blog", "post.md"), "# Post")
+        write_file(os.path.join(self.static, "index.css"), "body {}")
+        write_file(self.template, "<body>{{ Content }}</body>")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _read(self, path: str) -> str:
+        with open(path) as file:
+            return file.read()
+
+
+class TestWatchers(WatchTestCase):
+    def _check_watcher(self, watcher):
+        try:
+            post = os.path.join(self.content, "blog", "post.md")
+            write_file(post, "# Changed post")
+            self.assertIn(post, watcher.wait(timeout=2))
+
+            new_dir = os.path.join(self.content, "new")
+            os.makedirs(new_dir)
+            write_file(os.path.join(new_dir, "page.md"), "# New")
+            new_page = os.path.join(new_dir, "page.md")
+            changed = set()
+            for _ in range(3):
+                changed |= watcher.wait(timeout=1)
+                if new_page in changed:
+                    break
+            self.assertIn(new_page, changed)
+
+            write_file(self.template, "<main>{{ Content }}</main>")
+            self.assertIn(self.template, watcher.wait(timeout=2))
+        finally:
+            watcher.close()
+
+    def test_polling_watcher(self):
+        watcher = PollingWatcher([self.content, self.template], interval=0.01)
+        os.utime(self.template, ns=(1, 1))
+        self._check_watcher(watcher)
+
+    def test_inotify_watcher(self):
+        try:
+            watcher = InotifyWatcher([self.content, self.template])
+        except (OSError, AttributeError, TypeError):
+            self.skipTest("inotify not available")
+        self._check_watcher(watcher)
+
+
+class TestRebuildChanges(WatchTestCase):
+    def setUp(self):
+        super().setUp()
+        self.manifest = BuildManifest(os.path.join(self.tmp.name, "manifest.json"))
+        generate_pages_recursive(self.content, self.template, self.public, self.manifest)
+
+    def _rebuild(self, changed: set[str]) -> dict[str, int]:
+        return rebuild_changes(
+            changed, self.content, self.static, self.template, self.public, self.manifest
+        )
+
+    def test_single_page(self):
+        post = os.path.join(self.content, "blog", "post.md")
+        write_file(post, "# Edited")
+        stats = self._rebuild({post})
+
+        self.assertEqual(stats["pages"], 1)
+        self.assertIn("Edited", self._read(os.path.join(self.public, "blog", "post.html")))
+
+    def test_template_rebuilds_all(self):
+        write_file(self.template, "<main>{{ Content }}</main>")
+        self.assertEqual(self._rebuild({self.template})["pages"], 2)
+
+    def test_partial_rebuilds_dependent_pages(self):
+        templates = os.path.join(self.tmp.name, "templates")
+        os.makedirs(templates)
+        partial = os.path.join(templates, "byline.html")
+        write_file(partial, "<p>by me</p>")
+        write_file(
+            os.path.join(self.content, "blog", "template.html"),
+            "<body>{% include 'byline.html' %}{{ Content }}</body>",
+        )
+        generate_pages_recursive(
+            self.content,
+            self.template,
+            self.public,
+            self.manifest,
+            template_loader=TemplateLoader(templates),
+        )
+
+        write_file(partial, "<p>by someone else</p>")
+        stats = rebuild_changes(
+            {partial},
+            self.content,
+            self.static,
+            self.template,
+            self.public,
+            self.manifest,
+            templates_dir=templates,
+        )
+
+        self.assertEqual(stats["pages"], 1)
+        self.assertIn(
+            "by someone else", self._read(os.path.join(self.public, "blog", "post.html"))
+        )
+
+    def test_partial_in_content_directory(self):
+        byline = os.path.join(self.content, "blog", "byline.html")
+        write_file(byline, "<p>by me</p>")
+        write_file(
+            os.path.join(self.content, "blog", "template.html"),
+            "<body>{% include 'byline.html' %}{{ Content }}</body>",
+        )
+        loader = TemplateLoader()
+        generate_pages_recursive(
+            self.content,
+            self.template,
+            self.public,
+            self.manifest,
+            template_loader=loader,
+        )
+        self.assertIn(byline, loader.files)
+
+        write_file(byline, "<p>by someone else</p>")
+        stats = self._rebuild({byline})
+
+        self.assertEqual(stats["pages"], 1)
+        self.assertIn(
+            "by someone else", self._read(os.path.join(self.public, "blog", "post.html"))
+        )
+
+    def test_watches_template_files_outside_watched_directories(self):
+        partial = os.path.join(self.tmp.name, "byline.html")
+        layout = os.path.join(self.content, "blog", "template.html")
+
+        paths = watch_paths(
+            self.content,
+            self.static,
+            self.template,
+            template_files={self.template, partial, layout},
+        )
+        self.assertEqual(paths, [self.content, self.static, self.template, partial])
+
+    def test_missing_template_names_page(self):
+        post = os.path.join(self.content, "blog", "post.md")
+        write_file(post, "---\ntemplate: nope.html\n---\n# Post")
+
+        with self.assertRaises(Exception) as context:
+            self._rebuild({post})
+        self.assertIn(post, str(context.exception))
+
+    def test_deleted_page_and_static_asset(self):
+        post = os.path.join(self.content, "blog", "post.md")
+        write_file(os.path.join(self.public, "blog", "post.html.gz"), "")
+        os.remove(post)
+        css = os.path.join(self.static, "index.css")
+        stats = self._rebuild({post, css})
+
+        self.assertEqual(stats["removed"], 1)
+        self.assertEqual(stats["assets"], 1)
+        self.assertFalse(os.path.exists(os.path.join(self.public, "blog")))
+        self.assertTrue(os.path.exists(os.path.join(self.public, "index.css")))
+
+    def test_records_links(self):
+        index_path = os.path.join(self.tmp.name, "links.json")
+        link_index = LinkIndex(index_path)
+        generate_pages_recursive(
+            self.content, self.template, self.public, self.manifest, link_index=link_index
+        )
+        post = os.path.join(self.content, "blog", "post.md")
+        write_file(post, "# Post\n\n[home](/) and [gone](/missing)")
+
+        rebuild_changes(
+            {post},
+            self.content,
+            self.static,
+            self.template,
+            self.public,
+            self.manifest,
+            link_index=link_index,
+        )
+
+        self.assertEqual(
+            LinkIndex(index_path).broken(self.content, self.static),
+            [(post, "link", "/missing")],
+        )
+
+        os.remove(post)
+        rebuild_changes(
+            {post},
+            self.content,
+            self.static,
+            self.template,
+            self.public,
+            self.manifest,
+            link_index=link_index,
+        )
+        self.assertNotIn(post, LinkIndex(index_path))
+
+    def test_updates_metadata_and_aggregates(self):
+        store_path = os.path.join(self.tmp.name, "metadata.json")
+        metadata = MetadataStore(store_path)
+        generate_pages_recursive(
+            self.content, self.template, self.public, self.manifest, metadata=metadata
+        )
+        post = os.path.join(self.content, "blog", "post.md")
+        write_file(post, "---\ntags: [news]\n---\n# Edited")
+
+        stats = rebuild_changes(
+            {post},
+            self.content,
+            self.static,
+            self.template,
+            self.public,
+            self.manifest,
+            metadata=metadata,
+        )
+
+        self.assertGreater(stats["aggregates"], 0)
+        self.assertEqual(MetadataStore(store_path).entries[post]["title"], "Edited")
+        self.assertIn(
+            "Edited", self._read(os.path.join(self.public, "tags", "news", "index.html"))
+        )
+        stats = generate_pages_recursive(
+            self.content, self.template, self.public, self.manifest, metadata=metadata
+        )
+        self.assertEqual(stats["fresh"], 2)
+
+    def test_drafts_are_not_rendered(self):
+        post = os.path.join(self.content, "blog", "post.md")
+        write_file(post, "---\ndraft: true\n---\n# Draft")
+
+        stats = self._rebuild({post})
+        self.assertEqual((stats["pages"], stats["removed"]), (0, 1))
+        self.assertFalse(os.path.exists(os.path.join(self.public, "blog", "post.html")))
+        self.assertNotIn(post, self.manifest.entries)
+
+        stats = rebuild_changes(
+            {post},
+            self.content,
+            self.static,
+            self.template,
+            self.public,
+            self.manifest,
+            drafts=True,
+        )
+        self.assertEqual(stats["pages"], 1)
+        self.assertIn("Draft", self._read(os.path.join(self.public, "blog", "post.html")))
+
+    def test_fingerprinted_assets(self):
+        write_file(self.template, "<link href='/index.css'>{{ Content }}")
+        asset_manifest = AssetManifest(os.path.join(self.tmp.name, "assets.json"))
+        fingerprint_assets(self.static, self.public, asset_manifest)
+        generate_pages_recursive(
+            self.content,
+            self.template,
+            self.public,
+            self.manifest,
+            template_loader=TemplateLoader(assets=asset_manifest.urls()),
+        )
+        post = os.path.join(self.content, "blog", "post.md")
+        post_html = os.path.join(self.public, "blog", "post.html")
+        before = asset_manifest.urls()["/index.css"]
+
+        write_file(post, "# Edited")
+        stats = rebuild_changes(
+            {post},
+            self.content,
+            self.static,
+            self.template,
+            self.public,
+            self.manifest,
+            asset_manifest=asset_manifest,
+        )
+        self.assertEqual(stats["pages"], 1)
+        self.assertIn(before, self._read(post_html))
+
+        css = os.path.join(self.static, "index.css")
+        write_file(css, "p {}")
+        stats = rebuild_changes(
+            {css},
+            self.content,
+            self.static,
+            self.template,
+            self.public,
+            self.manifest,
+            asset_manifest=asset_manifest,
+        )
+        after = AssetManifest(asset_manifest.path).urls()["/index.css"]
+        self.assertNotEqual(after, before)
+        self.assertEqual(stats["pages"], 2)
+        self.assertIn(after, self._read(post_html))
+
+
+class TestLiveReloadServer(WatchTestCase):
+    def test_injects_script_and_streams_reload(self):
+        generate_pages_recursive(self.content, self.template, self.public)
+        live_reload = LiveReload()
+        httpd = make_server(self.public, 0, live_reload)
+        threading.Thread(target=httpd.serve_forever, daemon=True).start()
+        base = f"http://localhost:{httpd.server_address[1]}"
+
+        try:
+            with urllib.request.urlopen(f"{base}/") as response:
+                self.assertIn(LIVE_RELOAD_SCRIPT, response.read().decode())
+
+            with urllib.request.urlopen(f"{base}/__livereload", timeout=5) as response:
+                threading.Timer(0.05, live_reload.notify).start()
+                self.assertEqual(response.readline(), b"data: reload\n")
+        finally:
+            httpd.shutdown()
+            httpd.server_close()
+
+
+if __name__ == "__main__":
+    unittest.main()